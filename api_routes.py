@@ -1,10 +1,19 @@
 from server import PromptServer
 from aiohttp import web
-import json
+import asyncio
 import os
+import subprocess
+from .nodes import framecache
+from .nodes import probecache
+from .nodes import mediainfo
+from .nodes import keyframeindex
+from .nodes.probeBatch_v3 import expand_paths
 
 routes = PromptServer.instance.routes
 
+# Most files a single probe-batch request may probe
+MAX_PROBE_BATCH_PATHS = 5000
+
 
 def validate_path(path):
     # Security validation disabled (power-user mode).
@@ -29,68 +38,24 @@ async def get_video_metadata(request):
                 {"error": "Security violation: Path not allowed"}, status=403
             )
 
-        # Run ffprobe
-        cmd = [
-            "ffprobe",
-            "-v",
-            "error",
-            "-select_streams",
-            "v:0",
-            "-show_entries",
-            "stream=duration,r_frame_rate",
-            "-show_entries",
-            "packet=pts_time,flags",
-            "-of",
-            "json",
-            video_path,
-        ]
-
-        # Run in a separate thread to avoid blocking the event loop
-        # Since we are in an async function, subprocess.run would block.
-        # But for simplicity in this initial port, we can use synchronous run if it's fast enough,
-        # or better: use asyncio.create_subprocess_exec (but that requires parsing stdout async).
-        # For now, let's stick to the existing logic but wrap it potentially?
-        # Actually, let's keep it simple. ffprobe is usually fast for metadata,
-        # BUT for keyframes on large files it might take time.
-        # Ideally: await asyncio.to_thread(...)
-
+        # Both lookups are cached per file identity; the first one scans in a thread
         try:
-            import asyncio
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                return web.json_response(
-                    {"error": f"ffprobe failed: {stderr.decode()}"}, status=500
-                )
-
-            data = json.loads(stdout.decode())
-
+            stream = (await asyncio.to_thread(mediainfo.probe, video_path)).video
+            index = await asyncio.to_thread(keyframeindex.get, video_path)
+        except subprocess.CalledProcessError as e:
+            return web.json_response({"error": f"ffprobe failed: {e.stderr}"}, status=500)
         except Exception as e:
             return web.json_response(
                 {"error": f"Execution error: {str(e)}"}, status=500
             )
 
-        keyframes = []
-        if "packets" in data:
-            for packet in data.get("packets", []):
-                if "K" in packet.get("flags", ""):
-                    keyframes.append(float(packet["pts_time"]))
-
-        if not data.get("streams"):
+        if stream is None:
             return web.json_response({"error": "No video stream found"}, status=500)
 
-        fps_str = data["streams"][0]["r_frame_rate"]
-        num, den = map(int, fps_str.split("/"))
-        fps = num / den if den != 0 else 0
-
         result = {
-            "duration": float(data["streams"][0].get("duration", 0)),
-            "fps": fps,
-            "keyframes": keyframes,
+            "duration": stream.duration,
+            "fps": stream.fps,
+            "keyframes": index.keyframes.tolist(),
         }
 
         return web.json_response(result)
@@ -113,3 +78,70 @@ async def stream_video(request):
         return web.Response(status=403, text="Security violation: Path not allowed")
 
     return web.FileResponse(video_path)
+
+
+@routes.get("/comfyui-ffmpeg/frame-cache")
+async def get_frame_cache(request):
+    return web.json_response(framecache.stats())
+
+
+@routes.delete("/comfyui-ffmpeg/frame-cache")
+async def purge_frame_cache(request):
+    removed = framecache.purge()
+    return web.json_response({"removed": removed})
+
+
+@routes.get("/comfyui-ffmpeg/probe-cache")
+async def get_probe_cache(request):
+    return web.json_response(probecache.stats())
+
+
+@routes.delete("/comfyui-ffmpeg/probe-cache")
+async def purge_probe_cache(request):
+    removed = probecache.purge()
+    return web.json_response({"removed": removed})
+
+
+@routes.post("/comfyui-ffmpeg/probe-batch")
+async def probe_batch(request):
+    """Metadata of many files in one request: {"paths": [...], "format": "json"|"csv"}."""
+    try:
+        data = await request.json()
+        entries = data.get("paths")
+        fmt = data.get("format", "json")
+        try:
+            workers = int(data.get("workers") or 0)
+        except (TypeError, ValueError):
+            return web.json_response(
+                {"error": "workers must be an integer"}, status=400
+            )
+        # 0 picks the default pool size
+        workers = min(max(workers, 0), mediainfo.MAX_BATCH_WORKERS)
+
+        if not entries or not isinstance(entries, list):
+            return web.json_response({"error": "No paths provided"}, status=400)
+        if fmt not in ("json", "csv"):
+            return web.json_response({"error": f"Unsupported format: {fmt}"}, status=400)
+        if not all(validate_path(p) for p in entries):
+            return web.json_response(
+                {"error": "Security violation: Path not allowed"}, status=403
+            )
+
+        if len(entries) > MAX_PROBE_BATCH_PATHS:
+            return web.json_response(
+                {"error": f"Too many paths (max {MAX_PROBE_BATCH_PATHS})"}, status=413
+            )
+        paths = await asyncio.to_thread(expand_paths, entries)
+        if len(paths) > MAX_PROBE_BATCH_PATHS:
+            return web.json_response(
+                {"error": f"Too many files (max {MAX_PROBE_BATCH_PATHS})"}, status=413
+            )
+        rows = await asyncio.to_thread(mediainfo.probe_batch, paths, workers)
+        if fmt == "csv":
+            return web.Response(
+                text=mediainfo.format_table(rows, "csv"), content_type="text/csv"
+            )
+        return web.json_response({"count": len(rows), "items": rows})
+
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
@@ -2,21 +2,52 @@ import numpy as np
 from PIL import Image
 import torch
 import subprocess
-import json
 import re
 import os
 import gc
+import io
 import shutil
+import tarfile
+import threading
 import time
-from itertools import islice
+from collections import OrderedDict, deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
-from typing import List, Tuple, Set, Dict, Optional, Union
+from typing import Callable, List, Tuple, Set, Dict, Optional, Union
 
 from comfy.model_management import unload_all_models, soft_empty_cache
 
+try:
+    from .nodes import mediainfo
+except ImportError:
+    from nodes import mediainfo
+
 _xfade_transitions_cache = None
 
+# Directory listings keyed by (path, extensions), see list_directory()
+_directory_index: "OrderedDict[Tuple[str, Tuple[str, ...]], Tuple[int, List[str]]]" = OrderedDict()
+_directory_index_lock = threading.Lock()
+DIRECTORY_INDEX_SIZE = 64
+# Listings of directories modified more recently than this are not reused,
+# since a coarse mtime could hide a change made in the same tick
+DIRECTORY_MTIME_SLACK = 2.0
+
+# Frames scaled and cast per step when converting IMAGE batches to uint8
+UINT8_CHUNK_FRAMES = 16
+
+# Formats written by save_images and their file extensions
+IMAGE_SAVE_FORMATS = {
+    "png": ".png",
+    "jpeg": ".jpg",
+    "webp": ".webp",
+    "webp_lossless": ".webp",
+    "npy": ".npy",
+}
+
+# Files already handed out per directory, see new_files()
+_seen_files: Dict[str, Dict[str, Tuple[int, int]]] = {}
+_seen_files_lock = threading.Lock()
+
 IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp"}
 VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".rmvb", ".wmv", ".flv", ".webm")
 AUDIO_EXTENSIONS = (
@@ -209,6 +240,137 @@ def copy_images_to_directory(
     return [path for path in copied_paths if path is not None]
 
 
+def natural_sort_key(name: str) -> List[Union[str, int]]:
+    """Sort key ordering embedded numbers by value ("frame2" before "frame10").
+
+    Args:
+        name (str): The file name.
+
+    Returns:
+        list: Alternating text and integer chunks of the name.
+    """
+    return [int(part) if i % 2 else part for i, part in enumerate(re.split(r"(\d+)", name))]
+
+
+def list_directory(
+    directory: str,
+    extensions: Union[Set[str], Tuple[str, ...]],
+    start_index: int = 0,
+    length: int = 0,
+) -> List[str]:
+    """Lists the files of a directory with the given extensions, naturally sorted.
+
+    The listing is built with ``os.scandir`` and cached until the directory's
+    mtime changes, so repeated calls and paging through a large directory
+    only cost the returned slice.
+
+    Args:
+        directory (str): The directory to list.
+        extensions (set or tuple): Lower-case extensions to keep, e.g. ``".png"``.
+        start_index (int): Index of the first path to return.
+        length (int): Number of paths to return (0 for all from ``start_index``).
+
+    Returns:
+        list: Full paths of the matching files.
+    """
+    extensions = tuple(sorted(extensions))
+    key = (os.path.realpath(directory), extensions)
+    mtime_ns = os.stat(directory).st_mtime_ns
+
+    with _directory_index_lock:
+        cached = _directory_index.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            _directory_index.move_to_end(key)
+            paths = cached[1]
+        else:
+            paths = None
+
+    if paths is None:
+        names = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(extensions) and entry.is_file():
+                    names.append(entry.name)
+        names.sort(key=natural_sort_key)
+        paths = [os.path.join(directory, name) for name in names]
+
+        if time.time() - mtime_ns / 1e9 > DIRECTORY_MTIME_SLACK:
+            with _directory_index_lock:
+                _directory_index[key] = (mtime_ns, paths)
+                _directory_index.move_to_end(key)
+                while len(_directory_index) > DIRECTORY_INDEX_SIZE:
+                    _directory_index.popitem(last=False)
+
+    end = start_index + length if length > 0 else None
+    return paths[start_index:end]
+
+
+def new_files(
+    directory: str, paths: List[str], limit: int = 0, recheck: bool = False
+) -> Dict[str, Tuple[int, int]]:
+    """Picks the paths that were not marked seen yet.
+
+    Names already marked seen are skipped without touching the file system,
+    so a run only costs a ``stat`` per new file. With ``recheck``, seen files
+    are also stat'ed and picked again when their size or mtime changed, which
+    catches frames rewritten in place at the cost of a ``stat`` per file.
+
+    Args:
+        directory (str): The directory the paths belong to.
+        paths (list): Candidate paths, in order.
+        limit (int): Maximum number of files to pick (0 for no limit).
+        recheck (bool): Also pick seen files whose size or mtime changed.
+
+    Returns:
+        dict: Picked paths mapped to their ``(size, mtime_ns)`` signature,
+        to be passed to :func:`mark_files_seen` once they were consumed.
+    """
+    with _seen_files_lock:
+        seen = dict(_seen_files.get(os.path.realpath(directory), {}))
+
+    picked = {}
+    for path in paths:
+        previous = seen.get(os.path.basename(path))
+        if previous is not None and not recheck:
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        signature = (st.st_size, st.st_mtime_ns)
+        if previous != signature:
+            picked[path] = signature
+            if limit > 0 and len(picked) >= limit:
+                break
+    return picked
+
+
+def mark_files_seen(directory: str, files: Dict[str, Tuple[int, int]]) -> None:
+    """Records files returned by :func:`new_files` as consumed.
+
+    Args:
+        directory (str): The directory the files belong to.
+        files (dict): Paths mapped to their ``(size, mtime_ns)`` signature.
+    """
+    with _seen_files_lock:
+        seen = _seen_files.setdefault(os.path.realpath(directory), {})
+        for path, signature in files.items():
+            seen[os.path.basename(path)] = signature
+
+
+def reset_seen_files(directory: Optional[str] = None) -> None:
+    """Forgets the consumed files of one directory, or of all directories.
+
+    Args:
+        directory (str, optional): The directory to reset (None for all).
+    """
+    with _seen_files_lock:
+        if directory is None:
+            _seen_files.clear()
+        else:
+            _seen_files.pop(os.path.realpath(directory), None)
+
+
 def get_image_paths_from_directory(
     directory: str, start_index: int, length: int
 ) -> List[str]:
@@ -222,21 +384,7 @@ def get_image_paths_from_directory(
     Returns:
         list: A list of image paths.
     """
-    image_extensions = tuple(get_image_extensions())
-
-    # 创建排序后的文件生成器，直接在生成器中过滤
-    def image_generator():
-        for filename in sorted(os.listdir(directory)):
-            if filename.lower().endswith(image_extensions):
-                yield os.path.join(directory, filename)
-
-    # 使用islice获取所需的图像路径
-    if length > 0:
-        selected_images = islice(image_generator(), start_index, start_index + length)
-    else:
-        selected_images = islice(image_generator(), start_index, None)
-
-    return list(selected_images)
+    return list_directory(directory, get_image_extensions(), start_index, length)
 
 
 def generate_template_string(filename: str) -> str:
@@ -259,6 +407,34 @@ def generate_template_string(filename: str) -> str:
     )
 
 
+def parse_image_sequence(image_paths: List[str]) -> Tuple[Optional[str], List[int]]:
+    """Finds the FFmpeg pattern and frame numbers of a numbered image sequence.
+
+    Args:
+        image_paths (list): Paths of the images, in order.
+
+    Returns:
+        tuple: The full-path pattern shared by every file (e.g.
+        ``/frames/img_%04d.png``) and each file's frame number, or
+        ``(None, [])`` if the files do not form a single numbered sequence.
+    """
+    pattern = None
+    numbers = []
+    for path in image_paths:
+        directory, name = os.path.split(path)
+        template = generate_template_string(name)
+        # image2 patterns support exactly one number and no other '%'
+        if template.count("%") != 1 or "%" in directory:
+            return None, []
+        candidate = os.path.join(directory, template)
+        if pattern is None:
+            pattern = candidate
+        elif candidate != pattern:
+            return None, []
+        numbers.append(int(re.search(r"\d+", name).group()))
+    return pattern, numbers
+
+
 def tensor2pil(image: torch.Tensor) -> Image.Image:
     """Converts a tensor to a PIL image.
 
@@ -268,9 +444,61 @@ def tensor2pil(image: torch.Tensor) -> Image.Image:
     Returns:
         PIL.Image.Image: The converted PIL image.
     """
-    return Image.fromarray(
-        np.clip(255.0 * image.cpu().numpy().squeeze(), 0, 255).astype(np.uint8)
-    )
+    return Image.fromarray(images_to_uint8(image.squeeze()).numpy())
+
+
+def to_uint8(images: torch.Tensor) -> torch.Tensor:
+    """Scales a float image tensor in [0, 1] to uint8 on its own device.
+
+    Args:
+        images (torch.Tensor): Float image(s) in [0, 1].
+
+    Returns:
+        torch.Tensor: Rounded and clamped uint8 tensor on the same device.
+    """
+    return images.mul(255.0).round_().clamp_(0, 255).to(torch.uint8)
+
+
+def images_to_uint8(
+    images: torch.Tensor,
+    out: Optional[torch.Tensor] = None,
+    chunk_frames: int = UINT8_CHUNK_FRAMES,
+) -> torch.Tensor:
+    """Converts a float IMAGE batch to a uint8 tensor in host memory.
+
+    Scaling and casting run chunk by chunk on the tensor's own device, so
+    only one byte per channel crosses to the host and no float copy of the
+    whole batch is made. Each chunk is copied once into ``out``.
+
+    Args:
+        images (torch.Tensor): Float IMAGE batch in [0, 1] (any leading shape).
+        out (torch.Tensor, optional): Reusable uint8 host buffer, e.g. the
+            result of a previous call. Reused when its storage is large
+            enough, replaced otherwise.
+        chunk_frames (int): Frames converted per step along the first dim.
+
+    Returns:
+        torch.Tensor: uint8 CPU tensor shaped like ``images``, backed by
+        ``out``'s storage when it was reused.
+    """
+    shape = tuple(images.shape)
+    needed = int(np.prod(shape))
+    if out is not None and out.untyped_storage().nbytes() >= needed:
+        out = torch.empty(0, dtype=torch.uint8).set_(out.untyped_storage(), 0, shape)
+    else:
+        out = torch.empty(shape, dtype=torch.uint8, pin_memory=images.is_cuda)
+
+    if not images.is_floating_point():
+        return out.copy_(images)
+
+    chunk_frames = max(chunk_frames, 1)
+    for start in range(0, shape[0], chunk_frames):
+        chunk = to_uint8(images[start : start + chunk_frames])
+        out[start : start + chunk_frames].copy_(chunk, non_blocking=True)
+    if images.is_cuda:
+        # Non-blocking copies must land before the host reads the buffer
+        torch.cuda.synchronize(images.device)
+    return out
 
 
 def pil2tensor(image: Image.Image) -> torch.Tensor:
@@ -285,6 +513,179 @@ def pil2tensor(image: Image.Image) -> torch.Tensor:
     return torch.from_numpy(np.array(image).astype(np.float32) / 255.0).unsqueeze(0)
 
 
+def load_images(
+    image_paths: List[str], workers: Optional[int] = None, as_float: bool = True
+) -> torch.Tensor:
+    """Loads images into a single batch tensor using a thread pool.
+
+    Pillow releases the GIL while decoding, so images decode in parallel.
+    Each one is written straight into its slot of a preallocated uint8
+    ``[N, H, W, 3]`` batch, which is converted to float in one pass.
+
+    Args:
+        image_paths (list): Paths of the images, all of the same size.
+        workers (int, optional): Number of decoding threads (default: CPU based).
+        as_float (bool): Return a float32 IMAGE in [0, 1] instead of uint8.
+
+    Returns:
+        torch.Tensor: The ``[N, H, W, 3]`` batch.
+
+    Raises:
+        ValueError: If the images differ in size.
+    """
+    if not image_paths:
+        raise ValueError("No images to load.")
+
+    # Only the header is read here
+    with Image.open(image_paths[0]) as first:
+        width, height = first.size
+    batch = torch.empty((len(image_paths), height, width, 3), dtype=torch.uint8)
+    slots = batch.numpy()
+
+    def load(index: int) -> None:
+        with Image.open(image_paths[index]) as img:
+            if img.size != (width, height):
+                raise ValueError(
+                    f"Image {image_paths[index]} is {img.size[0]}x{img.size[1]}, "
+                    f"expected {width}x{height}."
+                )
+            slots[index] = np.asarray(img.convert("RGB"))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Consume the results so decode errors propagate
+        list(executor.map(load, range(len(image_paths))))
+
+    if not as_float:
+        return batch
+    return batch.to(torch.float32).div_(255.0)
+
+
+def encode_image(
+    frame: np.ndarray, fmt: str = "png", compress_level: int = 6, quality: int = 95
+) -> bytes:
+    """Encodes a uint8 ``[H, W, C]`` frame to the bytes of an image file.
+
+    Args:
+        frame (np.ndarray): The uint8 frame.
+        fmt (str): One of ``IMAGE_SAVE_FORMATS``.
+        compress_level (int): zlib level for PNG (0-9).
+        quality (int): Quality for JPEG and lossy WebP (1-100).
+
+    Returns:
+        bytes: The encoded file contents.
+    """
+    if fmt not in IMAGE_SAVE_FORMATS:
+        raise ValueError(f"Unsupported image format: {fmt}")
+
+    buffer = io.BytesIO()
+    if fmt == "npy":
+        np.save(buffer, frame)
+        return buffer.getvalue()
+
+    img = Image.fromarray(frame[..., 0] if frame.shape[-1] == 1 else frame)
+    if fmt == "png":
+        img.save(buffer, "PNG", compress_level=compress_level)
+    elif fmt == "jpeg":
+        img.convert("RGB").save(buffer, "JPEG", quality=quality)
+    elif fmt == "webp":
+        img.save(buffer, "WEBP", quality=quality)
+    else:
+        img.save(buffer, "WEBP", lossless=True)
+    return buffer.getvalue()
+
+
+def save_images(
+    frames: np.ndarray,
+    directory: str,
+    prefix: str,
+    fmt: str = "png",
+    compress_level: int = 6,
+    quality: int = 95,
+    archive: bool = False,
+    workers: Optional[int] = None,
+) -> List[str]:
+    """Encodes and writes a uint8 batch using a bounded thread pool.
+
+    Pillow releases the GIL while compressing, so frames encode in parallel.
+    At most two frames per worker are in flight, and results are consumed
+    in order, so filenames and archive entries follow the batch order.
+
+    Args:
+        frames (np.ndarray): uint8 ``[N, H, W, C]`` batch.
+        directory (str): Destination directory (created if missing).
+        prefix (str): Filename prefix; files are named ``{prefix}_{index:05d}``.
+        fmt (str): One of ``IMAGE_SAVE_FORMATS``.
+        compress_level (int): zlib level for PNG (0-9).
+        quality (int): Quality for JPEG and lossy WebP (1-100).
+        archive (bool): Pack every frame into a single ``{prefix}.tar``
+            written sequentially, instead of one file per frame.
+        workers (int, optional): Number of encoding threads (default: CPU based).
+
+    Returns:
+        list: Paths of the written files, or of the archive.
+    """
+    if fmt not in IMAGE_SAVE_FORMATS:
+        raise ValueError(f"Unsupported image format: {fmt}")
+    os.makedirs(directory, exist_ok=True)
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    names = [f"{prefix}_{i:05d}{IMAGE_SAVE_FORMATS[fmt]}" for i in range(len(frames))]
+
+    def encode(index: int) -> bytes:
+        return encode_image(frames[index], fmt, compress_level, quality)
+
+    def write(index: int) -> str:
+        path = os.path.join(directory, names[index])
+        with open(path, "wb") as f:
+            f.write(encode(index))
+        return path
+
+    if not archive:
+        return list(_bounded_map(write, len(frames), workers))
+
+    archive_path = os.path.join(directory, f"{prefix}.tar")
+    # One large buffered stream instead of thousands of small file writes
+    with open(archive_path, "wb", buffering=1 << 20) as f, tarfile.open(
+        fileobj=f, mode="w"
+    ) as tar:
+        mtime = time.time()
+        for name, data in zip(names, _bounded_map(encode, len(frames), workers)):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = mtime
+            tar.addfile(info, io.BytesIO(data))
+    return [archive_path]
+
+
+def _bounded_map(fn, count: int, workers: int):
+    """Yields ``fn(i)`` for ``i`` in ``range(count)`` in order, with bounded look-ahead."""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for index in range(count):
+            pending.append(executor.submit(fn, index))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def drain_stderr(process: subprocess.Popen) -> Callable[[], str]:
+    """Reads a process's stderr on a background thread, so a chatty ffmpeg cannot
+    block on a full pipe while its stdin or stdout is being serviced.
+
+    Returns:
+        A function that waits for stderr to close and returns all of it, decoded.
+    """
+    chunks = []
+    thread = threading.Thread(target=lambda: chunks.append(process.stderr.read()), daemon=True)
+    thread.start()
+
+    def collect() -> str:
+        thread.join()
+        return b"".join(chunks).decode(errors="replace")
+
+    return collect
+
+
 def getVideoInfo(video_path: str) -> Dict[str, Union[float, int]]:
     """Gets information about a video file.
 
@@ -298,55 +699,22 @@ def getVideoInfo(video_path: str) -> Dict[str, Union[float, int]]:
         dict: A dictionary containing the video's information, or an empty
               dictionary if an error occurred.
     """
-    command = [
-        "ffprobe",
-        "-v",
-        "error",
-        "-select_streams",
-        "v:0",
-        "-show_entries",
-        "stream=avg_frame_rate,duration,width,height",
-        "-of",
-        "json",
-        video_path,
-    ]
-    # 运行ffprobe命令
-    result = subprocess.run(command, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
-    # 将输出转化为字符串
-    output = result.stdout.decode("utf-8").strip()
-
-    if not output:
-        logging.error(f"FFprobe returned empty output for file: {video_path}")
-        return {}
-
+    # Served from the shared probe cache after the first call
     try:
-        data = json.loads(output)
-    except json.JSONDecodeError as e:
-        logging.error(f"Error parsing FFprobe output: {e}\nOutput was: {output}")
+        info = mediainfo.probe(video_path)
+    except (OSError, subprocess.CalledProcessError) as e:
+        logging.error(f"FFprobe failed for file: {video_path}: {e}")
         return {}
-    # 查找视频流信息
-    if "streams" in data and len(data["streams"]) > 0:
-        stream = data["streams"][0]  # 获取第一个视频流
-        fps = stream.get("avg_frame_rate")
-        if fps is not None:
-            # 帧率可能是一个分数形式的字符串，例如 "30/1" 或 "20.233000"
-            if "/" in fps:
-                num, denom = map(int, fps.split("/"))
-                fps = num / denom
-            else:
-                fps = float(fps)  # 直接转换为浮点数
-            width = int(stream.get("width"))
-            height = int(stream.get("height"))
-            duration = float(stream.get("duration"))
-            return_data = {
-                "fps": fps,
-                "width": width,
-                "height": height,
-                "duration": duration,
-            }
-    else:
-        return_data = {}
-    return return_data
+    stream = info.video
+    if stream is None:
+        return {}
+    # Average rate matches the real frame spacing of variable-rate files
+    return {
+        "fps": float(stream.avg_frame_rate or stream.frame_rate),
+        "width": stream.width,
+        "height": stream.height,
+        "duration": stream.duration,
+    }
 
 
 def get_image_size(image_path: str) -> Tuple[int, int]:
@@ -374,21 +742,10 @@ def has_audio(video_path: str) -> bool:
     Returns:
         bool: True if the video has an audio stream, False otherwise.
     """
-    cmd = [
-        "ffprobe",
-        "-v",
-        "error",
-        "-select_streams",
-        "a:0",
-        "-show_entries",
-        "stream=codec_type",
-        "-of",
-        "default=noprint_wrappers=1:nokey=1",
-        video_path,
-    ]
-
-    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    return result.stdout.decode().strip() == "audio"
+    try:
+        return mediainfo.probe(video_path).audio is not None
+    except (OSError, subprocess.CalledProcessError):
+        return False
 
 
 def set_file_name(video_path: str) -> str:
@@ -456,14 +813,7 @@ def get_video_files(directory: str) -> List[str]:
     Returns:
         list: A sorted list of video file paths.
     """
-    video_extensions = video_type()
-    video_files = [
-        os.path.join(directory, f)
-        for f in os.listdir(directory)
-        if f.lower().endswith(video_extensions)
-    ]
-    video_files.sort()
-    return video_files
+    return list_directory(directory, video_type())
 
 
 def get_audio_files(directory: str) -> List[str]:
@@ -475,14 +825,7 @@ def get_audio_files(directory: str) -> List[str]:
     Returns:
         list: A sorted list of audio file paths.
     """
-    audio_extensions = audio_type()
-    audio_files = [
-        os.path.join(directory, f)
-        for f in os.listdir(directory)
-        if f.lower().endswith(audio_extensions)
-    ]
-    audio_files.sort()
-    return audio_files
+    return list_directory(directory, audio_type())
 
 
 def save_image(image: torch.Tensor, path: str) -> None:
@@ -2,13 +2,13 @@ import os
 import subprocess
 import json
 import tempfile
-import numpy as np
-import torch
 from PIL import Image
 from datetime import datetime
 import folder_paths
 from comfy_api.latest import io
 from . import smartcut
+from . import decoder
+from . import mediainfo
 
 
 class LosslessCutV3(io.ComfyNode):
@@ -83,6 +83,11 @@ class LosslessCutV3(io.ComfyNode):
                     default="all",
                     tooltip="Control metadata preservation in output.",
                 ),
+                io.Boolean.Input(
+                    "use_cache",
+                    default=False,
+                    tooltip="Cache decoded screenshot frames on disk so repeat captures skip decoding.",
+                ),
                 # UI-managed inputs (synced from JavaScript)
                 io.String.Input(
                     "segments",
@@ -243,6 +248,7 @@ class LosslessCutV3(io.ComfyNode):
         audio_track_index=-1,
         include_subtitles=False,
         preserve_metadata="all",
+        use_cache=False,
         segments="",
         export_screenshot=False,
         screenshot_time=0.0,
@@ -258,32 +264,17 @@ class LosslessCutV3(io.ComfyNode):
         # Export screenshot if requested (screenshot-only mode)
         if export_screenshot:
             screenshot_path = os.path.join(output_dir, f"screenshot_{timestamp}.jpg")
-            screenshot_cmd = [
-                "ffmpeg",
-                "-y",
-                "-ss",
-                str(screenshot_time),
-                "-i",
-                video,
-                "-vframes",
-                "1",
-                "-q:v",
-                "2",
-                screenshot_path,
-            ]
-            result = subprocess.run(screenshot_cmd, capture_output=True, text=True)
-            if result.returncode == 0 and os.path.exists(screenshot_path):
-                # Load image and convert to torch tensor for ComfyUI
-                try:
-                    img = Image.open(screenshot_path).convert("RGB")
-                    img_array = np.array(img).astype(np.float32) / 255.0
-                    # Convert to torch tensor with batch dimension [B, H, W, C]
-                    screenshot_tensor = torch.from_numpy(img_array).unsqueeze(0)
-                    print(f"[LosslessCut] Screenshot saved: {screenshot_path}")
-                except Exception as e:
-                    print(f"[LosslessCut] Failed to load screenshot as tensor: {e}")
-            else:
-                print(f"[LosslessCut] Screenshot export failed: {result.stderr}")
+            try:
+                # Decode over a rawvideo pipe; with use_cache repeat captures hit the frame cache
+                frames = decoder.decode_frame_at(
+                    video, screenshot_time, use_cache=use_cache
+                )
+                Image.fromarray(frames[0]).save(screenshot_path, quality=95)
+                # Torch tensor with batch dimension [B, H, W, C] for ComfyUI
+                screenshot_tensor = decoder.frames_to_tensor(frames)
+                print(f"[LosslessCut] Screenshot saved: {screenshot_path}")
+            except Exception as e:
+                print(f"[LosslessCut] Screenshot export failed: {e}")
 
             # Return early - screenshot only, no video cut
             return io.NodeOutput("", screenshot_tensor)
@@ -303,23 +294,10 @@ class LosslessCutV3(io.ComfyNode):
         if not segment_list:
             # Handle default out_point (-1 means end of video)
             if out_point <= 0:
-                cmd = [
-                    "ffprobe",
-                    "-v",
-                    "error",
-                    "-select_streams",
-                    "v:0",
-                    "-show_entries",
-                    "stream=duration",
-                    "-of",
-                    "csv=p=0",
-                    video,
-                ]
                 try:
-                    result = subprocess.run(
-                        cmd, capture_output=True, text=True, check=True
-                    )
-                    duration = float(result.stdout.strip())
+                    duration = mediainfo.probe(video).duration
+                    if duration <= 0:
+                        raise ValueError("no duration in container")
                     out_point = duration
                 except Exception as e:
                     print(
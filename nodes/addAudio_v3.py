@@ -1,9 +1,8 @@
 import os
 import subprocess
-import tempfile
-import torchaudio
 import folder_paths
 from comfy_api.latest import io
+from . import encoder
 
 
 class AddAudioV3(io.ComfyNode):
@@ -56,39 +55,21 @@ class AddAudioV3(io.ComfyNode):
              subprocess.run(command, check=True)
              return io.NodeOutput(output_path)
 
-        with tempfile.NamedTemporaryFile(
-            suffix=".wav", delete=False
-        ) as temp_audio_file:
-            temp_name = temp_audio_file.name
-
-        # Save audio to temp file
-        waveform = audio["waveform"]
-        if waveform.dim() == 3:
-            waveform = waveform.squeeze(0)
-            
-        torchaudio.save(temp_name, waveform.cpu(), audio["sample_rate"])
-
-        command = [
-            "ffmpeg",
-            "-y",
-            "-i",
-            video,
-            "-i",
-            temp_name,
-            "-c:v",
-            "copy",
-            "-c:a",
-            "aac",
-            "-shortest",
-            output_path,
-        ]
-
-        try:
+        # Stream the waveform to ffmpeg as raw PCM; no temp WAV is written
+        with encoder.AudioPipe(audio) as audio_pipe:
+            command = [
+                "ffmpeg",
+                "-y",
+                "-i",
+                video,
+                *audio_pipe.input_args(),
+                "-c:v",
+                "copy",
+                "-c:a",
+                "aac",
+                "-shortest",
+                output_path,
+            ]
             subprocess.run(command, check=True)
-        finally:
-            try:
-                os.remove(temp_name)
-            except OSError:
-                pass
 
         return io.NodeOutput(output_path)
@@ -0,0 +1,376 @@
+"""
+Keyframe tables read straight from container indexes.
+
+MP4/MOV files describe every sample of a track in the ``stts`` (decode
+durations), ``ctts`` (composition offsets) and ``stss`` (sync samples) boxes,
+and Matroska/WebM files list keyframe positions in their ``Cues``. Reading
+those tables touches a few kilobytes of the file instead of every packet
+header, so huge files are indexed in milliseconds.
+
+:func:`read_index` returns None whenever a file has no usable index
+(fragmented MP4, complex edit lists, Matroska without cues...), and callers
+fall back to scanning packets with ffprobe.
+"""
+
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+MP4_EXTENSIONS = {".mp4", ".m4v", ".mov", ".3gp", ".3g2", ".m4a"}
+MATROSKA_EXTENSIONS = {".mkv", ".webm", ".mk3d"}
+
+
+class ContainerIndex:
+    """
+    Keyframe timestamps, frame count and duration of the first video track.
+
+    ``pts`` holds the timestamp of every sample when the container lists them
+    all (MP4), and is None when only keyframes are indexed (Matroska cues).
+    """
+
+    __slots__ = ("keyframes", "pts", "key_positions", "frame_count", "duration")
+
+    def __init__(self, keyframes, pts=None, key_positions=None, frame_count=0, duration=0.0):
+        self.keyframes = keyframes
+        self.pts = pts
+        self.key_positions = key_positions
+        self.frame_count = frame_count
+        self.duration = duration
+
+    def __repr__(self) -> str:
+        return (
+            f"<ContainerIndex {len(self.keyframes)} keyframes,"
+            f" {self.frame_count} frames, {self.duration:.3f}s>"
+        )
+
+
+def read_index(path: str) -> Optional[ContainerIndex]:
+    """
+    Read the keyframe index of an MP4/MOV or Matroska/WebM file.
+
+    Returns:
+        The index, or None if the container is not supported or carries no
+        usable index for its first video track.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in MP4_EXTENSIONS and ext not in MATROSKA_EXTENSIONS:
+        return None
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if ext in MP4_EXTENSIONS:
+                    return _read_mp4(buf)
+                return _read_matroska(buf)
+    except (OSError, ValueError, IndexError, struct.error):
+        # Truncated or malformed tables: let the packet scan handle it
+        return None
+
+
+# --- MP4 / MOV ---------------------------------------------------------------
+
+
+def _boxes(buf, start: int, end: int):
+    """Yield ``(type, payload_start, payload_end)`` for the boxes in ``[start, end)``."""
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", buf, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", buf, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            return
+        yield kind, pos + header, pos + size
+        pos += size
+
+
+def _child(buf, start: int, end: int, kind: bytes) -> Optional[Tuple[int, int]]:
+    for found, a, b in _boxes(buf, start, end):
+        if found == kind:
+            return a, b
+    return None
+
+
+def _path(buf, start: int, end: int, *kinds: bytes) -> Optional[Tuple[int, int]]:
+    span = (start, end)
+    for kind in kinds:
+        span = _child(buf, span[0], span[1], kind)
+        if span is None:
+            return None
+    return span
+
+
+def _table(buf, span: Tuple[int, int], header: int, columns: int, dtype: str) -> np.ndarray:
+    """Entries of a full box table as an ``[entry_count, columns]`` array."""
+    start, end = span
+    count = struct.unpack_from(">I", buf, start + header - 4)[0]
+    data = np.frombuffer(buf[start + header : end], dtype=dtype, count=count * columns)
+    return data.reshape(count, columns).astype(np.int64)
+
+
+def _timescale(buf, span: Tuple[int, int]) -> Tuple[int, int]:
+    """``(timescale, duration)`` of an ``mvhd`` or ``mdhd`` box."""
+    start, _ = span
+    if buf[start] == 1:
+        return struct.unpack_from(">IQ", buf, start + 20)
+    return struct.unpack_from(">II", buf, start + 12)
+
+
+def _edit_shift(buf, trak: Tuple[int, int], movie_scale: int, media_scale: int) -> Optional[float]:
+    """
+    Seconds added to every media timestamp by the track's edit list.
+
+    Only an optional leading empty edit followed by one plain edit is
+    supported; anything else returns None.
+    """
+    elst = _path(buf, trak[0], trak[1], b"edts", b"elst")
+    if elst is None:
+        return 0.0
+    version = buf[elst[0]]
+    count = struct.unpack_from(">I", buf, elst[0] + 4)[0]
+    fmt, step = (">Qqi", 20) if version == 1 else (">Iii", 12)
+    edits = [struct.unpack_from(fmt, buf, elst[0] + 8 + i * step) for i in range(count)]
+
+    shift = 0.0
+    if edits and edits[0][1] == -1:
+        shift = edits[0][0] / movie_scale
+        edits = edits[1:]
+    if len(edits) > 1 or (edits and edits[0][2] != 0x10000):
+        return None
+    if edits:
+        shift -= edits[0][1] / media_scale
+    return shift
+
+
+def _read_mp4(buf) -> Optional[ContainerIndex]:
+    top = [kind for kind, _, _ in _boxes(buf, 0, len(buf))]
+    moov = _child(buf, 0, len(buf), b"moov")
+    # Fragmented files keep (most of) their samples in moof boxes, which the
+    # moov sample tables do not describe
+    if moov is None or b"moof" in top or _child(buf, moov[0], moov[1], b"mvex"):
+        return None
+    mvhd = _child(buf, moov[0], moov[1], b"mvhd")
+    movie_scale = _timescale(buf, mvhd)[0] if mvhd else 1000
+
+    for kind, a, b in _boxes(buf, moov[0], moov[1]):
+        if kind != b"trak":
+            continue
+        hdlr = _path(buf, a, b, b"mdia", b"hdlr")
+        if hdlr is None or buf[hdlr[0] + 8 : hdlr[0] + 12] != b"vide":
+            continue
+        return _read_mp4_track(buf, (a, b), movie_scale)
+    return None
+
+
+def _read_mp4_track(buf, trak: Tuple[int, int], movie_scale: int) -> Optional[ContainerIndex]:
+    mdhd = _path(buf, trak[0], trak[1], b"mdia", b"mdhd")
+    stbl = _path(buf, trak[0], trak[1], b"mdia", b"minf", b"stbl")
+    if mdhd is None or stbl is None:
+        return None
+    timescale, media_duration = _timescale(buf, mdhd)
+    shift = _edit_shift(buf, trak, movie_scale, timescale)
+    stts = _child(buf, stbl[0], stbl[1], b"stts")
+    if not timescale or shift is None or stts is None:
+        return None
+
+    durations = _table(buf, stts, 8, 2, ">u4")
+    dts_steps = np.repeat(durations[:, 1], durations[:, 0])
+    count = len(dts_steps)
+    if count == 0:
+        return None
+    dts = np.concatenate(([0], np.cumsum(dts_steps[:-1])))
+
+    ctts = _child(buf, stbl[0], stbl[1], b"ctts")
+    if ctts is not None:
+        offsets = _table(buf, ctts, 8, 2, ">i4")
+        dts = dts + np.repeat(offsets[:, 1], offsets[:, 0])[:count]
+
+    stss = _child(buf, stbl[0], stbl[1], b"stss")
+    is_key = np.zeros(count, dtype=bool) if stss is not None else np.ones(count, dtype=bool)
+    if stss is not None:
+        samples = _table(buf, stss, 8, 1, ">u4")[:, 0] - 1
+        is_key[samples[(samples >= 0) & (samples < count)]] = True
+
+    # Microsecond precision, as printed by ffprobe
+    pts = np.round(dts / timescale + shift, 6)
+    order = np.argsort(pts, kind="stable")
+    pts = pts[order]
+    key_positions = np.flatnonzero(is_key[order]).astype(np.int64)
+    return ContainerIndex(
+        pts[key_positions],
+        pts=pts,
+        key_positions=key_positions,
+        frame_count=count,
+        duration=media_duration / timescale,
+    )
+
+
+# --- Matroska / WebM ---------------------------------------------------------
+
+EBML_HEADER = 0x1A45DFA3
+SEGMENT = 0x18538067
+SEEK_HEAD = 0x114D9B74
+SEEK = 0x4DBB
+SEEK_ID = 0x53AB
+SEEK_POSITION = 0x53AC
+INFO = 0x1549A966
+TIMESTAMP_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_NUMBER = 0xD7
+TRACK_TYPE = 0x83
+DEFAULT_DURATION = 0x23E383
+CUES = 0x1C53BB6B
+CUE_POINT = 0xBB
+CUE_TIME = 0xB3
+CUE_TRACK_POSITIONS = 0xB7
+CUE_TRACK = 0xF7
+UNKNOWN_SIZE = -1
+
+
+def _vint(buf, pos: int, keep_marker: bool) -> Tuple[int, int]:
+    """Decode an EBML variable-length integer; returns ``(value, next_pos)``."""
+    first = buf[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ValueError("Invalid EBML variable-length integer")
+    value = first if keep_marker else first & (mask - 1)
+    all_ones = value == mask - 1
+    for i in range(1, length):
+        byte = buf[pos + i]
+        value = (value << 8) | byte
+        all_ones = all_ones and byte == 0xFF
+    if not keep_marker and all_ones:
+        return UNKNOWN_SIZE, pos + length
+    return value, pos + length
+
+
+def _elements(buf, start: int, end: int):
+    """Yield ``(id, data_start, data_end)``; unknown sizes extend to ``end``."""
+    pos = start
+    while pos < end:
+        element_id, pos = _vint(buf, pos, True)
+        size, pos = _vint(buf, pos, False)
+        data_end = end if size == UNKNOWN_SIZE else pos + size
+        if data_end > end:
+            return
+        yield element_id, pos, data_end
+        if size == UNKNOWN_SIZE:
+            return
+        pos = data_end
+
+
+def _uint(buf, start: int, end: int) -> int:
+    return int.from_bytes(buf[start:end], "big")
+
+
+def _float(buf, start: int, end: int) -> float:
+    if end - start == 4:
+        return struct.unpack_from(">f", buf, start)[0]
+    if end - start == 8:
+        return struct.unpack_from(">d", buf, start)[0]
+    return 0.0
+
+
+def _element_at(buf, pos: int, end: int) -> Optional[Tuple[int, int, int]]:
+    for element in _elements(buf, pos, end):
+        return element
+    return None
+
+
+def _segment_children(buf, segment: Tuple[int, int]) -> Dict[int, Tuple[int, int]]:
+    """Locate the top-level Info, Tracks and Cues elements of a segment."""
+    start, end = segment
+    found: Dict[int, Tuple[int, int]] = {}
+    wanted = (INFO, TRACKS, CUES)
+    # Walk the top level; Clusters are skipped by size, which is cheap
+    for element_id, a, b in _elements(buf, start, end):
+        if element_id == SEEK_HEAD:
+            # Cues usually sit after the clusters; the seek head points at them
+            for seek_id, sa, sb in _elements(buf, a, b):
+                if seek_id != SEEK:
+                    continue
+                target = position = None
+                for child_id, ca, cb in _elements(buf, sa, sb):
+                    if child_id == SEEK_ID:
+                        target = _uint(buf, ca, cb)
+                    elif child_id == SEEK_POSITION:
+                        position = _uint(buf, ca, cb)
+                if target in wanted and target not in found and position is not None:
+                    element = _element_at(buf, start + position, end)
+                    if element is not None and element[0] == target:
+                        found[target] = element[1:]
+        elif element_id in wanted and element_id not in found:
+            found[element_id] = (a, b)
+        if all(w in found for w in wanted):
+            break
+    return found
+
+
+def _read_matroska(buf) -> Optional[ContainerIndex]:
+    header = _element_at(buf, 0, len(buf))
+    if header is None or header[0] != EBML_HEADER:
+        return None
+    segment = _element_at(buf, header[2], len(buf))
+    if segment is None or segment[0] != SEGMENT:
+        return None
+    children = _segment_children(buf, segment[1:])
+    if TRACKS not in children or CUES not in children:
+        return None
+
+    scale = 1000000
+    duration = 0.0
+    if INFO in children:
+        for element_id, a, b in _elements(buf, *children[INFO]):
+            if element_id == TIMESTAMP_SCALE:
+                scale = _uint(buf, a, b)
+            elif element_id == DURATION:
+                duration = _float(buf, a, b)
+
+    track = frame_duration = None
+    for element_id, a, b in _elements(buf, *children[TRACKS]):
+        if element_id != TRACK_ENTRY:
+            continue
+        fields = {child_id: (ca, cb) for child_id, ca, cb in _elements(buf, a, b)}
+        if TRACK_TYPE in fields and _uint(buf, *fields[TRACK_TYPE]) == 1:
+            track = _uint(buf, *fields[TRACK_NUMBER]) if TRACK_NUMBER in fields else None
+            if DEFAULT_DURATION in fields:
+                frame_duration = _uint(buf, *fields[DEFAULT_DURATION])
+            break
+    if track is None:
+        return None
+
+    times: List[int] = []
+    for element_id, a, b in _elements(buf, *children[CUES]):
+        if element_id != CUE_POINT:
+            continue
+        time = None
+        tracks = []
+        for child_id, ca, cb in _elements(buf, a, b):
+            if child_id == CUE_TIME:
+                time = _uint(buf, ca, cb)
+            elif child_id == CUE_TRACK_POSITIONS:
+                for pos_id, pa, pb in _elements(buf, ca, cb):
+                    if pos_id == CUE_TRACK:
+                        tracks.append(_uint(buf, pa, pb))
+        if time is not None and track in tracks:
+            times.append(time)
+    if not times:
+        return None
+
+    keyframes = np.unique(np.asarray(times, dtype=np.float64)) * scale / 1e9
+    seconds = duration * scale / 1e9
+    frame_count = int(round(seconds * 1e9 / frame_duration)) if frame_duration else 0
+    return ContainerIndex(np.round(keyframes, 6), frame_count=frame_count, duration=seconds)
@@ -0,0 +1,1061 @@
+"""
+Raw-video decode helper module for frame extraction nodes.
+
+Frames are read from ffmpeg's stdout as packed ``rgb24`` straight into a
+preallocated ``[N, H, W, 3]`` uint8 buffer, so no intermediate image files are
+written and the float conversion happens once on the whole batch.
+"""
+
+import bisect
+import os
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import torch
+
+from . import framecache
+from . import mediainfo
+from . import smartcut
+
+try:
+    from ..func import drain_stderr
+except ImportError:
+    from func import drain_stderr
+
+# Points closer together than this (on average) are decoded in a single pass
+DENSE_GAP_SECONDS = 1.0
+# Upper bound on inputs opened by one multi-seek ffmpeg process
+MAX_SEEK_INPUTS = 32
+# Decoder option discarding every frame that is not a keyframe
+SKIP_NONKEY = ["-skip_frame", "nokey"]
+# swscale algorithms selectable for resizing ("bicubic" is ffmpeg's default)
+SCALERS = ["bicubic", "fast_bilinear", "bilinear", "lanczos", "area", "neighbor"]
+# Raw pixel formats the pipe can carry, with their bytes per pixel
+PIX_FMT_CHANNELS = {"rgb24": 3, "gray": 1}
+# How an extraction over its memory budget is brought back under it
+BUDGET_FITS = ["stride", "downscale", "refuse"]
+# Narrowest frame the memory budget may downscale to
+MIN_BUDGET_WIDTH = 64
+
+_SHOWINFO_PTS = re.compile(r"Parsed_showinfo.*\bn:\s*\d+\s+pts:\s*\S+\s+pts_time:(\S+)")
+
+
+def probe_video(video_path: str) -> Dict[str, Union[float, int]]:
+    """
+    Probe the first video stream of a file.
+
+    Width and height are reported as displayed, i.e. swapped for streams
+    carrying a 90/270 degree rotation, because ffmpeg auto-rotates on decode.
+
+    Args:
+        video_path: Path to the video file.
+
+    Returns:
+        Dict with ``width``, ``height``, ``fps``, ``duration`` and
+        ``nb_frames`` (0 when the container does not store it).
+    """
+    stream = mediainfo.probe_video_stream(video_path)
+    width, height = stream.display_size
+    return {
+        "width": width,
+        "height": height,
+        "fps": float(stream.frame_rate),
+        "duration": stream.duration,
+        "nb_frames": stream.nb_frames,
+    }
+
+
+def output_size(width: int, height: int, max_width: int = 0) -> Tuple[int, int]:
+    """
+    Compute the decoded frame size for an optional maximum width.
+
+    Mirrors ffmpeg's ``scale=max_width:-1`` so the pipe geometry is known
+    before decoding starts.
+    """
+    if max_width > 0 and width > max_width:
+        return max_width, max(1, int(round(height * max_width / width)))
+    return width, height
+
+
+def parse_crop(crop: str, width: int, height: int) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Parse a crop spec into a ``(w, h, x, y)`` box inside a ``width`` x ``height`` frame.
+
+    Accepts ``"square"`` (largest centered square) or ffmpeg-style
+    ``"w:h[:x:y]"`` in pixels, centered when the offset is omitted.
+    Returns None for an empty spec.
+    """
+    crop = (crop or "").strip().lower()
+    if not crop:
+        return None
+    if crop == "square":
+        side = min(width, height)
+        return side, side, (width - side) // 2, (height - side) // 2
+
+    try:
+        parts = [int(p) for p in crop.split(":")]
+    except ValueError:
+        raise ValueError(f"Invalid crop: {crop}")
+    if len(parts) not in (2, 4):
+        raise ValueError(f"Invalid crop: {crop} (expected w:h or w:h:x:y)")
+    w, h = parts[:2]
+    x, y = parts[2:] if len(parts) == 4 else ((width - w) // 2, (height - h) // 2)
+    if w <= 0 or h <= 0 or x < 0 or y < 0 or x + w > width or y + h > height:
+        raise ValueError(f"Crop {crop} does not fit the {width}x{height} frame.")
+    return w, h, x, y
+
+
+def output_filters(
+    info: Dict[str, Union[float, int]],
+    max_width: int = 0,
+    crop: str = "",
+    width: int = 0,
+    height: int = 0,
+    scaler: str = "",
+    pix_fmt: str = "rgb24",
+) -> Tuple[List[str], int, int, int]:
+    """
+    Build the crop/scale part of the filter chain and the resulting pipe geometry.
+
+    Cropping and resizing run inside ffmpeg so the pipe only carries the
+    pixels that are kept. A single target dimension preserves the aspect
+    ratio of the (cropped) frame; ``max_width`` then caps the result.
+
+    Args:
+        info: Result of :func:`probe_video`.
+        max_width: Downscale frames wider than this (0 for no cap).
+        crop: Crop spec, see :func:`parse_crop`.
+        width: Target width (0 to derive from ``height`` or keep).
+        height: Target height (0 to derive from ``width`` or keep).
+        scaler: swscale algorithm from :data:`SCALERS` ("" for ffmpeg's default).
+        pix_fmt: Raw output format from :data:`PIX_FMT_CHANNELS`.
+
+    Returns:
+        Tuple of ``(filters, out_width, out_height, channels)``.
+    """
+    if pix_fmt not in PIX_FMT_CHANNELS:
+        raise ValueError(f"Unsupported pix_fmt: {pix_fmt}")
+    if scaler and scaler not in SCALERS:
+        raise ValueError(f"Unsupported scaler: {scaler}")
+
+    filters = []
+    src_w, src_h = info["width"], info["height"]
+    box = parse_crop(crop, src_w, src_h)
+    if box is not None:
+        filters.append("crop={}:{}:{}:{}".format(*box))
+        src_w, src_h = box[0], box[1]
+
+    if width > 0 and height > 0:
+        out_w, out_h = width, height
+    elif width > 0:
+        out_w, out_h = width, max(1, int(round(src_h * width / src_w)))
+    elif height > 0:
+        out_w, out_h = max(1, int(round(src_w * height / src_h))), height
+    else:
+        out_w, out_h = src_w, src_h
+    out_w, out_h = output_size(out_w, out_h, max_width)
+
+    if (out_w, out_h) != (src_w, src_h):
+        scale = f"scale={out_w}:{out_h}"
+        if scaler:
+            scale += f":flags={scaler}"
+        filters.append(scale)
+    return filters, out_w, out_h, PIX_FMT_CHANNELS[pix_fmt]
+
+
+def estimate_frame_count(info: Dict[str, Union[float, int]]) -> int:
+    """Best-effort frame count used to size the preallocated buffer."""
+    if info.get("nb_frames"):
+        return int(info["nb_frames"])
+    return int(round(info.get("duration", 0.0) * info.get("fps", 0.0)))
+
+
+def _read_exact(stream, view: memoryview) -> int:
+    """Fill ``view`` from ``stream``; returns the byte count read (short on EOF)."""
+    total = 0
+    size = len(view)
+    while total < size:
+        n = stream.readinto(view[total:])
+        if not n:
+            break
+        total += n
+    return total
+
+
+def read_frames(
+    cmd: List[str],
+    width: int,
+    height: int,
+    expected_frames: int = 0,
+    channels: int = 3,
+    log: Optional[List[str]] = None,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Run an ffmpeg command writing rawvideo to stdout and collect its frames.
+
+    Frames are read directly into a preallocated uint8 buffer sized from
+    ``expected_frames``; the buffer only grows if the estimate was too low.
+
+    Args:
+        cmd: Full ffmpeg command line ending in a ``pipe:1`` rawvideo output.
+        width: Output frame width.
+        height: Output frame height.
+        expected_frames: Estimated number of frames (0 if unknown).
+        channels: Bytes per pixel of the output pix_fmt.
+        log: If given, receives ffmpeg's stderr lines.
+        out: Caller-owned ``[N, H, W, C]`` buffer (e.g. a slice of a larger
+            batch) to fill instead; frames beyond its length are discarded.
+
+    Returns:
+        A ``[N, H, W, C]`` uint8 array (a view of ``out`` if given).
+    """
+    if out is not None:
+        buffer = out
+        capacity = len(out)
+    else:
+        capacity = max(int(expected_frames), 1)
+        buffer = np.empty((capacity, height, width, channels), dtype=np.uint8)
+
+    process = subprocess.Popen(
+        cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    collect_stderr = drain_stderr(process)
+
+    count = 0
+    try:
+        while True:
+            if count == capacity and out is not None:
+                # Let ffmpeg finish cleanly rather than die on a closed pipe
+                process.stdout.read()
+                break
+            if count == capacity:
+                capacity = capacity + max(capacity // 2, 16)
+                grown = np.empty((capacity, height, width, channels), dtype=np.uint8)
+                grown[:count] = buffer[:count]
+                buffer = grown
+            view = memoryview(buffer[count]).cast("B")
+            if _read_exact(process.stdout, view) < len(view):
+                break
+            count += 1
+    finally:
+        process.stdout.close()
+        process.wait()
+        stderr = collect_stderr()
+
+    if process.returncode != 0:
+        raise RuntimeError(f"FFmpeg decode failed: {stderr}")
+    if log is not None:
+        log.extend(stderr.splitlines())
+
+    return buffer[:count]
+
+
+def select_range(
+    info: Dict[str, Union[float, int]],
+    start_time: float = 0.0,
+    end_time: float = 0.0,
+    start_frame: int = 0,
+    frame_count: int = 0,
+    stride: int = 1,
+    rate: float = 0.0,
+) -> Dict[str, Union[float, int]]:
+    """
+    Resolve time/frame range arguments into seek and selection parameters.
+
+    ``start_frame`` takes precedence over ``start_time``. The range ends at
+    ``end_time`` (0 = end of file) or after ``frame_count`` source frames,
+    whichever comes first. ``stride`` keeps every n-th frame of the range,
+    counted after resampling to ``rate`` if one is given.
+
+    Args:
+        info: Result of :func:`probe_video`.
+        start_time: Range start in seconds.
+        end_time: Range end in seconds (0 for end of file).
+        start_frame: Range start as a source frame index.
+        frame_count: Number of source frames in the range (0 for no limit).
+        stride: Keep every n-th frame.
+        rate: Output frame rate the range is resampled to (0 keeps the source rate).
+
+    Returns:
+        Dict with ``seek`` (input ``-ss``), ``duration`` (input ``-t``, 0 for
+        none), ``max_frames`` (output frame cap, 0 for none), ``stride`` and
+        ``expected`` (estimated output frame count).
+    """
+    fps = info.get("fps", 0.0)
+    total = info.get("duration", 0.0)
+    stride = max(int(stride), 1)
+
+    if start_frame > 0:
+        if fps <= 0:
+            raise ValueError("start_frame requires a video with a known frame rate.")
+        # Half a frame early so float rounding never skips the requested frame
+        start = (start_frame - 0.5) / fps
+    else:
+        start = max(float(start_time), 0.0)
+
+    duration = 0.0
+    if end_time > 0:
+        if end_time <= start:
+            raise ValueError("end_time must be greater than the start of the range.")
+        duration = end_time - start
+    if frame_count > 0 and fps > 0:
+        frames_duration = frame_count / fps
+        duration = min(duration, frames_duration) if duration else frames_duration
+
+    if duration:
+        range_frames = duration * fps
+    else:
+        range_frames = max(total - start, 0.0) * fps if total else estimate_frame_count(info)
+    if frame_count > 0:
+        range_frames = min(range_frames, frame_count) if range_frames else frame_count
+
+    max_frames = -(-int(frame_count) // stride) if frame_count > 0 else 0
+    if rate > 0 and fps > 0:
+        # Same span of time, counted in resampled frames
+        range_frames = range_frames * rate / fps
+        if frame_count > 0:
+            max_frames = int(np.ceil(frame_count * rate / fps / stride - 1e-6))
+    return {
+        "seek": start,
+        "duration": duration,
+        "max_frames": max_frames,
+        "stride": stride,
+        "expected": int(-(-round(range_frames) // stride)),
+    }
+
+
+def frame_bytes(width: int, height: int, channels: int = 3) -> int:
+    """Peak memory per extracted frame: the uint8 decode buffer plus the float32 RGB IMAGE."""
+    return width * height * (channels + 3 * 4)
+
+
+def fit_budget(
+    info: Dict[str, Union[float, int]],
+    selection: Dict,
+    output: Dict,
+    max_width: int = 0,
+    rate: float = 0.0,
+    max_bytes: int = 0,
+    max_frames: int = 0,
+    fit: str = "stride",
+    keyframes: Optional[List[float]] = None,
+) -> Dict[str, int]:
+    """
+    Pick a stride and width that keep an extraction within a frame/memory budget.
+
+    Uses only probe data, so an extraction that cannot fit is refused before
+    anything is decoded. ``max_frames`` is always met by raising the stride;
+    ``max_bytes`` is met according to ``fit``: ``"stride"`` drops frames,
+    ``"downscale"`` lowers the width (not below :data:`MIN_BUDGET_WIDTH`) and
+    ``"refuse"`` raises.
+
+    Args:
+        info: Result of :func:`probe_video`.
+        selection: Range arguments for :func:`select_range`.
+        output: Crop/size/format arguments for :func:`output_filters`.
+        max_width: Requested width cap.
+        rate: Output frame rate (0 for the source rate).
+        max_bytes: Memory budget in bytes (0 for none), see :func:`frame_bytes`.
+        max_frames: Frame count budget (0 for none).
+        fit: One of :data:`BUDGET_FITS`.
+        keyframes: Sorted keyframe timestamps for a keyframes-only extraction
+            (see :func:`decode_keyframes`); the stride then counts keyframes.
+
+    Returns:
+        Dict with the chosen ``stride`` and ``max_width`` and the resulting
+        ``frames``, ``width``, ``height`` and ``bytes`` estimates.
+
+    Raises:
+        ValueError: If the budget cannot be met.
+    """
+    if fit not in BUDGET_FITS:
+        raise ValueError(f"Unsupported budget fit: {fit}")
+
+    in_range = 0
+    if keyframes is not None:
+        sel = select_range(info, **{**selection, "stride": 1})
+        end = sel["seek"] + sel["duration"] if sel["duration"] else np.inf
+        times = np.asarray(keyframes, dtype=np.float64)
+        in_range = int(np.count_nonzero((times >= sel["seek"] - 1e-3) & (times < end)))
+
+    def estimate(stride, max_width):
+        if keyframes is not None:
+            expected = -(-in_range // stride)
+        else:
+            expected = select_range(
+                info, **{**selection, "stride": stride}, rate=rate
+            )["expected"]
+        _, width, height, channels = output_filters(info, max_width, **output)
+        return expected, width, height, frame_bytes(width, height, channels)
+
+    stride = max(int(selection.get("stride", 1)), 1)
+    # Frames in the range before striding
+    total = estimate(1, max_width)[0]
+
+    if max_frames > 0 and total > max_frames * stride:
+        stride = -(-total // max_frames)
+    frames, width, height, per_frame = estimate(stride, max_width)
+
+    if max_bytes > 0 and frames * per_frame > max_bytes:
+        needed_mb = frames * per_frame / 1024**2
+        budget_mb = max_bytes / 1024**2
+        if fit == "refuse":
+            raise ValueError(
+                f"Extraction needs about {needed_mb:.0f} MB "
+                f"({frames} frames at {width}x{height}), over the {budget_mb:.0f} MB budget."
+            )
+        if fit == "stride":
+            allowed = max_bytes // per_frame
+            if allowed < 1:
+                raise ValueError(
+                    f"A single {width}x{height} frame exceeds the {budget_mb:.0f} MB budget."
+                )
+            stride = max(stride, -(-total // allowed))
+        else:
+            # Area shrinks with the square of the width
+            while frames * per_frame > max_bytes:
+                scale = (max_bytes / (frames * per_frame)) ** 0.5
+                max_width = min(int(width * scale), width - 1)
+                if max_width < MIN_BUDGET_WIDTH:
+                    raise ValueError(
+                        f"Extraction needs about {needed_mb:.0f} MB ({frames} frames) and "
+                        f"cannot fit the {budget_mb:.0f} MB budget above "
+                        f"{MIN_BUDGET_WIDTH} px wide."
+                    )
+                frames, width, height, per_frame = estimate(stride, max_width)
+        frames, width, height, per_frame = estimate(stride, max_width)
+
+    return {
+        "stride": stride,
+        "max_width": max_width,
+        "frames": frames,
+        "width": width,
+        "height": height,
+        "bytes": frames * per_frame,
+    }
+
+
+def build_decode_command(
+    video_path: str,
+    filters: Optional[List[str]] = None,
+    seek: float = 0.0,
+    duration: float = 0.0,
+    max_frames: int = 0,
+    input_args: Optional[List[str]] = None,
+    loglevel: str = "error",
+    pix_fmt: str = "rgb24",
+) -> List[str]:
+    """
+    Build an ffmpeg command decoding the first video stream to raw ``pix_fmt`` on stdout.
+
+    ``seek`` and ``duration`` are applied as input options so ffmpeg jumps to
+    the nearest keyframe and stops reading at the end of the range.
+    ``input_args`` are extra input/decoder options such as ``-skip_frame``.
+    """
+    cmd = ["ffmpeg", "-hide_banner", "-v", loglevel, "-nostdin"]
+    if input_args:
+        cmd.extend(input_args)
+    if seek > 0:
+        cmd.extend(["-ss", f"{seek:.6f}"])
+    if duration > 0:
+        cmd.extend(["-t", f"{duration:.6f}"])
+    cmd.extend(["-i", video_path, "-map", "0:v:0"])
+    if filters:
+        cmd.extend(["-vf", ",".join(filters)])
+    if max_frames > 0:
+        cmd.extend(["-frames:v", str(max_frames)])
+    # Never duplicate frames to pad a constant rate; we want exactly the selection
+    cmd.extend(["-vsync", "passthrough"])
+    cmd.extend(["-f", "rawvideo", "-pix_fmt", pix_fmt, "pipe:1"])
+    return cmd
+
+
+def decode_video(
+    video_path: str,
+    info: Optional[Dict[str, Union[float, int]]] = None,
+    max_width: int = 0,
+    start_time: float = 0.0,
+    end_time: float = 0.0,
+    start_frame: int = 0,
+    frame_count: int = 0,
+    stride: int = 1,
+    use_cache: bool = False,
+    crop: str = "",
+    width: int = 0,
+    height: int = 0,
+    scaler: str = "",
+    pix_fmt: str = "rgb24",
+    rate: float = 0.0,
+    workers: int = 1,
+) -> np.ndarray:
+    """
+    Decode the selected frames of a video into a ``[N, H, W, C]`` uint8 array.
+
+    Args:
+        video_path: Path to the video file.
+        info: Result of :func:`probe_video`, probed if omitted.
+        max_width: Downscale frames wider than this (0 keeps the original size).
+        start_time, end_time, start_frame, frame_count, stride: Range
+            selection, see :func:`select_range`.
+        use_cache: Serve repeat decodes from the persistent frame cache.
+        crop, width, height, scaler, pix_fmt: Decode-time crop, resize and
+            output format, see :func:`output_filters`.
+        rate: Resample to this frame rate before striding (0 keeps the source rate).
+        workers: Parallel decoders over keyframe-aligned chunks, see
+            :func:`split_at_keyframes` (1 for a single process, 0 for one per
+            CPU core). Not used together with ``rate``.
+
+    Returns:
+        The decoded frames as uint8 (a read-only memmap on cache hits), with
+        ``C`` = 3 for rgb24 and 1 for gray.
+    """
+    if info is None:
+        info = probe_video(video_path)
+
+    selection = select_range(
+        info, start_time, end_time, start_frame, frame_count, stride, rate
+    )
+    geometry, out_w, out_h, channels = output_filters(
+        info, max_width, crop, width, height, scaler, pix_fmt
+    )
+
+    # Drop frames first so crop and scale only run on the ones that are kept
+    filters = []
+    if rate > 0:
+        filters.append(f"fps={rate:g}")
+    if selection["stride"] > 1:
+        filters.append(f"select=not(mod(n\\,{selection['stride']}))")
+    filters.extend(geometry)
+
+    cmd = build_decode_command(
+        video_path,
+        filters,
+        seek=selection["seek"],
+        duration=selection["duration"],
+        max_frames=selection["max_frames"],
+        pix_fmt=pix_fmt,
+    )
+
+    chunked = None
+    workers = workers if workers > 0 else os.cpu_count() or 1
+    if workers > 1 and rate <= 0:
+        # Same frames as ``cmd``, so both share one cache entry
+        end = selection["seek"] + selection["duration"] if selection["duration"] else 0.0
+
+        def chunked():
+            return _decode_chunked(
+                video_path,
+                cmd,
+                (selection["seek"], end, selection["stride"]),
+                geometry,
+                (out_w, out_h, channels, pix_fmt),
+                workers,
+            )
+
+    return _run(
+        video_path,
+        cmd,
+        out_w,
+        out_h,
+        selection["expected"],
+        use_cache,
+        channels,
+        chunked,
+    )
+
+
+def split_at_keyframes(
+    packets: List[Tuple[float, bool]],
+    start: float,
+    end: float,
+    chunks: int,
+) -> List[Tuple[int, int, float]]:
+    """
+    Split the frames of ``[start, end)`` into up to ``chunks`` keyframe-aligned runs.
+
+    Every run after the first begins on a keyframe, so it can be decoded by
+    an independent ffmpeg process without touching the previous GOP.
+
+    Args:
+        packets: Result of :func:`smartcut.scan_packets`.
+        start: Range start in seconds.
+        end: Range end in seconds (0 for end of file).
+        chunks: Desired number of runs.
+
+    Returns:
+        ``(first_index, frame_count, start_pts)`` per run, where
+        ``first_index`` counts frames from the start of the range.
+    """
+    times = [
+        (pts, key)
+        for pts, key in packets
+        if pts >= start - 1e-6 and (end <= 0 or pts < end - 1e-6)
+    ]
+    keys = [i for i, (_, key) in enumerate(times) if key and i > 0]
+
+    bounds = [0]
+    for c in range(1, chunks):
+        # Keyframe closest to an even share of the frames
+        ideal = c * len(times) / chunks
+        pos = bisect.bisect_left(keys, ideal)
+        near = [keys[j] for j in (pos - 1, pos) if 0 <= j < len(keys)]
+        if near:
+            split = min(near, key=lambda i: abs(i - ideal))
+            if split > bounds[-1]:
+                bounds.append(split)
+    bounds.append(len(times))
+
+    return [
+        (a, b - a, times[a][0])
+        for a, b in zip(bounds, bounds[1:])
+        if b > a
+    ]
+
+
+def _decode_chunked(
+    video_path: str,
+    cmd: List[str],
+    span: Tuple[float, float, int],
+    filters: List[str],
+    geometry: Tuple[int, int, int, str],
+    workers: int,
+) -> np.ndarray:
+    """
+    Decode a range with parallel ffmpeg processes on keyframe-aligned chunks.
+
+    Each process writes straight into its slice of one preallocated batch.
+    Falls back to the single-process ``cmd`` if the range cannot be split or
+    a chunk yields fewer frames than its packets promised.
+    """
+    start, end, stride = span
+    width, height, channels, pix_fmt = geometry
+    runs = split_at_keyframes(smartcut.scan_packets(video_path), start, end, workers)
+    if len(runs) < 2:
+        return read_frames(cmd, width, height, 0, channels)
+
+    threads = ["-threads", str(max((os.cpu_count() or 1) // len(runs), 1))]
+    jobs = []
+    for first, count, pts in runs:
+        # Global frame indices kept by the stride, and where they land in the batch
+        offset = -(-first // stride)
+        kept = len(range(offset * stride, first + count, stride))
+        if not kept:
+            continue
+        chain = []
+        if first == 0:
+            seek, input_args = start, threads
+        else:
+            # Land on the keyframe itself; copyts lets select drop any open-GOP
+            # leading frames that sort before it
+            seek = pts + 1e-6
+            input_args = threads + ["-noaccurate_seek", "-copyts"]
+            chain.append(f"select=gte(t\\,{pts - 1e-4:.6f})")
+        if stride > 1:
+            chain.append(f"select=not(mod(n+{first % stride}\\,{stride}))")
+        chunk_cmd = build_decode_command(
+            video_path,
+            chain + filters,
+            seek=seek,
+            max_frames=kept,
+            input_args=input_args,
+            pix_fmt=pix_fmt,
+        )
+        jobs.append((chunk_cmd, offset, kept))
+
+    total = sum(kept for _, _, kept in jobs)
+    frames = np.empty((total, height, width, channels), dtype=np.uint8)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                read_frames,
+                chunk_cmd,
+                width,
+                height,
+                kept,
+                channels,
+                out=frames[offset : offset + kept],
+            )
+            for chunk_cmd, offset, kept in jobs
+        ]
+        counts = [len(future.result()) for future in futures]
+
+    if all(n == kept for n, (_, _, kept) in zip(counts, jobs)):
+        return frames
+    # A chunk came up short, which would leave a hole mid-range; decode serially
+    print("[Decoder] A parallel chunk came up short; decoding the range in one pass")
+    return read_frames(cmd, width, height, total, channels)
+
+
+def _run(
+    video_path: str,
+    cmd: List[str],
+    width: int,
+    height: int,
+    expected_frames: int,
+    use_cache: bool,
+    channels: int = 3,
+    decode: Optional[Callable[[], np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    Run a decode command, optionally through the persistent frame cache.
+
+    ``decode`` replaces running ``cmd`` directly when it produces the same
+    frames another way; ``cmd`` then only keys the cache.
+    """
+
+    def run_cmd():
+        return read_frames(cmd, width, height, expected_frames, channels)
+
+    decode = decode or run_cmd
+    if not use_cache:
+        return decode()
+    return framecache.load_or_decode(video_path, cmd + [f"{width}x{height}"], decode)
+
+
+def parse_timestamp(timestamp: Union[str, float, int]) -> float:
+    """Parse ``HH:MM:SS(.ms)``, ``MM:SS`` or plain seconds into seconds."""
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    seconds = 0.0
+    try:
+        for part in str(timestamp).strip().split(":"):
+            seconds = seconds * 60 + float(part)
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {timestamp}")
+    return seconds
+
+
+def evenly_spaced_timestamps(duration: float, count: int) -> List[float]:
+    """Midpoints of ``count`` equal slices of ``duration`` (avoids black first/last frames)."""
+    if count <= 0 or duration <= 0:
+        return []
+    return [duration * (i + 0.5) / count for i in range(count)]
+
+
+def _build_seek_command(
+    video_path: str,
+    seeks: List[float],
+    filters: List[str],
+    input_args: Optional[List[str]] = None,
+    pix_fmt: str = "rgb24",
+) -> List[str]:
+    """
+    One ffmpeg process seeking each point as its own input.
+
+    Every input is seeked on the input side (keyframe jump plus a short
+    decode), trimmed to a single frame, and the results are concatenated
+    onto one rawvideo pipe.
+    """
+    if len(seeks) == 1:
+        return build_decode_command(
+            video_path,
+            filters,
+            seek=seeks[0],
+            max_frames=1,
+            input_args=input_args,
+            pix_fmt=pix_fmt,
+        )
+
+    cmd = ["ffmpeg", "-v", "error", "-nostdin"]
+    chains = []
+    for i, seek in enumerate(seeks):
+        if input_args:
+            cmd.extend(input_args)
+        if seek > 0:
+            cmd.extend(["-ss", f"{seek:.6f}"])
+        cmd.extend(["-i", video_path])
+        chain = ",".join(["trim=end_frame=1", "setpts=PTS-STARTPTS"] + filters)
+        chains.append(f"[{i}:v:0]{chain}[v{i}]")
+    labels = "".join(f"[v{i}]" for i in range(len(seeks)))
+    graph = ";".join(chains) + f";{labels}concat=n={len(seeks)}:v=1:a=0[out]"
+    cmd.extend(["-filter_complex", graph, "-map", "[out]", "-vsync", "passthrough"])
+    cmd.extend(["-f", "rawvideo", "-pix_fmt", pix_fmt, "pipe:1"])
+    return cmd
+
+
+def decode_frames_at(
+    video_path: str,
+    timestamps: List[Union[str, float]],
+    info: Optional[Dict[str, Union[float, int]]] = None,
+    max_width: int = 0,
+    use_cache: bool = False,
+    keyframes: Optional[List[float]] = None,
+    crop: str = "",
+    width: int = 0,
+    height: int = 0,
+    scaler: str = "",
+    pix_fmt: str = "rgb24",
+) -> np.ndarray:
+    """
+    Decode the frames shown at each timestamp into one ``[N, H, W, 3]`` array.
+
+    Each point yields the first frame with a timestamp at or after it, as an
+    input seek to that time would. Picks the cheaper strategy for the given
+    points: sparse points are fetched with one input-side seek each (batched
+    into a single ffmpeg process), dense points with a single decoding pass
+    and a ``select`` expression on frame timestamps over the covered span.
+
+    Args:
+        video_path: Path to the video file.
+        timestamps: Times as seconds or ``HH:MM:SS(.ms)`` strings, any order.
+        info: Result of :func:`probe_video`, probed if omitted.
+        max_width: Downscale frames wider than this (0 keeps the original size).
+        use_cache: Serve repeat decodes from the persistent frame cache.
+        keyframes: Keyframe timestamps of the video. When given, every point
+            snaps to the keyframe at or before it and only keyframes are
+            decoded (``-skip_frame nokey``); use :func:`snap_to_keyframes` to
+            get the resulting times.
+        crop, width, height, scaler, pix_fmt: Decode-time crop, resize and
+            output format, see :func:`output_filters`.
+
+    Returns:
+        Frames in the order of ``timestamps`` (duplicates allowed).
+
+    Raises:
+        RuntimeError: If a timestamp could not be decoded.
+    """
+    if info is None:
+        info = probe_video(video_path)
+    times = [parse_timestamp(t) for t in timestamps]
+    if not times:
+        raise ValueError("No timestamps given.")
+
+    filters, out_w, out_h, channels = output_filters(
+        info, max_width, crop, width, height, scaler, pix_fmt
+    )
+    geometry = (out_w, out_h, channels, pix_fmt)
+
+    if keyframes is not None:
+        return _decode_keyframes_at(
+            video_path, snap_to_keyframes(times, keyframes), filters, geometry, use_cache
+        )
+
+    # Every point is served by the first frame with pts >= t, as an input
+    # seek to t yields; frame rates are never used, so VFR sources work too
+    unique = sorted(set(times))
+    span = unique[-1] - unique[0]
+    dense = len(unique) > 1 and span <= len(unique) * DENSE_GAP_SECONDS
+
+    if dense:
+        frames, shown = _decode_span_at(video_path, unique, filters, geometry, use_cache)
+        # Several points may fall on the same frame
+        picks = [bisect.bisect_left(shown, t - 5e-6) for t in unique]
+        missing = next((t for t, i in zip(unique, picks) if i >= len(frames)), None)
+        if missing is not None:
+            raise RuntimeError(f"Failed to extract frame at {missing}")
+        frames = frames[picks]
+    else:
+        frames = np.empty((len(unique), out_h, out_w, channels), dtype=np.uint8)
+        filled = 0
+        for i in range(0, len(unique), MAX_SEEK_INPUTS):
+            chunk = unique[i : i + MAX_SEEK_INPUTS]
+            cmd = _build_seek_command(video_path, chunk, filters, pix_fmt=pix_fmt)
+            part = _run(video_path, cmd, out_w, out_h, len(chunk), use_cache, channels)
+            frames[filled : filled + len(part)] = part
+            filled += len(part)
+            if len(part) < len(chunk):
+                break
+        if filled < len(unique):
+            raise RuntimeError(f"Failed to extract frame at {unique[filled]}")
+
+    if times == unique:
+        return frames
+    positions = {t: i for i, t in enumerate(unique)}
+    return frames[[positions[t] for t in times]]
+
+
+def _decode_span_at(
+    video_path: str,
+    times: List[float],
+    filters: List[str],
+    geometry: Tuple[int, int, int, str],
+    use_cache: bool,
+) -> Tuple[np.ndarray, List[float]]:
+    """
+    Decode the first frame at or after each of the sorted ``times`` in one pass.
+
+    A frame is kept when a point lies in ``(prev_t, t]``, so selection works on
+    timestamps rather than frame numbers. Returns the kept frames and their
+    source timestamps, which may be fewer than ``times``.
+    """
+    width, height, channels, pix_fmt = geometry
+    first = times[0]
+    terms = "+".join(
+        f"gte(t\\,{t - first - 1e-6:.6f})*not(gte(prev_t\\,{t - first - 1e-6:.6f}))"
+        for t in times
+    )
+    cmd = build_decode_command(
+        video_path,
+        [f"select={terms}", "showinfo"] + filters,
+        seek=first,
+        # Room for the frame shown at the last point
+        duration=times[-1] - first + DENSE_GAP_SECONDS,
+        max_frames=len(times),
+        loglevel="info",
+        pix_fmt=pix_fmt,
+    )
+
+    def decode():
+        log = []
+        frames = read_frames(cmd, width, height, len(times), channels, log)
+        shown = _parse_showinfo(log, first)[: len(frames)]
+        return frames, {"timestamps": shown}
+
+    if use_cache:
+        frames, meta = framecache.load_or_decode(
+            video_path, cmd + [f"{width}x{height}"], decode, with_meta=True
+        )
+    else:
+        frames, meta = decode()
+    return frames, meta.get("timestamps", [])
+
+
+def snap_to_keyframes(times: List[float], keyframes: List[float]) -> List[float]:
+    """Snap each time to the keyframe at or before it (the first keyframe if none)."""
+    if not keyframes:
+        raise RuntimeError("No keyframes found in video.")
+    snapped = []
+    for t in times:
+        idx = bisect.bisect_right(keyframes, t + 1e-6)
+        snapped.append(keyframes[max(idx - 1, 0)])
+    return snapped
+
+
+def _decode_keyframes_at(
+    video_path: str,
+    times: List[float],
+    filters: List[str],
+    geometry: Tuple[int, int, int, str],
+    use_cache: bool,
+) -> np.ndarray:
+    """Decode the keyframes at exactly ``times``, skipping every non-key frame."""
+    width, height, channels, pix_fmt = geometry
+    unique = sorted(set(times))
+    # Seek a hair early: printed keyframe times are rounded to microseconds
+    seeks = [max(t - 1e-3, 0.0) for t in unique]
+    frames = np.empty((len(unique), height, width, channels), dtype=np.uint8)
+    filled = 0
+    for i in range(0, len(seeks), MAX_SEEK_INPUTS):
+        chunk = seeks[i : i + MAX_SEEK_INPUTS]
+        cmd = _build_seek_command(video_path, chunk, filters, SKIP_NONKEY, pix_fmt)
+        part = _run(video_path, cmd, width, height, len(chunk), use_cache, channels)
+        frames[filled : filled + len(part)] = part
+        filled += len(part)
+    if filled < len(unique):
+        raise RuntimeError(f"Failed to extract keyframe at {unique[filled]}")
+    positions = {t: i for i, t in enumerate(unique)}
+    return frames[[positions[t] for t in times]]
+
+
+def _parse_showinfo(lines: List[str], offset: float = 0.0) -> List[float]:
+    """Frame timestamps from ``showinfo`` log lines, shifted back by the input seek."""
+    times = []
+    for line in lines:
+        match = _SHOWINFO_PTS.search(line)
+        if match:
+            times.append(round(float(match.group(1)) + offset, 6))
+    return times
+
+
+def decode_keyframes(
+    video_path: str,
+    info: Optional[Dict[str, Union[float, int]]] = None,
+    max_width: int = 0,
+    start_time: float = 0.0,
+    end_time: float = 0.0,
+    start_frame: int = 0,
+    frame_count: int = 0,
+    stride: int = 1,
+    use_cache: bool = False,
+    crop: str = "",
+    width: int = 0,
+    height: int = 0,
+    scaler: str = "",
+    pix_fmt: str = "rgb24",
+) -> Tuple[np.ndarray, List[float]]:
+    """
+    Decode only the keyframes of the selected range.
+
+    The decoder discards every non-key frame before decoding it
+    (``-skip_frame nokey``), which is far cheaper than a full decode on
+    long-GOP sources. ``stride`` keeps every n-th keyframe. Crop, resize and
+    output format work as in :func:`decode_video`.
+
+    Returns:
+        Tuple of the ``[N, H, W, 3]`` uint8 keyframes and their timestamps
+        in seconds.
+    """
+    if info is None:
+        info = probe_video(video_path)
+
+    selection = select_range(
+        info, start_time, end_time, start_frame, frame_count, stride
+    )
+    geometry, out_w, out_h, channels = output_filters(
+        info, max_width, crop, width, height, scaler, pix_fmt
+    )
+    filters = []
+    if selection["stride"] > 1:
+        filters.append(f"select=not(mod(n\\,{selection['stride']}))")
+    filters.extend(geometry)
+    filters.append("showinfo")
+
+    cmd = build_decode_command(
+        video_path,
+        filters,
+        seek=selection["seek"],
+        duration=selection["duration"],
+        input_args=SKIP_NONKEY,
+        loglevel="info",
+        pix_fmt=pix_fmt,
+    )
+    # Assume a GOP of about two seconds to size the buffer
+    expected = max(int(selection["expected"] / max(info["fps"] * 2, 1)), 1)
+
+    def decode():
+        log = []
+        frames = read_frames(cmd, out_w, out_h, expected, channels, log)
+        times = _parse_showinfo(log, selection["seek"])[: len(frames)]
+        return frames, {"timestamps": times}
+
+    if use_cache:
+        frames, meta = framecache.load_or_decode(
+            video_path, cmd + [f"{out_w}x{out_h}"], decode, with_meta=True
+        )
+    else:
+        frames, meta = decode()
+    return frames, meta.get("timestamps", [])
+
+
+def decode_frame_at(
+    video_path: str,
+    timestamp: Union[str, float],
+    info: Optional[Dict[str, Union[float, int]]] = None,
+    max_width: int = 0,
+    use_cache: bool = False,
+) -> np.ndarray:
+    """
+    Decode the single frame at ``timestamp`` into a ``[1, H, W, 3]`` uint8 array.
+
+    Raises:
+        RuntimeError: If no frame could be decoded at that position.
+    """
+    return decode_frames_at(video_path, [timestamp], info, max_width, use_cache)
+
+
+def frames_to_tensor(frames: np.ndarray) -> torch.Tensor:
+    """
+    Convert a uint8 ``[N, H, W, C]`` array to a float32 IMAGE batch in one pass.
+
+    Single-channel (gray) frames are expanded to RGB, as IMAGE is always RGB.
+    """
+    # astype always yields a fresh writable array, also for read-only cache memmaps
+    tensor = torch.from_numpy(frames.astype(np.float32)).div_(255.0)
+    if tensor.shape[-1] == 1:
+        tensor = tensor.expand(*tensor.shape[:-1], 3).contiguous()
+    return tensor
@@ -0,0 +1,156 @@
+import os
+import subprocess
+import tempfile
+import folder_paths
+from comfy_api.latest import io
+from . import encoder
+
+try:
+    from ..func import get_image_paths_from_directory, parse_image_sequence
+except ImportError:
+    from func import get_image_paths_from_directory, parse_image_sequence
+
+
+class DirectoryToVideoV3(io.ComfyNode):
+    """
+    A V3 node to encode a directory of image files to a video.
+
+    The files are handed to FFmpeg's image2 or concat demuxer directly, so
+    every frame is decoded exactly once and never passes through a tensor.
+    """
+
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        return io.Schema(
+            node_id="DirectoryToVideoV3",
+            display_name="🔥Directory to Video (V3)",
+            category="🔥FFmpeg/Conversion",
+            inputs=[
+                io.String.Input("directory", tooltip="Directory containing the frames."),
+                io.Int.Input(
+                    "start_index",
+                    default=0,
+                    min=0,
+                    tooltip="Index of the first image to encode.",
+                ),
+                io.Int.Input(
+                    "length",
+                    default=0,
+                    min=0,
+                    tooltip="Number of images to encode. 0 means all images from start_index.",
+                ),
+                io.Float.Input(
+                    "fps", default=24.0, min=0.01, step=0.01, tooltip="Frame rate."
+                ),
+                io.Combo.Input(
+                    "gap_mode",
+                    ["skip", "hold"],
+                    default="skip",
+                    tooltip="Missing frame numbers: skip them, or hold the previous frame for their duration.",
+                ),
+                io.Combo.Input(
+                    "codec",
+                    list(encoder.CODECS),
+                    tooltip="Video codec.",
+                ),
+                io.Int.Input(
+                    "crf",
+                    default=23,
+                    min=0,
+                    max=51,
+                    tooltip="CRF (Quality, lower is better).",
+                ),
+                io.Combo.Input(
+                    "preset",
+                    encoder.PRESETS,
+                    tooltip="Encoding preset.",
+                ),
+                io.String.Input(
+                    "filename", default="output.mp4", tooltip="Output filename."
+                ),
+            ],
+            outputs=[
+                io.String.Output(tooltip="The path to the output video file."),
+                io.Int.Output(tooltip="Number of images encoded."),
+            ],
+        )
+
+    @staticmethod
+    def _write_concat_list(paths, numbers, fps, hold):
+        """
+        Write an ffconcat list giving each image its display duration.
+
+        Returns the list path and the number of output frames it spans.
+        """
+        total = 0
+        fd, list_path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("ffconcat version 1.0\n")
+            for i, path in enumerate(paths):
+                frames = 1
+                if hold and i + 1 < len(numbers):
+                    frames = max(numbers[i + 1] - numbers[i], 1)
+                total += frames
+                escaped = path.replace("'", "'\\''")
+                f.write(f"file '{escaped}'\nduration {frames / fps:.6f}\n")
+            # The last duration only applies if the file is listed again
+            f.write(f"file '{escaped}'\n")
+        return list_path, total
+
+    @classmethod
+    def execute(
+        cls,
+        directory,
+        start_index,
+        length,
+        fps,
+        gap_mode,
+        codec,
+        crf,
+        preset,
+        filename,
+    ) -> io.NodeOutput:
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"Directory not found: {directory}")
+
+        directory = os.path.abspath(directory)
+        paths = get_image_paths_from_directory(directory, start_index, length)
+        if not paths:
+            raise ValueError("No images found in the directory.")
+
+        output_path = os.path.join(folder_paths.get_output_directory(), filename)
+        pattern, numbers = parse_image_sequence(paths)
+        contiguous = pattern is not None and numbers == list(
+            range(numbers[0], numbers[0] + len(numbers))
+        )
+
+        list_path = None
+        frames = len(paths)
+        cmd = ["ffmpeg", "-y", "-v", "error"]
+        if contiguous:
+            # A gapless numbered run: the image2 demuxer reads it directly
+            cmd.extend(
+                ["-framerate", f"{fps:g}", "-start_number", str(numbers[0]), "-i", pattern]
+            )
+        else:
+            list_path, frames = cls._write_concat_list(
+                paths, numbers, fps, gap_mode == "hold" and pattern is not None
+            )
+            cmd.extend(["-f", "concat", "-safe", "0", "-i", list_path])
+            cmd.extend(["-vsync", "cfr", "-r", f"{fps:g}"])
+
+        video_codec, _ = encoder.codec_options(codec)
+        cmd.extend(encoder.video_output_args(video_codec, crf, preset))
+        # Stop exactly at the end of the sequence
+        cmd.extend(["-frames:v", str(frames)])
+        cmd.append(output_path)
+
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"FFmpeg execution failed: {e.stderr}")
+        finally:
+            if list_path and os.path.exists(list_path):
+                os.remove(list_path)
+
+        return io.NodeOutput(output_path, len(paths))
@@ -0,0 +1,142 @@
+"""
+Shared plumbing of the on-disk caches (decoded frames, keyframe indices and
+probe results).
+
+Each cache is a :class:`DiskCache`: a directory of files written atomically
+and evicted least-recently-used, by modification time, once the directory
+exceeds its size cap. Caches live under ComfyUI's user directory rather than
+inside the extension folder, so updating or reinstalling the extension keeps
+them and read-only installs still work.
+"""
+
+import os
+import threading
+from typing import Callable, IO, List
+
+import folder_paths
+
+# Folder of this extension's caches inside the user directory
+CACHE_ROOT_NAME = "comfyui-ffmpeg"
+
+
+def cache_dir(name: str) -> str:
+    """Directory of the ``name`` cache, e.g. ``<user>/comfyui-ffmpeg/cache/frames``."""
+    # Older ComfyUI builds have no user directory; fall back to the temp directory
+    get_root = getattr(folder_paths, "get_user_directory", folder_paths.get_temp_directory)
+    return os.path.join(get_root(), CACHE_ROOT_NAME, "cache", name)
+
+
+class DiskCache:
+    """
+    A directory of cache entries capped in total size.
+
+    An entry is a file ``<name><suffix>`` plus optional companion files
+    (``<name><companion>``) that are removed along with it. Reading an entry
+    through :meth:`touch` marks it as recently used.
+
+    Args:
+        name: Cache name, see :func:`cache_dir`.
+        suffix: File suffix of the entries, e.g. ``".npy"``.
+        max_bytes: Default size cap of the entry files.
+        companions: Suffixes of files deleted together with an entry.
+    """
+
+    def __init__(self, name: str, suffix: str, max_bytes: int, companions=()):
+        self.directory = cache_dir(name)
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.companions = tuple(companions)
+        self._lock = threading.Lock()
+        # (directory, bytes): running size of the entries since the last scan
+        self._size = None
+
+    def path(self, name: str, suffix: str = "") -> str:
+        """Path of entry ``name`` (or of its ``suffix`` companion)."""
+        return os.path.join(self.directory, name + (suffix or self.suffix))
+
+    def write(self, path: str, write: Callable[[IO], None], mode: str = "wb") -> None:
+        """
+        Write a file atomically: ``write`` fills a temp file that then replaces ``path``.
+
+        Raises:
+            OSError: If the file cannot be written (the temp file is removed).
+        """
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, mode) as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        if path.endswith(self.suffix):
+            with self._lock:
+                if self._size is not None:
+                    # Overwrites count twice, which only brings the next scan forward
+                    self._size = (self._size[0], self._size[1] + os.path.getsize(path))
+
+    @staticmethod
+    def touch(path: str) -> None:
+        """Mark an entry as recently used for LRU eviction."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def entries(self) -> List[os.DirEntry]:
+        """Entry files, most recently used first."""
+        if not os.path.isdir(self.directory):
+            return []
+        found = [e for e in os.scandir(self.directory) if e.name.endswith(self.suffix)]
+        found.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        return found
+
+    def _remove(self, entry: os.DirEntry) -> bool:
+        name = entry.name[: -len(self.suffix)]
+        for suffix in self.companions:
+            try:
+                os.unlink(self.path(name, suffix))
+            except OSError:
+                pass
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            return False
+        return True
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        """Set the size cap and evict entries above it."""
+        self.max_bytes = max(int(max_bytes), 0)
+        with self._lock:
+            self._size = None
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Delete least-recently-used entries until the cache fits its cap.
+
+        The directory is only scanned once the running size since the last
+        scan exceeds the cap, so frequent small writes stay cheap.
+        """
+        removed = 0
+        with self._lock:
+            if self._size is not None and self._size[0] == self.directory:
+                if self._size[1] <= self.max_bytes:
+                    return 0
+            entries = self.entries()
+            total = sum(e.stat().st_size for e in entries)
+            while entries and total > self.max_bytes:
+                oldest = entries.pop()
+                total -= oldest.stat().st_size
+                removed += self._remove(oldest)
+            self._size = (self.directory, total)
+        return removed
+
+    def purge(self) -> int:
+        """Delete every entry; returns the number removed."""
+        with self._lock:
+            removed = sum(self._remove(e) for e in self.entries())
+            self._size = None
+        return removed
@@ -1,12 +1,8 @@
 import os
 import subprocess
-import tempfile
-import shutil
 import folder_paths
-import torchaudio
-from PIL import Image
-import numpy as np
 from comfy_api.latest import io
+from . import encoder as engine
 
 # Global cache for detected hardware encoders
 _DETECTED_ENCODERS = None
@@ -74,65 +70,13 @@ class EncodeWithHWAccelV3(io.ComfyNode):
 
     @classmethod
     def execute(cls, images, fps, encoder, quality, filename, audio=None) -> io.NodeOutput:
-        temp_dir = tempfile.mkdtemp()
         output_path = os.path.join(folder_paths.get_output_directory(), filename)
 
         # Extract internal encoder name
         enc = encoder.split(" ")[0]
-       
-        # Quality flag dispatcher
-        if "nvenc" in enc:
-            quality_flag = "-cq"
-        elif "qsv" in enc:
-            quality_flag = "-global_quality"
-        elif "videotoolbox" in enc:
-            quality_flag = "-q:v"
-        elif "vaapi" in enc:
-            quality_flag = "-qp"
-        else:
-            quality_flag = "-crf"
-       
-        try:
-            for i, img_tensor in enumerate(images):
-                img_np = (img_tensor.cpu().numpy() * 255).astype(np.uint8)
-                Image.fromarray(img_np).save(os.path.join(temp_dir, f"{i:05d}.png"))
-
-            cmd = [
-                "ffmpeg", "-y",
-                "-framerate", str(fps),
-                "-i", os.path.join(temp_dir, "%05d.png"),
-            ]
-
-            audio_file = None
-            if audio:
-                audio_file = tempfile.mktemp(suffix=".wav")
-                waveform = audio["waveform"]
-                if waveform.dim() == 3:
-                     waveform = waveform.squeeze(0)
-                torchaudio.save(audio_file, waveform.cpu(), audio["sample_rate"])
-                cmd.extend(["-i", audio_file])
-
-            cmd.extend([
-                "-c:v", enc,
-                quality_flag, str(quality),
-                "-pix_fmt", "yuv420p",
-            ])
-
-            if audio:
-                cmd.extend(["-c:a", "aac", "-shortest"])
-
-            cmd.append(output_path)
-            subprocess.run(cmd, check=True, capture_output=True, text=True)
-
-            if audio_file:
-                try:
-                    os.remove(audio_file)
-                except OSError:
-                    pass
 
+        try:
+            engine.encode_images(images, fps, output_path, enc, quality, audio=audio)
             return io.NodeOutput(output_path)
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"FFmpeg HW encoding failed: {e.stderr}")
-        finally:
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
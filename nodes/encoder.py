@@ -0,0 +1,581 @@
+"""
+Encoder engine shared by the tensor-to-video nodes.
+
+The engine owns everything between an IMAGE batch and the finished file:
+frame transport, audio muxing, codec and rate-control mapping, thread
+settings and cleanup. IMAGE batches are converted to uint8 in large chunks
+on their own device and written to ffmpeg's stdin as ``rawvideo``, so
+encoding starts with the first chunk and no intermediate image files are
+written or decoded again.
+Audio is streamed alongside, as raw ``f32le`` PCM through a FIFO.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple, Union
+
+import torch
+
+try:
+    from ..func import drain_stderr, images_to_uint8
+except ImportError:
+    from func import drain_stderr, images_to_uint8
+
+# Raw pixel format for each IMAGE channel count
+RAW_PIX_FMTS = {1: "gray", 3: "rgb24", 4: "rgba"}
+# Frames converted and written per chunk
+CHUNK_FRAMES = 16
+# Audio samples (per channel) converted and written per chunk
+CHUNK_SAMPLES = 1 << 16
+
+# Codec choices offered by the encode nodes and their ffmpeg encoders
+CODECS = {
+    "h264_cpu": "libx264",
+    "h265_cpu": "libx265",
+    "h264_nvidia": "h264_nvenc",
+    "h265_nvidia": "hevc_nvenc",
+}
+# Encoders that can be split into chunks, with the options closing every GOP
+CHUNKABLE_CODECS = {
+    "libx264": ["-flags", "+cgop"],
+    "libx265": ["-x265-params", "open-gop=0"],
+}
+# Smallest chunk worth its own encoder process and leading keyframe
+MIN_CHUNK_FRAMES = 24
+PRESETS = [
+    "ultrafast",
+    "superfast",
+    "veryfast",
+    "faster",
+    "fast",
+    "medium",
+    "slow",
+    "slower",
+    "veryslow",
+]
+
+
+def quality_flag(video_codec: str) -> str:
+    """Rate-control option taking a constant-quality value for an ffmpeg encoder."""
+    if "nvenc" in video_codec:
+        return "-cq"
+    elif "qsv" in video_codec:
+        return "-global_quality"
+    elif "videotoolbox" in video_codec:
+        return "-q:v"
+    elif "vaapi" in video_codec:
+        return "-qp"
+    return "-crf"
+
+
+def codec_options(codec: str) -> Tuple[str, str]:
+    """Map a codec choice from :data:`CODECS` to ``(encoder, quality flag)``."""
+    if codec not in CODECS:
+        raise ValueError(f"Unsupported codec: {codec}")
+    video_codec = CODECS[codec]
+    return video_codec, quality_flag(video_codec)
+
+
+def video_output_args(
+    video_codec: str,
+    quality: int,
+    preset: Optional[str] = None,
+    threads: int = 0,
+) -> List[str]:
+    """
+    ffmpeg output options for the video stream.
+
+    Args:
+        video_codec: ffmpeg encoder name, e.g. ``libx264``.
+        quality: Constant-quality value (CRF/CQ/QP depending on the encoder).
+        preset: Encoder preset, or None to leave the encoder default.
+        threads: Encoder threads (0 lets ffmpeg choose).
+    """
+    args = ["-c:v", video_codec, quality_flag(video_codec), str(quality)]
+    if preset:
+        args.extend(["-preset", preset])
+    if threads > 0:
+        args.extend(["-threads", str(threads)])
+    args.extend(["-pix_fmt", "yuv420p"])
+    return args
+
+
+def rawvideo_input_args(images: torch.Tensor, fps: Union[int, float]) -> List[str]:
+    """
+    ffmpeg input options reading an IMAGE batch from stdin.
+
+    Args:
+        images: ``[N, H, W, C]`` IMAGE batch.
+        fps: Frame rate of the input.
+    """
+    _, height, width, channels = images.shape
+    if channels not in RAW_PIX_FMTS:
+        raise ValueError(f"Unsupported number of image channels: {channels}")
+    return [
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        RAW_PIX_FMTS[channels],
+        "-s",
+        f"{width}x{height}",
+        "-framerate",
+        str(fps),
+        "-i",
+        "pipe:0",
+    ]
+
+
+class FrameWriter:
+    """
+    An ffmpeg process reading rawvideo frames on stdin.
+
+    Frames can be written in any number of batches; :meth:`close` ends the
+    input and waits for ffmpeg to finish the file.
+    """
+
+    def __init__(self, cmd: List[str]):
+        self.cmd = cmd
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        self._collect_stderr = drain_stderr(self.process)
+        # Host-side uint8 chunk buffer, reused across writes
+        self._buffer: Optional[torch.Tensor] = None
+
+    def write(self, images: torch.Tensor, chunk_frames: int = CHUNK_FRAMES) -> bool:
+        """
+        Convert and write an IMAGE batch chunk by chunk.
+
+        Returns:
+            False if ffmpeg exited before taking all frames; :meth:`close`
+            then raises with its stderr.
+        """
+        try:
+            for start in range(0, len(images), max(chunk_frames, 1)):
+                self._buffer = images_to_uint8(
+                    images[start : start + chunk_frames], self._buffer
+                )
+                self.process.stdin.write(memoryview(self._buffer.numpy()).cast("B"))
+        except BrokenPipeError:
+            # ffmpeg exited early; its stderr says why
+            return False
+        return True
+
+    def close(self) -> None:
+        """
+        End the input and wait for ffmpeg to finish.
+
+        Raises:
+            subprocess.CalledProcessError: If ffmpeg fails, with its stderr attached.
+        """
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.process.wait()
+        stderr = self._collect_stderr()
+        if self.process.returncode != 0:
+            raise subprocess.CalledProcessError(
+                self.process.returncode, self.cmd, output=None, stderr=stderr
+            )
+
+    def kill(self) -> None:
+        """Stop ffmpeg without finishing the file."""
+        self.process.kill()
+        self.process.wait()
+        self._collect_stderr()
+
+
+def write_frames(
+    cmd: List[str], images: torch.Tensor, chunk_frames: int = CHUNK_FRAMES
+) -> None:
+    """
+    Run an ffmpeg command reading rawvideo on stdin and stream a batch into it.
+
+    Args:
+        cmd: Full ffmpeg command line using :func:`rawvideo_input_args`.
+        images: ``[N, H, W, C]`` IMAGE batch.
+        chunk_frames: Frames converted and written per chunk.
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails, with its stderr attached.
+    """
+    writer = FrameWriter(cmd)
+    try:
+        writer.write(images, chunk_frames)
+    except BaseException:
+        writer.kill()
+        raise
+    writer.close()
+
+
+def prepare_waveform(audio: Dict) -> torch.Tensor:
+    """Return an AUDIO input's waveform as ``[Channels, Samples]`` on the CPU."""
+    waveform = audio["waveform"]
+    if waveform.dim() == 3:
+        # AUDIO is [Batch, Channels, Samples]; the encoders take one clip
+        waveform = waveform.squeeze(0)
+    return waveform.cpu()
+
+
+class AudioPipe:
+    """
+    Feeds an AUDIO input to ffmpeg as raw ``f32le`` PCM through a FIFO.
+
+    Use as a context manager and add :meth:`input_args` to the command; a
+    background thread writes the samples as soon as ffmpeg opens the FIFO.
+    Where FIFOs are unavailable (Windows), the samples are written to a raw
+    temporary file instead.
+    """
+
+    def __init__(self, audio: Dict):
+        self.waveform = prepare_waveform(audio)
+        self.sample_rate = int(audio["sample_rate"])
+        self.channels = self.waveform.shape[0]
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._temp_dir = tempfile.mkdtemp(prefix="comfyui-ffmpeg-audio-")
+        self.path = os.path.join(self._temp_dir, "audio.f32le")
+        if hasattr(os, "mkfifo"):
+            os.mkfifo(self.path)
+            self._thread = threading.Thread(target=self._feed, daemon=True)
+            self._thread.start()
+        else:
+            with open(self.path, "wb") as f:
+                self._write_samples(f)
+
+    def input_args(self) -> List[str]:
+        """ffmpeg input options reading the samples."""
+        return [
+            "-f",
+            "f32le",
+            "-ar",
+            str(self.sample_rate),
+            "-ac",
+            str(self.channels),
+            "-i",
+            self.path,
+        ]
+
+    def _write_samples(self, f) -> None:
+        # Interleave channels chunk by chunk rather than copying the whole track
+        samples = self.waveform.shape[1]
+        for start in range(0, samples, CHUNK_SAMPLES):
+            chunk = self.waveform[:, start : start + CHUNK_SAMPLES]
+            chunk = chunk.t().contiguous().to(torch.float32)
+            f.write(memoryview(chunk.numpy()).cast("B"))
+
+    def _feed(self) -> None:
+        # Poll for the reader so an ffmpeg that fails early cannot strand us
+        while True:
+            try:
+                fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+                break
+            except OSError:
+                if self._stop.wait(0.01):
+                    return
+        os.set_blocking(fd, True)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                self._write_samples(f)
+        except BrokenPipeError:
+            # ffmpeg stopped reading, e.g. with -shortest
+            pass
+
+    def close(self) -> None:
+        """Stop the writer and remove the FIFO or temporary file."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+    def __enter__(self) -> "AudioPipe":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def chunk_bounds(frames: int, chunks: int) -> List[Tuple[int, int]]:
+    """Split ``frames`` into at most ``chunks`` contiguous ``(start, end)`` runs."""
+    chunks = max(min(chunks, frames // MIN_CHUNK_FRAMES), 1)
+    edges = [frames * i // chunks for i in range(chunks + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def encode_images(
+    images: torch.Tensor,
+    fps: Union[int, float],
+    output_path: str,
+    video_codec: str,
+    quality: int,
+    preset: Optional[str] = None,
+    audio: Optional[Dict] = None,
+    threads: int = 0,
+    workers: int = 1,
+) -> Dict[str, Union[str, int, float]]:
+    """
+    Encode an IMAGE batch, with an optional AUDIO track, to a video file.
+
+    Args:
+        images: ``[N, H, W, C]`` IMAGE batch.
+        fps: Frame rate of the output.
+        output_path: Destination file.
+        video_codec: ffmpeg encoder name, e.g. ``libx264`` or ``h264_nvenc``.
+        quality: Constant-quality value for the encoder's rate control.
+        preset: Encoder preset, or None to leave the encoder default.
+        audio: Optional ComfyUI AUDIO dict muxed as AAC, cut to the video.
+        threads: Encoder threads (0 lets ffmpeg choose).
+        workers: Parallel encoders over contiguous chunks (0 = one per CPU
+            core). Only used for encoders in :data:`CHUNKABLE_CODECS`.
+
+    Returns:
+        Dict with ``path``, ``frames``, ``seconds``, ``fps`` (frames encoded
+        per second of wall time) and ``workers``.
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails, with its stderr attached.
+    """
+    started = time.perf_counter()
+    workers = workers if workers > 0 else os.cpu_count() or 1
+    runs = chunk_bounds(len(images), workers) if video_codec in CHUNKABLE_CODECS else []
+
+    if len(runs) > 1:
+        _encode_chunked(
+            images, fps, output_path, video_codec, quality, preset, audio, threads, runs
+        )
+    else:
+        cmd = ["ffmpeg", "-y", *rawvideo_input_args(images, fps)]
+        with AudioPipe(audio) if audio else nullcontext() as audio_pipe:
+            if audio_pipe:
+                cmd.extend(audio_pipe.input_args())
+            cmd.extend(video_output_args(video_codec, quality, preset, threads))
+            if audio_pipe:
+                cmd.extend(["-c:a", "aac", "-shortest"])
+            cmd.append(output_path)
+
+            write_frames(cmd, images)
+
+    seconds = time.perf_counter() - started
+    return dict(
+        path=output_path,
+        frames=len(images),
+        seconds=seconds,
+        fps=len(images) / seconds if seconds > 0 else 0.0,
+        workers=max(len(runs), 1),
+    )
+
+
+def _encode_chunked(
+    images: torch.Tensor,
+    fps: Union[int, float],
+    output_path: str,
+    video_codec: str,
+    quality: int,
+    preset: Optional[str],
+    audio: Optional[Dict],
+    threads: int,
+    runs: List[Tuple[int, int]],
+) -> None:
+    """Encode contiguous closed-GOP chunks concurrently and concat them losslessly."""
+    # Split the cores between the encoders unless told otherwise
+    threads = threads or max((os.cpu_count() or 1) // len(runs), 1)
+    temp_dir = tempfile.mkdtemp(prefix="comfyui-ffmpeg-chunks-")
+
+    def encode_chunk(index: int, start: int, end: int) -> str:
+        path = os.path.join(temp_dir, f"chunk_{index:04d}.mp4")
+        cmd = [
+            "ffmpeg",
+            "-y",
+            *rawvideo_input_args(images, fps),
+            *video_output_args(video_codec, quality, preset, threads),
+            *CHUNKABLE_CODECS[video_codec],
+            "-an",
+            path,
+        ]
+        write_frames(cmd, images[start:end])
+        return path
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(runs)) as executor:
+            futures = [
+                executor.submit(encode_chunk, i, start, end)
+                for i, (start, end) in enumerate(runs)
+            ]
+            paths = [future.result() for future in futures]
+
+        list_path = os.path.join(temp_dir, "chunks.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.write("ffconcat version 1.0\n")
+            for path in paths:
+                f.write(f"file '{os.path.basename(path)}'\n")
+
+        # Join the chunks without re-encoding and mux the audio once
+        cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_path]
+        with AudioPipe(audio) if audio else nullcontext() as audio_pipe:
+            if audio_pipe:
+                cmd.extend(audio_pipe.input_args())
+                cmd.extend(["-map", "0:v", "-map", "1:a", "-c:a", "aac", "-shortest"])
+            cmd.extend(["-c:v", "copy", output_path])
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+class EncoderSession:
+    """
+    A long-running encode that accepts frames across multiple batches.
+
+    ffmpeg is started on the first :meth:`append`, which fixes the frame
+    size, and every batch is streamed straight into its stdin. Only the batch
+    being appended is held in memory, however long the video gets.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        fps: Union[int, float],
+        video_codec: str,
+        quality: int,
+        preset: Optional[str] = None,
+        threads: int = 0,
+    ):
+        self.output_path = output_path
+        self.fps = fps
+        self.video_codec = video_codec
+        self.quality = quality
+        self.preset = preset
+        self.threads = threads
+        self.frames = 0
+        self.frame_shape: Optional[Tuple[int, ...]] = None
+        self.closed = False
+        self._writer: Optional[FrameWriter] = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        state = "closed" if self.closed else "open"
+        return f"EncoderSession({self.output_path!r}, frames={self.frames}, {state})"
+
+    def append(self, images: torch.Tensor) -> int:
+        """
+        Stream an IMAGE batch into the encode.
+
+        Returns:
+            Total number of frames appended so far.
+
+        Raises:
+            ValueError: If the batch's frame size differs from earlier batches.
+            subprocess.CalledProcessError: If ffmpeg fails.
+        """
+        with self._lock:
+            if self.closed:
+                raise RuntimeError(f"Encoder session is closed: {self.output_path}")
+            frame_shape = tuple(images.shape[1:])
+            if self._writer is None:
+                cmd = [
+                    "ffmpeg",
+                    "-y",
+                    *rawvideo_input_args(images, self.fps),
+                    *video_output_args(
+                        self.video_codec, self.quality, self.preset, self.threads
+                    ),
+                    self.output_path,
+                ]
+                self._writer = FrameWriter(cmd)
+                self.frame_shape = frame_shape
+            elif frame_shape != self.frame_shape:
+                raise ValueError(
+                    f"Frame shape {frame_shape} does not match the session's "
+                    f"{self.frame_shape}."
+                )
+
+            if not self._writer.write(images):
+                # ffmpeg is gone; collect its error and end the session
+                self.closed = True
+                self._writer.close()
+            self.frames += len(images)
+            return self.frames
+
+    def close(self) -> str:
+        """
+        Finish the encode and return the output path.
+
+        Raises:
+            ValueError: If no frames were appended.
+            subprocess.CalledProcessError: If ffmpeg fails.
+        """
+        with self._lock:
+            if self.closed:
+                raise RuntimeError(f"Encoder session is closed: {self.output_path}")
+            self.closed = True
+            if self._writer is None:
+                raise ValueError("Encoder session received no frames.")
+            self._writer.close()
+            return self.output_path
+
+    def abort(self) -> None:
+        """Stop the encode and remove the partial output."""
+        with self._lock:
+            self.closed = True
+            if self._writer is not None:
+                self._writer.kill()
+                if os.path.exists(self.output_path):
+                    os.remove(self.output_path)
+
+
+# Open sessions by name, living across queue items until closed
+_SESSIONS: Dict[str, EncoderSession] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def open_session(name: str, *args, **kwargs) -> EncoderSession:
+    """
+    Open a named :class:`EncoderSession`, or return it if it is already open.
+
+    Reopening is a no-op so a graph that opens and appends can be queued
+    repeatedly; the arguments of the first open stay in effect until the
+    session is closed.
+    """
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(name)
+        if session is None or session.closed:
+            session = _SESSIONS[name] = EncoderSession(*args, **kwargs)
+        return session
+
+
+def get_session(name: str) -> EncoderSession:
+    """Return an open session by name."""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(name)
+    if session is None or session.closed:
+        raise ValueError(f"No open encoder session named '{name}'.")
+    return session
+
+
+def close_session(name: str) -> EncoderSession:
+    """Finish a named session and forget it. Returns the closed session."""
+    session = get_session(name)
+    with _SESSIONS_LOCK:
+        _SESSIONS.pop(name, None)
+    session.close()
+    return session
+
+
+def abort_session(name: str) -> bool:
+    """Stop a named session without finishing its file. Returns whether it existed."""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.pop(name, None)
+    if session is None:
+        return False
+    session.abort()
+    return True
@@ -0,0 +1,142 @@
+import os
+import subprocess
+import time
+import folder_paths
+from comfy_api.latest import io
+from . import encoder
+
+
+class EncoderSessionOpenV3(io.ComfyNode):
+    """
+    A V3 node to open a named encoder session that outlives the queue item.
+    """
+
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        return io.Schema(
+            node_id="EncoderSessionOpenV3",
+            display_name="🔥Open Encoder Session (V3)",
+            category="🔥FFmpeg/Output",
+            inputs=[
+                io.String.Input(
+                    "session", default="session", tooltip="Name of the encoder session."
+                ),
+                io.Int.Input("fps", default=24, min=1, tooltip="Frame rate."),
+                io.Combo.Input(
+                    "codec",
+                    list(encoder.CODECS),
+                    tooltip="Video codec.",
+                ),
+                io.Int.Input(
+                    "crf",
+                    default=23,
+                    min=0,
+                    max=51,
+                    tooltip="Quality (CRF for CPU, CQ for NVIDIA). Lower is better.",
+                ),
+                io.Combo.Input(
+                    "preset",
+                    encoder.PRESETS,
+                    default="medium",
+                    tooltip="Encoding preset.",
+                ),
+                io.String.Input(
+                    "filename", default="session_video.mp4", tooltip="Output filename."
+                ),
+            ],
+            outputs=[
+                io.String.Output(tooltip="The session name, for the append and close nodes."),
+            ],
+        )
+
+    @classmethod
+    def fingerprint_inputs(cls, **kwargs):
+        # Sessions live outside the graph; reopening an open session is a no-op
+        return time.time()
+
+    @classmethod
+    def execute(cls, session, fps, codec, crf, preset, filename) -> io.NodeOutput:
+        output_path = os.path.join(folder_paths.get_output_directory(), filename)
+        video_codec, _ = encoder.codec_options(codec)
+        encoder.open_session(session, output_path, fps, video_codec, crf, preset)
+        return io.NodeOutput(session)
+
+
+class EncoderSessionAppendV3(io.ComfyNode):
+    """
+    A V3 node to stream an IMAGE batch into an open encoder session.
+    """
+
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        return io.Schema(
+            node_id="EncoderSessionAppendV3",
+            display_name="🔥Append to Encoder Session (V3)",
+            category="🔥FFmpeg/Output",
+            is_output_node=True,
+            inputs=[
+                io.String.Input("session", default="session", tooltip="Name of the encoder session."),
+                io.Image.Input("images", tooltip="Frames to append."),
+            ],
+            outputs=[
+                io.String.Output(tooltip="The session name."),
+                io.Int.Output(tooltip="Frames appended to the session so far."),
+            ],
+        )
+
+    @classmethod
+    def fingerprint_inputs(cls, **kwargs):
+        # Appending is a side effect; never reuse a cached result
+        return time.time()
+
+    @classmethod
+    def execute(cls, session, images) -> io.NodeOutput:
+        try:
+            frames = encoder.get_session(session).append(images)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"FFmpeg failed: {e.stderr}")
+        return io.NodeOutput(session, frames)
+
+
+class EncoderSessionCloseV3(io.ComfyNode):
+    """
+    A V3 node to finalize (or abort) an encoder session.
+    """
+
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        return io.Schema(
+            node_id="EncoderSessionCloseV3",
+            display_name="🔥Close Encoder Session (V3)",
+            category="🔥FFmpeg/Output",
+            is_output_node=True,
+            inputs=[
+                io.String.Input("session", default="session", tooltip="Name of the encoder session."),
+                io.Combo.Input(
+                    "action",
+                    ["finalize", "abort"],
+                    default="finalize",
+                    tooltip="Finish the video file, or stop and delete the partial file.",
+                ),
+            ],
+            outputs=[
+                io.String.Output(tooltip="The path to the output video file."),
+                io.Int.Output(tooltip="Number of frames encoded."),
+            ],
+        )
+
+    @classmethod
+    def fingerprint_inputs(cls, **kwargs):
+        return time.time()
+
+    @classmethod
+    def execute(cls, session, action="finalize") -> io.NodeOutput:
+        if action == "abort":
+            encoder.abort_session(session)
+            return io.NodeOutput("", 0)
+
+        try:
+            closed = encoder.close_session(session)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"FFmpeg failed: {e.stderr}")
+        return io.NodeOutput(closed.output_path, closed.frames)
@@ -0,0 +1,70 @@
+import json
+import time
+from comfy_api.latest import io
+from . import framecache
+from . import probecache
+from . import keyframeindex
+
+
+class FrameCacheV3(io.ComfyNode):
+    """
+    A V3 node to inspect, resize or purge the persistent decoded-frame cache
+    and the shared ffprobe result and keyframe index caches.
+    """
+
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        return io.Schema(
+            node_id="FrameCacheV3",
+            display_name="🔥Frame Cache (V3)",
+            category="🔥FFmpeg/IO",
+            is_output_node=True,
+            inputs=[
+                io.Combo.Input(
+                    "action",
+                    ["info", "configure", "purge"],
+                    default="info",
+                    tooltip="Show cache statistics, apply the settings below, or delete all cached frames, probe results and keyframe indices.",
+                ),
+                io.Int.Input(
+                    "max_size_mb",
+                    default=framecache.DEFAULT_MAX_BYTES // (1024 * 1024),
+                    min=0,
+                    tooltip="Cache size cap in MB, applied by configure and purge. Least recently used entries are evicted above it.",
+                ),
+                io.Boolean.Input(
+                    "persist_probes",
+                    default=False,
+                    tooltip="Also keep ffprobe results on disk so they survive restarts (applied by configure and purge).",
+                ),
+            ],
+            outputs=[
+                io.String.Output(tooltip="JSON string with cache statistics."),
+            ],
+        )
+
+    @classmethod
+    def fingerprint_inputs(cls, **kwargs):
+        # Cache contents change outside the graph, always re-run
+        return time.time()
+
+    @classmethod
+    def execute(cls, action, max_size_mb, persist_probes=False) -> io.NodeOutput:
+        # Settings are process-wide; a plain info query leaves them alone
+        if action in ("configure", "purge"):
+            framecache.set_max_bytes(max_size_mb * 1024 * 1024)
+            probecache.set_persist(persist_probes)
+
+        if action == "purge":
+            removed = framecache.purge()
+            probes = probecache.purge()
+            indices = keyframeindex.purge()
+            print(
+                f"[FrameCache] Purged {removed} entries, {probes} probe results"
+                f" and {indices} keyframe indices"
+            )
+
+        stats = framecache.stats()
+        stats["probe_cache"] = probecache.stats()
+        stats["keyframe_index"] = keyframeindex.stats()
+        return io.NodeOutput(json.dumps(stats, indent=4))
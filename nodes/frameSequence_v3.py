@@ -0,0 +1,53 @@
+from comfy_api.latest import io
+from .framesequence import FRAME_SEQUENCE
+
+
+class FrameSequenceToImagesV3(io.ComfyNode):
+    """
+    A V3 node to decode a window of a lazy frame sequence into an IMAGE batch.
+    """
+
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        return io.Schema(
+            node_id="FrameSequenceToImagesV3",
+            display_name="🔥Frame Sequence to Images (V3)",
+            category="🔥FFmpeg/Conversion",
+            inputs=[
+                io.Custom(FRAME_SEQUENCE).Input(
+                    "frames", tooltip="Lazy frame sequence from Video to Frames."
+                ),
+                io.Int.Input(
+                    "start_index",
+                    default=0,
+                    min=0,
+                    tooltip="Index of the first frame to decode.",
+                ),
+                io.Int.Input(
+                    "length",
+                    default=0,
+                    min=0,
+                    tooltip="Number of frames to decode. 0 means all frames from start_index.",
+                ),
+                io.Int.Input(
+                    "step",
+                    default=1,
+                    min=1,
+                    tooltip="Take every n-th frame of the window.",
+                ),
+            ],
+            outputs=[
+                io.Image.Output(tooltip="The decoded frames."),
+                io.Int.Output(tooltip="Number of frames."),
+            ],
+        )
+
+    @classmethod
+    def execute(cls, frames, start_index, length, step=1) -> io.NodeOutput:
+        if start_index >= len(frames):
+            raise ValueError("start_index is out of bounds.")
+
+        stop = start_index + length if length > 0 else len(frames)
+        images = frames[start_index:stop:step]
+
+        return io.NodeOutput(images, images.shape[0])
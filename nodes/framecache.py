@@ -0,0 +1,180 @@
+"""
+Persistent decoded-frame cache for frame extraction nodes.
+
+Decoded uint8 frames are stored as ``.npy`` files and read back memory-mapped,
+so re-running an extraction on an unchanged source skips ffmpeg entirely.
+Entries are keyed by the source identity (real path, size, mtime) and the
+exact decode command, and evicted least-recently-used once the cache exceeds
+its size cap.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from . import diskcache
+
+DEFAULT_MAX_BYTES = 4 * 1024**3
+# Frames are ``<key>.npy``, with a ``<key>.json`` sidecar describing them
+CACHE = diskcache.DiskCache("frames", ".npy", DEFAULT_MAX_BYTES, companions=(".json",))
+
+
+def set_max_bytes(max_bytes: int) -> None:
+    """Set the cache size cap and evict entries above it."""
+    CACHE.set_max_bytes(max_bytes)
+
+
+def get_max_bytes() -> int:
+    return CACHE.max_bytes
+
+
+def make_key(video_path: str, params: List[str]) -> Optional[str]:
+    """
+    Build a cache key from the source file identity and decode parameters.
+
+    Args:
+        video_path: Source video path.
+        params: Decode parameters, typically the ffmpeg command line.
+
+    Returns:
+        A hex digest, or None if the source cannot be stat'ed.
+    """
+    try:
+        real_path = os.path.realpath(video_path)
+        st = os.stat(real_path)
+    except OSError:
+        return None
+    # The command embeds the caller's spelling of the path; normalize it away
+    normalized = [real_path if p == video_path else p for p in params]
+    payload = json.dumps([real_path, st.st_size, st.st_mtime_ns, normalized])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _paths(key: str):
+    return CACHE.path(key), CACHE.path(key, ".json")
+
+
+def load(key: str) -> Optional[np.ndarray]:
+    """Return the cached frames for ``key`` as a read-only memmap, or None."""
+    npy_path, _ = _paths(key)
+    try:
+        frames = np.load(npy_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    CACHE.touch(npy_path)
+    return frames
+
+
+def load_meta(key: str) -> Dict:
+    """Return the extra metadata stored with an entry (empty if none)."""
+    try:
+        with open(_paths(key)[1]) as f:
+            return json.load(f).get("meta", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def store(key: str, frames: np.ndarray, source: str = "", meta: Optional[Dict] = None) -> bool:
+    """
+    Write frames to the cache, evicting old entries to stay under the cap.
+
+    Args:
+        key: Cache key from :func:`make_key`.
+        frames: ``[N, H, W, C]`` uint8 frames.
+        source: Source path, kept for inspection.
+        meta: Extra JSON-serializable data returned alongside the frames.
+
+    Returns:
+        True if the entry was written; batches larger than the cap are skipped.
+    """
+    if frames.nbytes > CACHE.max_bytes:
+        return False
+
+    npy_path, meta_path = _paths(key)
+    info = {
+        "source": source,
+        "shape": list(frames.shape),
+        "created": time.time(),
+        "meta": meta or {},
+    }
+    try:
+        # Metadata first, so a visible .npy always has its sidecar
+        CACHE.write(meta_path, lambda f: json.dump(info, f), mode="w")
+        CACHE.write(npy_path, lambda f: np.save(f, np.ascontiguousarray(frames)))
+    except OSError as e:
+        print(f"[FrameCache] Failed to store entry: {e}")
+        return False
+
+    CACHE.evict()
+    return True
+
+
+def load_or_decode(
+    video_path: str,
+    params: List[str],
+    decode: Callable,
+    with_meta: bool = False,
+):
+    """
+    Return cached frames for a decode, running ``decode`` and storing on a miss.
+
+    Args:
+        video_path: Source video path.
+        params: Decode parameters, typically the ffmpeg command line.
+        decode: Callable producing the ``[N, H, W, C]`` uint8 frames, or a
+            ``(frames, meta)`` tuple when ``with_meta`` is set.
+        with_meta: Return ``(frames, meta)`` instead of just the frames.
+    """
+    key = make_key(video_path, params)
+    if key is not None:
+        frames = load(key)
+        if frames is not None:
+            return (frames, load_meta(key)) if with_meta else frames
+
+    result = decode()
+    frames, meta = result if with_meta else (result, None)
+    if key is not None and len(frames):
+        store(key, frames, os.path.realpath(video_path), meta)
+    return result
+
+
+def entries() -> List[Dict]:
+    """List cache entries, most recently used first."""
+    result = []
+    for entry in CACHE.entries():
+        key = entry.name[: -len(".npy")]
+        st = entry.stat()
+        info = {"key": key, "bytes": st.st_size, "last_used": st.st_mtime}
+        try:
+            with open(_paths(key)[1]) as f:
+                info.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        result.append(info)
+    return result
+
+
+def evict() -> int:
+    """Delete least-recently-used entries until the cache fits its cap."""
+    return CACHE.evict()
+
+
+def purge() -> int:
+    """Delete every cache entry; returns the number removed."""
+    return CACHE.purge()
+
+
+def stats() -> Dict:
+    """Summary of the cache for display in the UI."""
+    all_entries = entries()
+    return {
+        "directory": CACHE.directory,
+        "entries": len(all_entries),
+        "bytes": sum(e["bytes"] for e in all_entries),
+        "max_bytes": CACHE.max_bytes,
+        "items": all_entries,
+    }
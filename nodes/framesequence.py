@@ -0,0 +1,185 @@
+"""
+Lazy frame sequence backed by the ffmpeg decoder.
+
+A :class:`FrameSequence` describes a (range of a) video as a sequence of
+frames without decoding it. Indexing and slicing decode only the requested
+window, keeping a small LRU of decoded chunks, so long or high-resolution
+clips can be walked through without materializing the full IMAGE batch.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import torch
+
+from . import decoder
+
+# ComfyUI socket type carrying a FrameSequence between nodes
+FRAME_SEQUENCE = "FRAME_SEQUENCE"
+
+
+class FrameSequence:
+    """
+    Lazily decoded, indexable view of a video's frames.
+
+    ``seq[i]`` returns a ``[H, W, 3]`` float32 frame and ``seq[a:b:c]`` a
+    ``[N, H, W, 3]`` IMAGE batch, matching how an eager IMAGE tensor indexes.
+    """
+
+    def __init__(
+        self,
+        video_path: str,
+        info: Optional[Dict[str, Union[float, int]]] = None,
+        max_width: int = 0,
+        start_time: float = 0.0,
+        end_time: float = 0.0,
+        start_frame: int = 0,
+        frame_count: int = 0,
+        stride: int = 1,
+        window: int = 16,
+        max_windows: int = 4,
+        use_cache: bool = False,
+        crop: str = "",
+        width: int = 0,
+        height: int = 0,
+        scaler: str = "",
+        pix_fmt: str = "rgb24",
+        rate: float = 0.0,
+    ):
+        self.video_path = video_path
+        self.info = info if info is not None else decoder.probe_video(video_path)
+        self.max_width = max_width
+        self.stride = max(int(stride), 1)
+        self.window = max(int(window), 1)
+        self.max_windows = max(int(max_windows), 1)
+        self.use_cache = use_cache
+        self.rate = rate
+        self.output = dict(
+            crop=crop, width=width, height=height, scaler=scaler, pix_fmt=pix_fmt
+        )
+
+        fps = self.info["fps"]
+        selection = decoder.select_range(
+            self.info, start_time, end_time, start_frame, frame_count, self.stride, rate
+        )
+        # Work in source frame indices from here on; input seeking lands on
+        # the first frame at or after the seek point, hence ceil
+        self.first_frame = (
+            start_frame
+            if start_frame > 0
+            else max(int(math.ceil(selection["seek"] * fps - 1e-3)), 0)
+        )
+        self.start = selection["seek"]
+        self._length = selection["expected"]
+        _, self.width, self.height, self.channels = decoder.output_filters(
+            self.info, max_width, **self.output
+        )
+        rate = rate if rate > 0 else fps
+        self.fps = rate / self.stride if rate > 0 else 0.0
+        # Length of the selected range in seconds of source time
+        self.duration = len(self) * self.stride / rate if rate > 0 else 0.0
+
+        self._windows: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self) -> str:
+        return (
+            f"FrameSequence({self.video_path!r}, frames={len(self)}, "
+            f"size={self.width}x{self.height}, stride={self.stride})"
+        )
+
+    @property
+    def shape(self):
+        return (len(self), self.height, self.width, 3)
+
+    def _decode(self, index: int, count: int, stride: int) -> np.ndarray:
+        """Decode ``count`` frames starting at sequence index ``index``."""
+        if self.rate > 0:
+            # Resampled frames have no source index; address them by time
+            fps = self.info["fps"]
+            return decoder.decode_video(
+                self.video_path,
+                self.info,
+                self.max_width,
+                start_time=self.start + index * self.stride / self.rate,
+                frame_count=int(np.ceil(count * stride * fps / self.rate)),
+                stride=stride,
+                use_cache=self.use_cache,
+                rate=self.rate,
+                **self.output,
+            )[:count]
+        return decoder.decode_video(
+            self.video_path,
+            self.info,
+            self.max_width,
+            start_frame=self.first_frame + index * self.stride,
+            frame_count=count * stride,
+            stride=stride,
+            use_cache=self.use_cache,
+            **self.output,
+        )
+
+    def _window(self, window_index: int) -> np.ndarray:
+        with self._lock:
+            frames = self._windows.get(window_index)
+            if frames is not None:
+                self._windows.move_to_end(window_index)
+                return frames
+
+        start = window_index * self.window
+        count = min(self.window, len(self) - start)
+        frames = self._decode(start, count, self.stride)
+
+        with self._lock:
+            self._windows[window_index] = frames
+            self._windows.move_to_end(window_index)
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+        return frames
+
+    def get_frames(self, indices: List[int]) -> np.ndarray:
+        """Return the uint8 frames at the given sequence indices."""
+        out = np.empty(
+            (len(indices), self.height, self.width, self.channels), dtype=np.uint8
+        )
+        filled = 0
+        for i in indices:
+            frames = self._window(i // self.window)
+            offset = i % self.window
+            if offset >= len(frames):
+                # The container over-reported its length; stop at the real end
+                break
+            out[filled] = frames[offset]
+            filled += 1
+        return out[:filled]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            indices = range(*key.indices(len(self)))
+            step = indices.step
+            if step > 0 and len(indices) > self.window * self.max_windows:
+                # Too large for the window cache; decode the span in one pass
+                frames = self._decode(indices.start, len(indices), self.stride * step)
+            else:
+                frames = self.get_frames(list(indices))
+            return decoder.frames_to_tensor(frames)
+
+        index = int(key)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FrameSequence index out of range")
+        frames = self.get_frames([index])
+        if not len(frames):
+            raise IndexError("FrameSequence index out of range")
+        return decoder.frames_to_tensor(frames)[0]
+
+    def to_tensor(self) -> torch.Tensor:
+        """Materialize the whole sequence as an IMAGE batch."""
+        return self[:]
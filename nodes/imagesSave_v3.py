@@ -1,10 +1,12 @@
 import os
-import torch
-from PIL import Image
-import numpy as np
 import folder_paths
 from comfy_api.latest import io
 
+try:
+    from ..func import IMAGE_SAVE_FORMATS, images_to_uint8, save_images
+except ImportError:
+    from func import IMAGE_SAVE_FORMATS, images_to_uint8, save_images
+
 
 class SaveImagesV3(io.ComfyNode):
     """
@@ -29,21 +31,67 @@ class SaveImagesV3(io.ComfyNode):
                     default="image",
                     tooltip="The prefix for the saved image filenames.",
                 ),
+                io.Combo.Input(
+                    "format",
+                    options=list(IMAGE_SAVE_FORMATS),
+                    default="png",
+                    tooltip="File format; npy stores the raw uint8 array.",
+                ),
+                io.Int.Input(
+                    "compress_level",
+                    default=6,
+                    min=0,
+                    max=9,
+                    tooltip="PNG compression level (0 = fastest, 9 = smallest).",
+                ),
+                io.Int.Input(
+                    "quality",
+                    default=95,
+                    min=1,
+                    max=100,
+                    tooltip="JPEG and lossy WebP quality.",
+                ),
+                io.Boolean.Input(
+                    "archive",
+                    default=False,
+                    tooltip="Pack the batch into a single .tar file instead of one file per image.",
+                ),
+                io.Int.Input(
+                    "workers",
+                    default=0,
+                    min=0,
+                    max=64,
+                    tooltip="Parallel image encoders (0 = based on CPU cores).",
+                ),
             ],
             outputs=[],  # Output node returning nothing
         )
 
     @classmethod
-    def execute(cls, images, directory, filename_prefix) -> io.NodeOutput:
+    def execute(
+        cls,
+        images,
+        directory,
+        filename_prefix,
+        format="png",
+        compress_level=6,
+        quality=95,
+        archive=False,
+        workers=0,
+    ) -> io.NodeOutput:
         output_dir = os.path.join(folder_paths.get_output_directory(), directory)
-        os.makedirs(output_dir, exist_ok=True)
 
-        for i, image_tensor in enumerate(images):
-            # Ensure tensor is CPU and numpy-compatible
-            img_np = (image_tensor.cpu().numpy() * 255).astype(np.uint8)
-            img = Image.fromarray(img_np)
-
-            filepath = os.path.join(output_dir, f"{filename_prefix}_{i:05d}.png")
-            img.save(filepath)
+        # Convert the whole batch on its device and transfer it once
+        frames = images_to_uint8(images).numpy()
+        save_images(
+            frames,
+            output_dir,
+            filename_prefix,
+            format,
+            compress_level,
+            quality,
+            archive,
+            workers or None,
+        )
 
         return io.NodeOutput()
@@ -1,10 +1,9 @@
 import os
 import subprocess
-import json
 from datetime import datetime, timedelta
-from bisect import bisect_left
 import folder_paths
 from comfy_api.latest import io
+from . import keyframeindex
 
 
 class KeyframeTrimV3(io.ComfyNode):
@@ -39,38 +38,12 @@ class KeyframeTrimV3(io.ComfyNode):
 
     @staticmethod
     def _get_keyframes(video):
-        command = [
-            "ffprobe",
-            "-v",
-            "error",
-            "-select_streams",
-            "v:0",
-            "-show_entries",
-            "frame=pkt_pts_time,pts_time,best_effort_timestamp_time,pict_type",
-            "-of",
-            "json",
-            video,
-        ]
-        result = subprocess.run(command, check=True, capture_output=True, text=True)
-        frames = json.loads(result.stdout)["frames"]
-        keyframes = []
-        for f in frames:
-            if f.get("pict_type") == "I":
-                time_val = (
-                    f.get("pkt_pts_time")
-                    or f.get("pts_time")
-                    or f.get("best_effort_timestamp_time")
-                )
-                if time_val:
-                    keyframes.append(float(time_val))
-        return keyframes
+        # Served from the persistent keyframe index after the first scan
+        return keyframeindex.get(video).keyframes
 
     @staticmethod
     def _find_nearest_keyframe(time_sec, keyframes):
-        if not keyframes:
-            return None
-        pos = bisect_left(keyframes, time_sec)
-        return min(keyframes[max(0, pos - 1) : pos + 1], key=lambda x: abs(x - time_sec))
+        return keyframeindex.nearest_keyframe(keyframes, time_sec)
 
     @classmethod
     def execute(cls, video, start_time, end_time, filename) -> io.NodeOutput:
@@ -100,8 +73,11 @@ class KeyframeTrimV3(io.ComfyNode):
         ).total_seconds()
 
         keyframes = cls._get_keyframes(video)
-        start_keyframe = cls._find_nearest_keyframe(start_sec, keyframes)
-        end_keyframe = cls._find_nearest_keyframe(end_sec, keyframes)
+        if not len(keyframes):
+            raise RuntimeError("No keyframes found in video.")
+        start_keyframe, end_keyframe = cls._find_nearest_keyframe(
+            [start_sec, end_sec], keyframes
+        ).tolist()
 
         if start_keyframe >= end_keyframe:
             raise ValueError("Start time must be before end time.")
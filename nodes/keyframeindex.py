@@ -0,0 +1,287 @@
+"""
+Persistent keyframe index.
+
+The first video stream is indexed once per file identity (real path, size,
+mtime) and stored as a compact ``.npz`` sidecar: a sorted float64 array of
+packet timestamps plus the int64 positions of the keyframes in it. MP4/MOV
+and Matroska files are indexed from their own sample tables or cues (see
+:mod:`containerindex`); other files fall back to an ffprobe packet scan.
+
+Smart cut, keyframe trimming, chunked decoding and the metadata route all
+read from this index, and the lookup helpers answer nearest, previous and
+next keyframe queries for whole arrays of timestamps at once.
+"""
+
+import hashlib
+import json
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import containerindex
+from . import diskcache
+from . import probecache
+
+DEFAULT_MAX_BYTES = 256 * 1024**2
+CACHE = diskcache.DiskCache("keyframes", ".npz", DEFAULT_MAX_BYTES)
+# Indices kept in memory, most recently used last
+MEMORY_ENTRIES = 32
+# Part of every sidecar key; bump to orphan sidecars written by an older reader
+INDEX_VERSION = 2
+
+_memory: "OrderedDict[Tuple[str, int, int], KeyframeIndex]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _as_result(values: np.ndarray, scalar: bool):
+    # Scalars come back as float or None, arrays keep NaN for "no keyframe"
+    if not scalar:
+        return values
+    value = float(values[0])
+    return None if np.isnan(value) else value
+
+
+def _take(keyframes: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    valid = (idx >= 0) & (idx < len(keyframes))
+    out = np.full(idx.shape, np.nan)
+    out[valid] = keyframes[idx[valid]]
+    return out
+
+
+def prev_keyframe(keyframes, times):
+    """
+    Keyframe at or before each time.
+
+    Args:
+        keyframes: Sorted keyframe timestamps.
+        times: A timestamp or array of timestamps.
+
+    Returns:
+        A float (None if there is none) for a scalar, else a float64 array
+        with NaN where no keyframe precedes the time.
+    """
+    keyframes = np.asarray(keyframes, dtype=np.float64)
+    t = np.atleast_1d(np.asarray(times, dtype=np.float64))
+    idx = np.searchsorted(keyframes, t, side="right") - 1
+    return _as_result(_take(keyframes, idx), np.ndim(times) == 0)
+
+
+def next_keyframe(keyframes, times):
+    """Keyframe strictly after each time; see :func:`prev_keyframe`."""
+    keyframes = np.asarray(keyframes, dtype=np.float64)
+    t = np.atleast_1d(np.asarray(times, dtype=np.float64))
+    idx = np.searchsorted(keyframes, t, side="right")
+    return _as_result(_take(keyframes, idx), np.ndim(times) == 0)
+
+
+def nearest_keyframe(keyframes, times):
+    """Closest keyframe to each time, the earlier one on ties; see :func:`prev_keyframe`."""
+    keyframes = np.asarray(keyframes, dtype=np.float64)
+    t = np.atleast_1d(np.asarray(times, dtype=np.float64))
+    if not len(keyframes):
+        return _as_result(np.full(t.shape, np.nan), np.ndim(times) == 0)
+    hi = np.clip(np.searchsorted(keyframes, t, side="left"), 0, len(keyframes) - 1)
+    lo = np.clip(hi - 1, 0, len(keyframes) - 1)
+    use_lo = np.abs(t - keyframes[lo]) <= np.abs(keyframes[hi] - t)
+    return _as_result(np.where(use_lo, keyframes[lo], keyframes[hi]), np.ndim(times) == 0)
+
+
+class KeyframeIndex:
+    """
+    Packet timestamps of a video stream and which of them are keyframes.
+
+    ``complete`` is False when only the keyframes are known (Matroska cues),
+    in which case ``pts`` holds just the keyframe timestamps.
+    """
+
+    __slots__ = ("pts", "key_positions", "keyframes", "complete")
+
+    def __init__(self, pts: np.ndarray, key_positions: np.ndarray, complete: bool = True):
+        self.pts = pts
+        self.key_positions = key_positions
+        self.keyframes = pts[key_positions]
+        self.complete = complete
+
+    def __len__(self) -> int:
+        return len(self.pts)
+
+    def __repr__(self) -> str:
+        packets = f"{len(self.pts)} packets" if self.complete else "keyframes only"
+        return f"<KeyframeIndex {packets}, {len(self.keyframes)} keyframes>"
+
+    def packets(self) -> List[Tuple[float, bool]]:
+        """``(pts_time, is_keyframe)`` for every packet, sorted by timestamp."""
+        is_key = np.zeros(len(self.pts), dtype=bool)
+        is_key[self.key_positions] = True
+        return list(zip(self.pts.tolist(), is_key.tolist()))
+
+    def prev(self, times):
+        return prev_keyframe(self.keyframes, times)
+
+    def next(self, times):
+        return next_keyframe(self.keyframes, times)
+
+    def nearest(self, times):
+        return nearest_keyframe(self.keyframes, times)
+
+
+def scan(video_path: str) -> KeyframeIndex:
+    """
+    Build an index by reading the packet headers of the first video stream.
+
+    Nothing is decoded.
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails.
+    """
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,flags",
+        "-of",
+        "csv=p=0",
+        video_path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    pts = []
+    flags = []
+    for line in result.stdout.splitlines():
+        parts = line.split(",")
+        if len(parts) >= 2:
+            try:
+                pts.append(float(parts[0]))
+            except ValueError:
+                continue
+            # K flag indicates keyframe
+            flags.append("K" in parts[1])
+
+    pts = np.asarray(pts, dtype=np.float64)
+    order = np.argsort(pts, kind="stable")
+    is_key = np.asarray(flags, dtype=bool)[order]
+    return KeyframeIndex(pts[order], np.flatnonzero(is_key).astype(np.int64))
+
+
+def build(video_path: str, packets: bool = False) -> KeyframeIndex:
+    """
+    Index a file from its container tables, scanning packets only if needed.
+
+    Args:
+        video_path: Path to the video file.
+        packets: Require every packet timestamp, not just the keyframes.
+
+    Raises:
+        subprocess.CalledProcessError: If the fallback ffprobe scan fails.
+    """
+    table = containerindex.read_index(video_path)
+    if table is not None and table.pts is not None:
+        return KeyframeIndex(table.pts, table.key_positions)
+    if table is not None and not packets:
+        positions = np.arange(len(table.keyframes), dtype=np.int64)
+        return KeyframeIndex(table.keyframes, positions, complete=False)
+    return scan(video_path)
+
+
+def _disk_path(key: Tuple[str, int, int]) -> str:
+    payload = json.dumps([INDEX_VERSION, *key])
+    digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    return CACHE.path(digest)
+
+
+def _load_disk(key: Tuple[str, int, int]) -> Optional[KeyframeIndex]:
+    path = _disk_path(key)
+    try:
+        with np.load(path) as data:
+            complete = bool(data["complete"]) if "complete" in data.files else True
+            index = KeyframeIndex(data["pts"], data["key_positions"], complete)
+    except (OSError, ValueError, KeyError):
+        return None
+    CACHE.touch(path)
+    return index
+
+
+def _store_disk(key: Tuple[str, int, int], index: KeyframeIndex) -> None:
+    try:
+        CACHE.write(
+            _disk_path(key),
+            lambda f: np.savez(
+                f,
+                pts=index.pts,
+                key_positions=index.key_positions,
+                complete=np.bool_(index.complete),
+            ),
+        )
+    except OSError as e:
+        print(f"[KeyframeIndex] Failed to store index: {e}")
+        return
+    CACHE.evict()
+
+
+def get(video_path: str, packets: bool = False) -> KeyframeIndex:
+    """
+    Keyframe index of a file, building it only if no index exists for its
+    current identity.
+
+    Args:
+        video_path: Path to the video file.
+        packets: Require every packet timestamp; a keyframes-only index is
+            then replaced by a full packet scan.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        subprocess.CalledProcessError: If ffprobe fails (failures are not cached).
+    """
+    key = probecache.file_key(video_path)
+    with _lock:
+        index = _memory.get(key)
+        if index is not None and (index.complete or not packets):
+            _memory.move_to_end(key)
+            return index
+
+    index = _load_disk(key)
+    if index is None or (packets and not index.complete):
+        index = build(key[0], packets)
+        _store_disk(key, index)
+
+    with _lock:
+        _memory[key] = index
+        while len(_memory) > MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+    return index
+
+
+def set_max_bytes(max_bytes: int) -> None:
+    """Set the on-disk size cap and evict entries above it."""
+    CACHE.set_max_bytes(max_bytes)
+
+
+def evict() -> int:
+    """Delete least-recently-used sidecars until the directory fits its cap."""
+    return CACHE.evict()
+
+
+def purge() -> int:
+    """Forget every index in memory and on disk; returns sidecars removed."""
+    with _lock:
+        _memory.clear()
+    return CACHE.purge()
+
+
+def stats() -> Dict:
+    """Summary of the index cache for display in the UI."""
+    entries = CACHE.entries()
+    with _lock:
+        in_memory = len(_memory)
+    return {
+        "directory": CACHE.directory,
+        "entries": len(entries),
+        "bytes": sum(e.stat().st_size for e in entries),
+        "max_bytes": CACHE.max_bytes,
+        "in_memory": in_memory,
+    }
@@ -1,9 +1,25 @@
 import os
+import time
 import torch
-import numpy as np
-from PIL import Image
 from comfy_api.latest import io
 
+try:
+    from ..func import (
+        get_image_paths_from_directory,
+        load_images,
+        mark_files_seen,
+        new_files,
+        reset_seen_files,
+    )
+except ImportError:
+    from func import (
+        get_image_paths_from_directory,
+        load_images,
+        mark_files_seen,
+        new_files,
+        reset_seen_files,
+    )
+
 
 class LoadImagesFromDirectoryV3(io.ComfyNode):
     """
@@ -33,35 +49,67 @@ class LoadImagesFromDirectoryV3(io.ComfyNode):
                     min=0,
                     tooltip="The number of images to load. 0 means all images from start_index.",
                 ),
+                io.Boolean.Input(
+                    "incremental",
+                    default=False,
+                    tooltip="Only load images that are new since the previous run.",
+                ),
+                io.Boolean.Input(
+                    "recheck_changed",
+                    default=False,
+                    tooltip="In incremental mode, also reload images rewritten since they were loaded. Checks every file of the directory.",
+                ),
+                io.Boolean.Input(
+                    "reset",
+                    default=False,
+                    tooltip="Forget which images were already loaded before this run.",
+                ),
             ],
             outputs=[
                 io.Image.Output(tooltip="The loaded images as a batch tensor."),
+                io.Int.Output(tooltip="Number of images loaded."),
             ],
         )
 
     @classmethod
-    def execute(cls, directory: str, start_index: int, length: int) -> io.NodeOutput:
+    def fingerprint_inputs(cls, incremental=False, **kwargs):
+        # New files arrive outside the graph; re-run every time in incremental mode
+        return time.time() if incremental else ""
+
+    @classmethod
+    def execute(
+        cls,
+        directory: str,
+        start_index: int,
+        length: int,
+        incremental: bool = False,
+        reset: bool = False,
+        recheck_changed: bool = False,
+    ) -> io.NodeOutput:
         if not os.path.isdir(directory):
             raise FileNotFoundError(f"Directory not found: {directory}")
 
-        # Basic logic taken from V1 node
-        image_files = sorted(
-            [f for f in os.listdir(directory) if f.endswith((".png", ".jpg", ".jpeg"))]
-        )
-        if not image_files:
-            raise ValueError("No images found in the directory.")
+        if reset:
+            reset_seen_files(directory)
 
-        if start_index >= len(image_files):
-            raise ValueError("start_index is out of bounds.")
+        if incremental:
+            # Only the new (or, with recheck_changed, rewritten) files get decoded
+            candidates = get_image_paths_from_directory(directory, start_index, 0)
+            picked = new_files(directory, candidates, length, recheck_changed)
+            if not picked:
+                return io.NodeOutput(torch.zeros((0, 1, 1, 3)), 0)  # Dummy structure
+            images = load_images(list(picked))
+            mark_files_seen(directory, picked)
+            return io.NodeOutput(images, images.shape[0])
 
-        if length > 0:
-            image_files = image_files[start_index : start_index + length]
-        else:
-            image_files = image_files[start_index:]
+        # Served from the cached directory index; only the page is materialized
+        image_paths = get_image_paths_from_directory(directory, start_index, length)
+        if not image_paths:
+            if start_index > 0 and get_image_paths_from_directory(directory, 0, 1):
+                raise ValueError("start_index is out of bounds.")
+            raise ValueError("No images found in the directory.")
 
-        images = [Image.open(os.path.join(directory, f)) for f in image_files]
-        tensors = [
-            torch.from_numpy(np.array(img).astype(np.float32) / 255.0) for img in images
-        ]
+        # Decoded in parallel straight into one preallocated batch
+        images = load_images(image_paths)
 
-        return io.NodeOutput(torch.stack(tensors))
+        return io.NodeOutput(images, images.shape[0])
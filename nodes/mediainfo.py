@@ -0,0 +1,360 @@
+"""
+Typed view of a file's ffprobe result.
+
+:func:`probe` turns the single ``-show_format -show_streams -show_chapters``
+call made by :mod:`probecache` into small ``__slots__`` objects, so every
+node reads frame rates, durations, sizes and audio layouts the same way and
+with the same fallbacks.
+"""
+
+import csv
+import io
+import json
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from typing import Dict, List, Optional
+
+from . import probecache
+
+ZERO = Fraction(0)
+# Columns of a batch probe table, see summarize()
+SUMMARY_FIELDS = [
+    "path",
+    "duration",
+    "fps",
+    "width",
+    "height",
+    "frame_count",
+    "video_codec",
+    "pix_fmt",
+    "has_audio",
+    "audio_codec",
+    "sample_rate",
+    "channels",
+    "size",
+    "error",
+]
+# Upper bound on concurrent ffprobe processes in a batch
+MAX_BATCH_WORKERS = 16
+# A running batch may hold up to this many entries in the probe cache, never beyond
+MAX_BATCH_CACHE_ENTRIES = 8192
+
+
+def parse_rational(value) -> Fraction:
+    """Parse an ffprobe rational (``"30000/1001"``) or decimal; 0 when unknown."""
+    if value in (None, "", "N/A"):
+        return ZERO
+    try:
+        if isinstance(value, str) and "/" in value:
+            num, den = value.split("/", 1)
+            den = int(den)
+            return Fraction(int(num), den) if den != 0 else ZERO
+        return Fraction(str(value))
+    except (ValueError, ZeroDivisionError):
+        return ZERO
+
+
+def parse_float(value, default: float = 0.0) -> float:
+    """Parse an ffprobe number, returning ``default`` for missing or ``N/A`` values."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_int(value, default: int = 0) -> int:
+    """Parse an ffprobe integer, returning ``default`` for missing or ``N/A`` values."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_clock(value) -> float:
+    """Parse a Matroska ``HH:MM:SS.fraction`` duration tag; 0.0 when unknown."""
+    if not value:
+        return 0.0
+    try:
+        hours, minutes, seconds = value.split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return 0.0
+
+
+def _tag(tags: Dict, name: str):
+    """Tag value by case-insensitive name, also matching ``NAME-eng`` variants."""
+    name = name.lower()
+    for key, value in tags.items():
+        key = key.lower()
+        if key == name or key.startswith(name + "-"):
+            return value
+    return None
+
+
+class StreamInfo:
+    """One stream of a media file."""
+
+    __slots__ = (
+        "index",
+        "codec_type",
+        "codec_name",
+        "profile",
+        "bit_rate",
+        "time_base",
+        "start_time",
+        "duration",
+        "nb_frames",
+        "language",
+        "width",
+        "height",
+        "pix_fmt",
+        "rotation",
+        "frame_rate",
+        "avg_frame_rate",
+        "field_order",
+        "color_range",
+        "color_space",
+        "sample_rate",
+        "channels",
+        "channel_layout",
+        "sample_fmt",
+        "raw",
+    )
+
+    def __init__(self, stream: Dict, format_duration: float = 0.0):
+        tags = stream.get("tags", {})
+        self.index = parse_int(stream.get("index"))
+        self.codec_type = stream.get("codec_type", "")
+        self.codec_name = stream.get("codec_name", "")
+        self.profile = stream.get("profile", "")
+        self.bit_rate = parse_int(stream.get("bit_rate") or _tag(tags, "BPS"))
+        self.time_base = parse_rational(stream.get("time_base"))
+        self.start_time = parse_float(stream.get("start_time"))
+        # Matroska stores stream durations only as tags
+        self.duration = (
+            parse_float(stream.get("duration"))
+            or parse_clock(_tag(tags, "DURATION"))
+            or format_duration
+        )
+        self.nb_frames = parse_int(
+            stream.get("nb_frames") or _tag(tags, "NUMBER_OF_FRAMES")
+        )
+        self.language = tags.get("language", "")
+
+        self.width = parse_int(stream.get("width"))
+        self.height = parse_int(stream.get("height"))
+        self.pix_fmt = stream.get("pix_fmt", "")
+        rotation = tags.get("rotate", 0)
+        for side_data in stream.get("side_data_list", []):
+            if "rotation" in side_data:
+                rotation = side_data["rotation"]
+        self.rotation = int(parse_float(rotation))
+        self.frame_rate = parse_rational(stream.get("r_frame_rate"))
+        self.avg_frame_rate = parse_rational(stream.get("avg_frame_rate"))
+        self.field_order = stream.get("field_order", "")
+        self.color_range = stream.get("color_range", "")
+        self.color_space = stream.get("color_space", "")
+
+        self.sample_rate = parse_int(stream.get("sample_rate"))
+        self.channels = parse_int(stream.get("channels"))
+        self.channel_layout = stream.get("channel_layout", "")
+        self.sample_fmt = stream.get("sample_fmt", "")
+        self.raw = stream
+
+    def __repr__(self) -> str:
+        return f"<StreamInfo #{self.index} {self.codec_type}/{self.codec_name}>"
+
+    @property
+    def fps(self) -> float:
+        """Frame rate as a float, preferring ``r_frame_rate``."""
+        return float(self.frame_rate or self.avg_frame_rate)
+
+    @property
+    def display_size(self):
+        """``(width, height)`` as displayed; ffmpeg auto-rotates 90/270 degree streams."""
+        if self.rotation % 180 != 0:
+            return self.height, self.width
+        return self.width, self.height
+
+    @property
+    def frame_count(self) -> int:
+        """Stored frame count, or an estimate from duration and frame rate."""
+        if self.nb_frames:
+            return self.nb_frames
+        return int(round(self.duration * float(self.avg_frame_rate or self.frame_rate)))
+
+
+class ChapterInfo:
+    """One chapter of a media file."""
+
+    __slots__ = ("id", "start", "end", "title")
+
+    def __init__(self, chapter: Dict):
+        self.id = parse_int(chapter.get("id"))
+        self.start = parse_float(chapter.get("start_time"))
+        self.end = parse_float(chapter.get("end_time"))
+        self.title = chapter.get("tags", {}).get("title", "")
+
+    def __repr__(self) -> str:
+        return f"<ChapterInfo {self.start:.3f}-{self.end:.3f} {self.title!r}>"
+
+
+class MediaInfo:
+    """Container-level information plus every stream and chapter of a file."""
+
+    __slots__ = (
+        "path",
+        "format_name",
+        "duration",
+        "start_time",
+        "size",
+        "bit_rate",
+        "tags",
+        "streams",
+        "chapters",
+    )
+
+    def __init__(self, path: str, data: Dict):
+        fmt = data.get("format", {})
+        self.path = path
+        self.format_name = fmt.get("format_name", "")
+        self.duration = parse_float(fmt.get("duration"))
+        self.start_time = parse_float(fmt.get("start_time"))
+        self.size = parse_int(fmt.get("size"))
+        self.bit_rate = parse_int(fmt.get("bit_rate"))
+        self.tags = fmt.get("tags", {})
+        self.streams = [
+            StreamInfo(stream, self.duration) for stream in data.get("streams", [])
+        ]
+        self.chapters = [ChapterInfo(chapter) for chapter in data.get("chapters", [])]
+
+    def __repr__(self) -> str:
+        return f"<MediaInfo {self.path!r} {len(self.streams)} stream(s)>"
+
+    def streams_of(self, codec_type: str) -> List[StreamInfo]:
+        """All streams of ``codec_type`` (``"video"``, ``"audio"``, ``"subtitle"``...)."""
+        return [s for s in self.streams if s.codec_type == codec_type]
+
+    @property
+    def video(self) -> Optional[StreamInfo]:
+        """First video stream, ignoring attached cover art."""
+        for stream in self.streams_of("video"):
+            if not stream.raw.get("disposition", {}).get("attached_pic"):
+                return stream
+        return None
+
+    @property
+    def audio(self) -> Optional[StreamInfo]:
+        """First audio stream."""
+        streams = self.streams_of("audio")
+        return streams[0] if streams else None
+
+
+def probe(path: str) -> MediaInfo:
+    """
+    Probe a file once (served from :mod:`probecache` afterwards).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        subprocess.CalledProcessError: If ffprobe fails.
+    """
+    return MediaInfo(path, probecache.probe_json(path))
+
+
+def probe_video_stream(path: str) -> StreamInfo:
+    """
+    First video stream of a file.
+
+    Raises:
+        RuntimeError: If the file cannot be probed or has no video stream.
+    """
+    try:
+        stream = probe(path).video
+    except subprocess.CalledProcessError:
+        stream = None
+    if stream is None:
+        raise RuntimeError(f"No video streams found in {path}")
+    return stream
+
+
+def summarize(path: str) -> Dict:
+    """
+    One row of a batch probe table for ``path``.
+
+    Failures do not raise; the row then only carries ``path`` and ``error``.
+    """
+    row = dict.fromkeys(SUMMARY_FIELDS)
+    row["path"] = path
+    try:
+        info = probe(path)
+    except subprocess.CalledProcessError as e:
+        row["error"] = (e.stderr or "ffprobe failed").strip()
+        return row
+    except OSError as e:
+        row["error"] = str(e)
+        return row
+
+    row["duration"] = info.duration
+    row["size"] = info.size
+    video = info.video
+    if video is not None:
+        width, height = video.display_size
+        row.update(
+            duration=video.duration,
+            fps=video.fps,
+            width=width,
+            height=height,
+            frame_count=video.frame_count,
+            video_codec=video.codec_name,
+            pix_fmt=video.pix_fmt,
+        )
+    audio = info.audio
+    row["has_audio"] = audio is not None
+    if audio is not None:
+        row.update(
+            audio_codec=audio.codec_name,
+            sample_rate=audio.sample_rate,
+            channels=audio.channels,
+        )
+    return row
+
+
+def probe_batch(paths: List[str], workers: int = 0) -> List[Dict]:
+    """
+    Summarize many files concurrently, in input order.
+
+    Every file goes through the probe cache, which holds the whole batch (up
+    to :data:`MAX_BATCH_CACHE_ENTRIES`) while it runs and returns to its
+    configured cap afterwards, keeping the most recently probed files.
+
+    Args:
+        paths: Files to probe.
+        workers: Concurrent ffprobe processes (0 = twice the CPU cores, at
+            most :data:`MAX_BATCH_WORKERS`).
+
+    Returns:
+        One :func:`summarize` row per path.
+    """
+    if not paths:
+        return []
+    if workers <= 0:
+        workers = (os.cpu_count() or 1) * 2
+    workers = min(workers, MAX_BATCH_WORKERS, len(paths))
+    with probecache.reserve(min(len(paths), MAX_BATCH_CACHE_ENTRIES)):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(summarize, paths))
+
+
+def format_table(rows: List[Dict], fmt: str = "json") -> str:
+    """Render batch probe rows as a JSON array or as CSV with a header line."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=SUMMARY_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue()
+    if fmt == "json":
+        return json.dumps(rows, indent=4)
+    raise ValueError(f"Unsupported table format: {fmt}")
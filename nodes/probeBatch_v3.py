@@ -0,0 +1,69 @@
+import os
+from comfy_api.latest import io
+from . import mediainfo
+
+try:
+    from ..func import list_directory, video_type
+except ImportError:
+    from func import list_directory, video_type
+
+
+def expand_paths(entries):
+    """Expand directories to the videos they contain, keeping files as given."""
+    paths = []
+    for entry in entries:
+        if os.path.isdir(entry):
+            paths.extend(list_directory(entry, video_type()))
+        else:
+            paths.append(entry)
+    return paths
+
+
+class ProbeBatchV3(io.ComfyNode):
+    """
+    A V3 node to probe many videos at once and tabulate their metadata.
+    """
+
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        return io.Schema(
+            node_id="ProbeBatchV3",
+            display_name="🔥Probe Batch (V3)",
+            category="🔥FFmpeg/Metadata",
+            inputs=[
+                io.String.Input(
+                    "paths",
+                    multiline=True,
+                    tooltip="Video files or directories, one per line. Directories are expanded to their videos.",
+                ),
+                io.Combo.Input(
+                    "format",
+                    ["json", "csv"],
+                    default="json",
+                    tooltip="Table format of the output.",
+                ),
+                io.Int.Input(
+                    "workers",
+                    default=0,
+                    min=0,
+                    max=mediainfo.MAX_BATCH_WORKERS,
+                    tooltip="Concurrent ffprobe processes. 0 = based on the number of CPU cores.",
+                ),
+            ],
+            outputs=[
+                io.String.Output(tooltip="One row per file: duration, fps, size, codecs, audio."),
+                io.Int.Output(tooltip="Number of files probed successfully."),
+            ],
+        )
+
+    @classmethod
+    def execute(cls, paths, format="json", workers=0) -> io.NodeOutput:
+        entries = [line.strip() for line in paths.splitlines() if line.strip()]
+        files = expand_paths(entries)
+        if not files:
+            raise ValueError("No video files to probe.")
+
+        rows = mediainfo.probe_batch(files, workers)
+        probed = sum(1 for row in rows if row["error"] is None)
+        print(f"[ProbeBatch] Probed {probed}/{len(rows)} files")
+        return io.NodeOutput(mediainfo.format_table(rows, format), probed)
@@ -0,0 +1,225 @@
+"""
+Process-wide cache of ffprobe results.
+
+Each file is probed once with ``-show_format -show_streams -show_chapters``
+and the parsed JSON is kept in a bounded in-memory LRU, keyed by the file
+identity (real path, size, mtime). Replacing or editing a file changes its key, so stale
+results are never served. Entries can optionally be persisted as small JSON
+files so probes also survive restarts.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from . import diskcache
+
+DEFAULT_MAX_ENTRIES = 1024
+# Cap of the persisted results; each is a few KB of JSON
+DEFAULT_MAX_BYTES = 64 * 1024**2
+CACHE = diskcache.DiskCache("probe", ".json", DEFAULT_MAX_BYTES)
+
+_max_entries = DEFAULT_MAX_ENTRIES
+# Caps of the batches running now; the cache holds the largest of these too
+_reserved: List[int] = []
+_persist = False
+_entries: "OrderedDict[Tuple[str, int, int], Dict]" = OrderedDict()
+_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def set_max_entries(max_entries: int) -> None:
+    """Set the in-memory entry cap and evict entries above it."""
+    global _max_entries
+    _max_entries = max(int(max_entries), 1)
+    with _lock:
+        _trim()
+
+
+def get_max_entries() -> int:
+    return _max_entries
+
+
+def _trim() -> None:
+    # Caller holds _lock
+    limit = max([_max_entries, *_reserved])
+    while len(_entries) > limit:
+        _entries.popitem(last=False)
+
+
+@contextmanager
+def reserve(max_entries: int):
+    """
+    Hold at least ``max_entries`` results while the block runs, e.g. a batch.
+
+    The configured cap is left alone; entries above it are evicted when the
+    block exits.
+    """
+    entries = max(int(max_entries), 1)
+    with _lock:
+        _reserved.append(entries)
+    try:
+        yield
+    finally:
+        with _lock:
+            _reserved.remove(entries)
+            _trim()
+
+
+def set_persist(enabled: bool) -> None:
+    """Also store probe results on disk, see :data:`CACHE`."""
+    global _persist
+    _persist = bool(enabled)
+
+
+def file_key(path: str) -> Tuple[str, int, int]:
+    """
+    Identity of a file as ``(realpath, size, mtime_ns)``.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    real_path = os.path.realpath(path)
+    st = os.stat(real_path)
+    return real_path, st.st_size, st.st_mtime_ns
+
+
+def _disk_path(key: Tuple[str, int, int]) -> str:
+    digest = hashlib.sha1(json.dumps(list(key)).encode("utf-8")).hexdigest()
+    return CACHE.path(digest)
+
+
+def _load_disk(key: Tuple[str, int, int]) -> Optional[Dict]:
+    path = _disk_path(key)
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    CACHE.touch(path)
+    return data
+
+
+def _store_disk(key: Tuple[str, int, int], data: Dict) -> None:
+    try:
+        CACHE.write(_disk_path(key), lambda f: json.dump(data, f), mode="w")
+    except OSError:
+        return
+    CACHE.evict()
+
+
+def run_ffprobe(path: str) -> Dict:
+    """
+    Probe a file's format, streams and chapters, bypassing the cache.
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails.
+    """
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_format",
+        "-show_streams",
+        "-show_chapters",
+        "-of",
+        "json",
+        path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    try:
+        data = json.loads(result.stdout or "{}")
+    except json.JSONDecodeError:
+        data = {}
+    if result.returncode != 0 or not data:
+        raise subprocess.CalledProcessError(
+            result.returncode or 1, cmd, output=result.stdout, stderr=result.stderr
+        )
+    return data
+
+
+def probe_json(path: str) -> Dict:
+    """
+    Return the ffprobe ``format``/``streams``/``chapters`` JSON of a file, probing at most
+    once per file identity.
+
+    The result is shared between callers and must not be modified.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        subprocess.CalledProcessError: If ffprobe fails (failures are not cached).
+    """
+    global _hits, _misses
+    key = file_key(path)
+    with _lock:
+        data = _entries.get(key)
+        if data is not None:
+            _entries.move_to_end(key)
+            _hits += 1
+            return data
+
+    data = _load_disk(key) if _persist else None
+    if data is None:
+        data = run_ffprobe(key[0])
+        if _persist:
+            _store_disk(key, data)
+
+    with _lock:
+        _misses += 1
+        _entries[key] = data
+        _entries.move_to_end(key)
+        _trim()
+    return data
+
+
+def first_stream(data: Dict, codec_type: str) -> Optional[Dict]:
+    """First stream of ``codec_type`` (``"video"``, ``"audio"``, ...) in a probe result."""
+    for stream in data.get("streams", []):
+        if stream.get("codec_type") == codec_type:
+            return stream
+    return None
+
+
+def invalidate(path: Optional[str] = None) -> int:
+    """
+    Forget cached results for one file (any version of it), or for all files.
+
+    Returns:
+        Number of in-memory entries removed.
+    """
+    with _lock:
+        if path is None:
+            removed = len(_entries)
+            _entries.clear()
+            return removed
+        real_path = os.path.realpath(path)
+        stale = [key for key in _entries if key[0] == real_path]
+        for key in stale:
+            del _entries[key]
+        return len(stale)
+
+
+def purge() -> int:
+    """Clear the in-memory cache and delete persisted entries; returns entries removed."""
+    return invalidate() + CACHE.purge()
+
+
+def stats() -> Dict:
+    """Summary of the cache for display in the UI."""
+    with _lock:
+        files: List[str] = [key[0] for key in reversed(_entries)]
+        return {
+            "directory": CACHE.directory,
+            "persist": _persist,
+            "entries": len(files),
+            "max_entries": _max_entries,
+            "hits": _hits,
+            "misses": _misses,
+            "files": files,
+        }
@@ -8,13 +8,34 @@ while copying the rest of the video stream losslessly.
 import os
 import subprocess
 import tempfile
-import bisect
 from typing import List, Tuple, Optional
 
+from . import keyframeindex
+
+
+def scan_packets(video_path: str) -> List[Tuple[float, bool]]:
+    """
+    Get the timestamp and keyframe flag of every video packet.
+
+    Served from the persistent keyframe index; only packet headers are read,
+    nothing is decoded.
+
+    Args:
+        video_path: Path to the video file.
+
+    Returns:
+        List of ``(pts_time, is_keyframe)`` tuples sorted by timestamp.
+    """
+    try:
+        return keyframeindex.get(video_path, packets=True).packets()
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[SmartCut] Failed to get keyframes: {getattr(e, 'stderr', e)}")
+        return []
+
 
 def get_keyframe_timestamps(video_path: str) -> List[float]:
     """
-    Get all keyframe timestamps from a video file using ffprobe.
+    Get all keyframe timestamps from a video file.
 
     Args:
         video_path: Path to the video file.
@@ -22,39 +43,15 @@ def get_keyframe_timestamps(video_path: str) -> List[float]:
     Returns:
         List of keyframe timestamps in seconds, sorted.
     """
-    cmd = [
-        "ffprobe",
-        "-v",
-        "error",
-        "-select_streams",
-        "v:0",
-        "-show_entries",
-        "packet=pts_time,flags",
-        "-of",
-        "csv=p=0",
-        video_path,
-    ]
-
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        keyframes = []
-        for line in result.stdout.strip().split("\n"):
-            if not line:
-                continue
-            parts = line.split(",")
-            if len(parts) >= 2 and "K" in parts[1]:  # K flag indicates keyframe
-                try:
-                    keyframes.append(float(parts[0]))
-                except ValueError:
-                    continue
-        return sorted(keyframes)
-    except subprocess.CalledProcessError as e:
-        print(f"[SmartCut] Failed to get keyframes: {e.stderr}")
+        return keyframeindex.get(video_path).keyframes.tolist()
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[SmartCut] Failed to get keyframes: {getattr(e, 'stderr', e)}")
         return []
 
 
 def find_gop_boundaries(
-    keyframes: List[float],
+    keyframes,
     in_point: float,
     out_point: float,
 ) -> Tuple[Optional[float], Optional[float], Optional[float], Optional[float]]:
@@ -65,22 +62,15 @@ def find_gop_boundaries(
         Tuple of (prev_keyframe_before_in, next_keyframe_after_in,
                   prev_keyframe_before_out, next_keyframe_after_out)
     """
-    if not keyframes:
+    if not len(keyframes):
         return None, None, None, None
 
-    def find_around(point):
-        idx = bisect.bisect_right(keyframes, point)
-        prev_kf = keyframes[idx - 1] if idx > 0 else None
-        next_kf = keyframes[idx] if idx < len(keyframes) else None
-        return prev_kf, next_kf
-
-    # Find keyframes around in_point
-    prev_kf_in, next_kf_in = find_around(in_point)
-
-    # Find keyframes around out_point
-    prev_kf_out, next_kf_out = find_around(out_point)
-
-    return prev_kf_in, next_kf_in, prev_kf_out, next_kf_out
+    return (
+        keyframeindex.prev_keyframe(keyframes, in_point),
+        keyframeindex.next_keyframe(keyframes, in_point),
+        keyframeindex.prev_keyframe(keyframes, out_point),
+        keyframeindex.next_keyframe(keyframes, out_point),
+    )
 
 
 def smart_cut(
@@ -113,9 +103,14 @@ def smart_cut(
     Returns:
         Path to the output file.
     """
-    keyframes = get_keyframe_timestamps(video_path)
+    # Indexed once per file, so cutting many segments does not rescan it
+    try:
+        keyframes = keyframeindex.get(video_path).keyframes
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[SmartCut] Failed to get keyframes: {getattr(e, 'stderr', e)}")
+        keyframes = []
 
-    if not keyframes:
+    if not len(keyframes):
         # Fallback to simple cut if no keyframes found
         print("[SmartCut] No keyframes found, falling back to simple cut")
         return simple_cut(video_path, in_point, out_point, output_path)
@@ -128,8 +123,7 @@ def smart_cut(
     tolerance = 0.01  # 10ms tolerance
 
     def is_on_keyframe(point):
-        idx = bisect.bisect_left(keyframes, point - tolerance)
-        return idx < len(keyframes) and keyframes[idx] <= point + tolerance
+        return abs(keyframeindex.nearest_keyframe(keyframes, point) - point) <= tolerance
 
     in_on_keyframe = is_on_keyframe(in_point)
     out_on_keyframe = is_on_keyframe(out_point)
@@ -2,6 +2,7 @@ import os
 import subprocess
 import json
 from comfy_api.latest import io
+from . import mediainfo
 
 
 class AnalyzeStreamsV3(io.ComfyNode):
@@ -28,10 +29,8 @@ class AnalyzeStreamsV3(io.ComfyNode):
         if not os.path.exists(video):
             raise FileNotFoundError(f"Video file not found: {video}")
 
-        command = ["ffprobe", "-v", "error", "-show_streams", "-of", "json", video]
-
         try:
-            result = subprocess.run(command, check=True, capture_output=True, text=True)
-            return io.NodeOutput(json.dumps(json.loads(result.stdout), indent=4))
+            streams = [stream.raw for stream in mediainfo.probe(video).streams]
+            return io.NodeOutput(json.dumps({"streams": streams}, indent=4))
         except subprocess.CalledProcessError as e:
             raise Exception(f"FFprobe error: {e.stderr}")
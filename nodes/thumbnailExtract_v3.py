@@ -1,15 +1,11 @@
 import os
-import subprocess
-import tempfile
-import shutil
-import torch
-import numpy as np
-from PIL import Image
 from comfy_api.latest import io
+from . import decoder
+from . import smartcut
 
 class ThumbnailExtractV3(io.ComfyNode):
     """
-    A V3 node to extract a single frame at a given timestamp as an IMAGE tensor.
+    A V3 node to extract frames at one or more timestamps as an IMAGE batch.
     """
 
     @classmethod
@@ -20,48 +16,68 @@ class ThumbnailExtractV3(io.ComfyNode):
             category="🔥FFmpeg/Conversion",
             inputs=[
                 io.String.Input("video", tooltip="Video file."),
-                io.String.Input("timestamp", default="00:00:01", tooltip="Timestamp to extract (HH:MM:SS or seconds)."),
+                io.String.Input("timestamp", default="00:00:01", tooltip="Timestamp(s) to extract (HH:MM:SS or seconds), comma separated for a batch."),
                 io.Int.Input("max_width", default=0, min=0, tooltip="Max width (0 for original)."),
+                io.Boolean.Input("use_cache", default=False, tooltip="Cache decoded frames on disk so repeat runs skip decoding."),
+                io.Int.Input("count", default=0, min=0, tooltip="Extract N evenly spaced frames instead of the given timestamps (0 to disable)."),
+                io.Boolean.Input("keyframes_only", default=False, tooltip="Snap each timestamp to the keyframe at or before it and decode only keyframes."),
+                io.String.Input("crop", default="", tooltip="Crop before resizing: 'square' or 'w:h[:x:y]' in pixels (empty for none)."),
+                io.Int.Input("width", default=0, min=0, max=8192, tooltip="Target width (0 = derive from height, or keep)."),
+                io.Int.Input("height", default=0, min=0, max=8192, tooltip="Target height (0 = derive from width, or keep)."),
+                io.Combo.Input("scaler", options=decoder.SCALERS, default="bicubic", tooltip="Resize algorithm (fast_bilinear for previews, lanczos for finals)."),
+                io.Combo.Input("pix_fmt", options=list(decoder.PIX_FMT_CHANNELS), default="rgb24", tooltip="Decoded pixel format; gray moves a third of the data."),
             ],
             outputs=[
-                io.Image.Output(tooltip="The extracted frame."),
+                io.Image.Output(tooltip="The extracted frames."),
+                io.String.Output(tooltip="Timestamps of the extracted frames in seconds (comma separated)."),
             ],
         )
 
     @classmethod
-    def execute(cls, video, timestamp, max_width) -> io.NodeOutput:
+    def execute(
+        cls,
+        video,
+        timestamp,
+        max_width,
+        use_cache=False,
+        count=0,
+        keyframes_only=False,
+        crop="",
+        width=0,
+        height=0,
+        scaler="bicubic",
+        pix_fmt="rgb24",
+    ) -> io.NodeOutput:
         if not os.path.exists(video):
             raise FileNotFoundError(f"Video file not found: {video}")
 
-        temp_dir = tempfile.mkdtemp()
-        output_image = os.path.join(temp_dir, "thumb.png")
+        info = decoder.probe_video(video)
+        if count > 0:
+            timestamps = decoder.evenly_spaced_timestamps(info["duration"], count)
+            if not timestamps:
+                raise RuntimeError(f"Could not determine the duration of {video}")
+        else:
+            timestamps = [decoder.parse_timestamp(t) for t in timestamp.split(",") if t.strip()]
 
-        # Build FFmpeg command
-        # Use -ss before -i for fast seeking
-        cmd = ["ffmpeg", "-y", "-ss", timestamp, "-i", video]
-       
-        vf = []
-        if max_width > 0:
-            vf.append(f"scale={max_width}:-1")
-           
-        if vf:
-            cmd.extend(["-vf", ",".join(vf)])
-           
-        cmd.extend(["-vframes", "1", output_image])
+        keyframes = None
+        if keyframes_only:
+            keyframes = smartcut.get_keyframe_timestamps(video)
+            timestamps = decoder.snap_to_keyframes(timestamps, keyframes)
 
-        try:
-            subprocess.run(cmd, check=True, capture_output=True, text=True)
-           
-            if not os.path.exists(output_image):
-                raise RuntimeError(f"Failed to extract thumbnail at {timestamp}")
-               
-            img = Image.open(output_image).convert("RGB")
-            tensor = torch.from_numpy(np.array(img).astype(np.float32) / 255.0).unsqueeze(0)
-           
-            return io.NodeOutput(tensor)
-           
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"FFmpeg error: {e.stderr}")
-        finally:
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
+        # All points are fetched in one batch over a rawvideo pipe
+        frames = decoder.decode_frames_at(
+            video,
+            timestamps,
+            info,
+            max_width=max_width,
+            use_cache=use_cache,
+            keyframes=keyframes,
+            crop=crop,
+            width=width,
+            height=height,
+            scaler=scaler,
+            pix_fmt=pix_fmt,
+        )
+        tensor = decoder.frames_to_tensor(frames)
+
+        return io.NodeOutput(tensor, ",".join(f"{t:.3f}" for t in timestamps))
@@ -1,13 +1,10 @@
-import json
 import os
-import subprocess
-import tempfile
-import shutil
-import glob
 import torch
 from PIL import Image
-import numpy as np
 from comfy_api.latest import io
+from . import decoder
+from . import keyframeindex
+from .framesequence import FRAME_SEQUENCE, FrameSequence
 
 
 class Video2FramesV3(io.ComfyNode):
@@ -40,6 +37,116 @@ class Video2FramesV3(io.ComfyNode):
                     default="frames",
                     tooltip="Directory to save frames (if enabled).",
                 ),
+                io.Float.Input(
+                    "start_time",
+                    default=0.0,
+                    min=0.0,
+                    step=0.01,
+                    tooltip="Start of the range in seconds (ignored if start_frame > 0).",
+                ),
+                io.Float.Input(
+                    "end_time",
+                    default=0.0,
+                    min=0.0,
+                    step=0.01,
+                    tooltip="End of the range in seconds (0 = end of video).",
+                ),
+                io.Int.Input(
+                    "start_frame",
+                    default=0,
+                    min=0,
+                    tooltip="Start of the range as a frame index (overrides start_time).",
+                ),
+                io.Int.Input(
+                    "frame_count",
+                    default=0,
+                    min=0,
+                    tooltip="Number of source frames in the range (0 = no limit).",
+                ),
+                io.Int.Input(
+                    "stride",
+                    default=1,
+                    min=1,
+                    tooltip="Keep every n-th frame of the range.",
+                ),
+                io.Boolean.Input(
+                    "use_cache",
+                    default=False,
+                    tooltip="Cache decoded frames on disk so repeat runs skip decoding.",
+                ),
+                io.Boolean.Input(
+                    "lazy",
+                    default=False,
+                    tooltip="Skip the eager IMAGE batch and only emit a lazily decoded frame sequence.",
+                ),
+                io.Boolean.Input(
+                    "keyframes_only",
+                    default=False,
+                    tooltip="Decode only keyframes (I-frames). Much faster on long-GOP sources.",
+                ),
+                io.String.Input(
+                    "crop",
+                    default="",
+                    tooltip="Crop before resizing: 'square' or 'w:h[:x:y]' in pixels (empty for none).",
+                ),
+                io.Int.Input(
+                    "width",
+                    default=0,
+                    min=0,
+                    max=8192,
+                    tooltip="Target width (0 = derive from height, or keep).",
+                ),
+                io.Int.Input(
+                    "height",
+                    default=0,
+                    min=0,
+                    max=8192,
+                    tooltip="Target height (0 = derive from width, or keep).",
+                ),
+                io.Combo.Input(
+                    "scaler",
+                    options=decoder.SCALERS,
+                    default="bicubic",
+                    tooltip="Resize algorithm (fast_bilinear for previews, lanczos for finals).",
+                ),
+                io.Float.Input(
+                    "target_fps",
+                    default=0.0,
+                    min=0.0,
+                    step=0.01,
+                    tooltip="Resample to this frame rate before striding (0 = source rate).",
+                ),
+                io.Combo.Input(
+                    "pix_fmt",
+                    options=list(decoder.PIX_FMT_CHANNELS),
+                    default="rgb24",
+                    tooltip="Decoded pixel format; gray moves a third of the data.",
+                ),
+                io.Int.Input(
+                    "max_memory_mb",
+                    default=0,
+                    min=0,
+                    tooltip="Memory budget for the extracted batch in MB (0 = unlimited).",
+                ),
+                io.Int.Input(
+                    "max_frames",
+                    default=0,
+                    min=0,
+                    tooltip="Maximum number of extracted frames; raises the stride to fit (0 = unlimited).",
+                ),
+                io.Combo.Input(
+                    "budget_fit",
+                    options=decoder.BUDGET_FITS,
+                    default="stride",
+                    tooltip="How to meet max_memory_mb: drop frames, downscale, or refuse before decoding.",
+                ),
+                io.Int.Input(
+                    "decode_workers",
+                    default=1,
+                    min=0,
+                    max=64,
+                    tooltip="Parallel decoders on keyframe-aligned chunks (1 = off, 0 = one per CPU core).",
+                ),
             ],
             outputs=[
                 io.Image.Output(tooltip="The extracted frames."),
@@ -48,82 +155,168 @@ class Video2FramesV3(io.ComfyNode):
                 io.Float.Output(tooltip="Duration in seconds."),
                 io.Int.Output(tooltip="Width in pixels."),
                 io.Int.Output(tooltip="Height in pixels."),
+                io.Custom(FRAME_SEQUENCE).Output(
+                    tooltip="Lazily decoded frame sequence of the selected range."
+                ),
+                io.String.Output(
+                    tooltip="Keyframe timestamps in seconds, comma separated (keyframes_only mode)."
+                ),
+                io.Int.Output(tooltip="Stride used after fitting the budget."),
+                io.Int.Output(tooltip="Width of the extracted frames."),
+                io.Int.Output(tooltip="Height of the extracted frames."),
             ],
         )
 
     @classmethod
     def execute(
-        cls, video, max_width, save_frames, output_dir="frames"
+        cls,
+        video,
+        max_width,
+        save_frames,
+        output_dir="frames",
+        start_time=0.0,
+        end_time=0.0,
+        start_frame=0,
+        frame_count=0,
+        stride=1,
+        use_cache=False,
+        lazy=False,
+        keyframes_only=False,
+        crop="",
+        width=0,
+        height=0,
+        scaler="bicubic",
+        target_fps=0.0,
+        pix_fmt="rgb24",
+        max_memory_mb=0,
+        max_frames=0,
+        budget_fit="stride",
+        decode_workers=1,
     ) -> io.NodeOutput:
         if not os.path.exists(video):
             raise FileNotFoundError(f"Video file not found: {video}")
-
-        temp_dir = tempfile.mkdtemp()
+        if lazy and keyframes_only:
+            raise ValueError("lazy and keyframes_only cannot be combined.")
+        if keyframes_only and target_fps > 0:
+            raise ValueError("target_fps cannot be used with keyframes_only.")
+        if keyframes_only and decode_workers != 1:
+            raise ValueError("decode_workers cannot be used with keyframes_only.")
 
         # Probe video
-        probe_cmd = [
-            "ffprobe",
-            "-v",
-            "error",
-            "-select_streams",
-            "v:0",
-            "-show_entries",
-            "stream=width,height,r_frame_rate,nb_frames,duration",
-            "-of",
-            "json",
-            video,
-        ]
-        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-        video_info = json.loads(probe_result.stdout)
-        
-        if "streams" not in video_info or not video_info["streams"]:
-            shutil.rmtree(temp_dir)
-            raise RuntimeError(f"No video streams found in {video}")
-            
-        stream = video_info["streams"][0]
-        width = int(stream["width"])
-        height = int(stream["height"])
+        info = decoder.probe_video(video)
 
-        # Parse FPS
-        fps_str = stream.get("r_frame_rate", "0/1")
-        if "/" in fps_str:
-            num, den = map(int, fps_str.split("/"))
-            fps = num / den if den != 0 else 0.0
-        else:
-            fps = float(fps_str)
-
-        duration = float(stream.get("duration", 0.0))
+        selection = dict(
+            start_time=start_time,
+            end_time=end_time,
+            start_frame=start_frame,
+            frame_count=frame_count,
+            stride=stride,
+        )
+        # Crop, resize and pixel format are applied inside ffmpeg
+        output = dict(
+            crop=crop, width=width, height=height, scaler=scaler, pix_fmt=pix_fmt
+        )
 
-        scale_filter = ""
-        if max_width > 0 and width > max_width:
-            scale_filter = f"scale={max_width}:-1"
+        keyframes = None
+        if keyframes_only and (max_memory_mb > 0 or max_frames > 0):
+            # The budget then counts keyframes, read from the keyframe index
+            keyframes = keyframeindex.get(video).keyframes
+        # Settle stride and size from probe data, refusing before any decode
+        fit = decoder.fit_budget(
+            info,
+            selection,
+            output,
+            max_width,
+            target_fps,
+            max_memory_mb * 1024**2,
+            max_frames,
+            budget_fit,
+            keyframes,
+        )
+        if fit["stride"] != stride or fit["max_width"] != max_width:
+            print(
+                f"[Video2FramesV3] Budget fit: stride {fit['stride']}, "
+                f"{fit['width']}x{fit['height']}, ~{fit['frames']} frames"
+            )
+        selection["stride"] = fit["stride"]
+        max_width = fit["max_width"]
 
-        ffmpeg_cmd = ["ffmpeg", "-i", video]
-        if scale_filter:
-            ffmpeg_cmd.extend(["-vf", scale_filter])
-        ffmpeg_cmd.append(os.path.join(temp_dir, "%05d.png"))
+        # Describe the selected range without decoding anything yet
+        sequence = FrameSequence(
+            video,
+            info,
+            max_width,
+            use_cache=use_cache,
+            rate=target_fps,
+            **selection,
+            **output,
+        )
+        report = (sequence.stride, sequence.width, sequence.height)
 
-        subprocess.run(ffmpeg_cmd, check=True)
+        if lazy:
+            fps = sequence.fps
+            duration = len(sequence) / fps if fps > 0 else 0.0
+            return io.NodeOutput(
+                torch.zeros((0, 1, 1, 3)),  # Dummy structure
+                len(sequence),
+                fps,
+                duration,
+                info["width"],
+                info["height"],
+                sequence,
+                "",
+                *report,
+            )
 
-        frame_files = sorted(glob.glob(os.path.join(temp_dir, "*.png")))
-        images = [Image.open(f) for f in frame_files]
+        keyframe_times = []
+        if keyframes_only:
+            # Decoder-level skipping of every non-key frame
+            frames, keyframe_times = decoder.decode_keyframes(
+                video, info, max_width, use_cache=use_cache, **selection, **output
+            )
+        else:
+            # Decode only the selected range straight from ffmpeg's stdout
+            frames = decoder.decode_video(
+                video,
+                info,
+                max_width,
+                use_cache=use_cache,
+                rate=target_fps,
+                workers=decode_workers,
+                **selection,
+                **output,
+            )
 
         if save_frames:
             os.makedirs(output_dir, exist_ok=True)
-            for i, frame_file in enumerate(frame_files):
-                shutil.copy2(frame_file, os.path.join(output_dir, f"frame_{i:05d}.png"))
+            for i, frame in enumerate(frames):
+                if frame.shape[-1] == 1:
+                    frame = frame[..., 0]
+                Image.fromarray(frame).save(
+                    os.path.join(output_dir, f"frame_{i:05d}.png")
+                )
 
-        tensors = [
-            torch.from_numpy(np.array(img).astype(np.float32) / 255.0) for img in images
-        ]
-
-        # Check if we have frames, stack relies on non-empty list usually
-        if tensors:
-            batch_tensor = torch.stack(tensors)
+        if len(frames):
+            batch_tensor = decoder.frames_to_tensor(frames)
         else:
-            # Empty tensor?
             batch_tensor = torch.zeros((0, 1, 1, 3))  # Dummy structure
 
-        shutil.rmtree(temp_dir)
+        # Describe the selected range rather than the whole file
+        if keyframes_only:
+            duration = sequence.duration
+            fps = len(frames) / duration if duration > 0 else 0.0
+        else:
+            fps = sequence.fps
+            duration = len(frames) / fps if fps > 0 else 0.0
 
-        return io.NodeOutput(batch_tensor, len(images), fps, duration, width, height)
+        return io.NodeOutput(
+            batch_tensor,
+            len(frames),
+            fps,
+            duration,
+            info["width"],
+            info["height"],
+            sequence,
+            ",".join(f"{t:.3f}" for t in keyframe_times),
+            *report,
+        )
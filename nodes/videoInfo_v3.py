@@ -1,7 +1,7 @@
 import os
 import subprocess
-import json
 from comfy_api.latest import io
+from . import mediainfo
 
 class VideoInfoV3(io.ComfyNode):
     """
@@ -31,39 +31,21 @@ class VideoInfoV3(io.ComfyNode):
         if not os.path.exists(video):
             raise FileNotFoundError(f"Video file not found: {video}")
 
-        command = [
-            "ffprobe",
-            "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=width,height,r_frame_rate,nb_frames,duration",
-            "-of", "json",
-            video
-        ]
-
         try:
-            result = subprocess.run(command, check=True, capture_output=True, text=True)
-            data = json.loads(result.stdout)
-           
-            if "streams" not in data or not data["streams"]:
-                raise RuntimeError(f"No video streams found in {video}")
-               
-            stream = data["streams"][0]
+            stream = mediainfo.probe(video).video
 
-            # Parse FPS
-            fps_str = stream.get("r_frame_rate", "0/1")
-            if "/" in fps_str:
-                num, den = map(int, fps_str.split("/"))
-                fps = num / den if den != 0 else 0.0
-            else:
-                fps = float(fps_str)
+            if stream is None:
+                raise RuntimeError(f"No video streams found in {video}")
 
-            frame_count = int(stream.get("nb_frames", 0))
-            duration = float(stream.get("duration", 0.0))
-            width = int(stream.get("width", 0))
-            height = int(stream.get("height", 0))
+            # Frame count falls back to duration x fps when not stored
+            return io.NodeOutput(
+                stream.fps,
+                stream.frame_count,
+                stream.duration,
+                stream.width,
+                stream.height,
+            )
 
-            return io.NodeOutput(fps, frame_count, duration, width, height)
-            
         except subprocess.CalledProcessError as e:
             raise Exception(f"FFprobe error: {e.stderr}")
         except Exception as e:
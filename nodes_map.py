@@ -25,6 +25,7 @@ from .nodes.video2frames_v3 import Video2FramesV3
 from .nodes.frames2video_v3 import Frames2VideoV3
 from .nodes.LosslessCut_v3 import LosslessCutV3
 from .nodes.videoInfo_v3 import VideoInfoV3
+from .nodes.probeBatch_v3 import ProbeBatchV3
 from .nodes.imagesTensorToVideo_v3 import ImagesTensorToVideoV3
 from .nodes.thumbnailExtract_v3 import ThumbnailExtractV3
 from .nodes.videoFilters_v3 import (
@@ -41,6 +42,14 @@ from .nodes.sceneDetect_v3 import SceneDetectV3
 from .nodes.encodeWithHWAccel_v3 import EncodeWithHWAccelV3
 from .nodes.streamOutput_v3 import StreamOutputV3
 from .nodes.videoPreview_v3 import VideoPreviewV3
+from .nodes.frameCache_v3 import FrameCacheV3
+from .nodes.frameSequence_v3 import FrameSequenceToImagesV3
+from .nodes.directory2video_v3 import DirectoryToVideoV3
+from .nodes.encoderSession_v3 import (
+    EncoderSessionOpenV3,
+    EncoderSessionAppendV3,
+    EncoderSessionCloseV3,
+)
 
 NODE_CLASS_MAPPINGS_V3 = [
     LoadImagesFromDirectoryV3,
@@ -70,6 +79,7 @@ NODE_CLASS_MAPPINGS_V3 = [
     Frames2VideoV3,
     LosslessCutV3,
     VideoInfoV3,
+    ProbeBatchV3,
     ImagesTensorToVideoV3,
     ThumbnailExtractV3,
     VideoSpeedV3,
@@ -84,4 +94,10 @@ NODE_CLASS_MAPPINGS_V3 = [
     EncodeWithHWAccelV3,
     StreamOutputV3,
     VideoPreviewV3,
+    FrameCacheV3,
+    FrameSequenceToImagesV3,
+    DirectoryToVideoV3,
+    EncoderSessionOpenV3,
+    EncoderSessionAppendV3,
+    EncoderSessionCloseV3,
 ]
@@ -22,6 +22,7 @@ os.makedirs(test_temp_dir, exist_ok=True)
 mock_folder_paths = MagicMock()
 mock_folder_paths.get_output_directory.return_value = test_output_dir
 mock_folder_paths.get_temp_directory.return_value = test_temp_dir
+mock_folder_paths.get_user_directory.return_value = test_temp_dir
 
 # Check if folder_paths is already in modules (unlikely but safe to check)
 if "folder_paths" not in sys.modules:
@@ -120,6 +121,17 @@ if "comfy_api.latest.io" not in sys.modules:
     sys.modules["comfy_api.latest.io"] = mock_io
 
 
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path_factory, monkeypatch):
+    """Keep the on-disk caches written by each test in a fresh temp directory."""
+    from nodes import framecache, keyframeindex, probecache
+
+    root = tmp_path_factory.mktemp("cache")
+    for module, name in ((framecache, "frames"), (keyframeindex, "keyframes"), (probecache, "probe")):
+        monkeypatch.setattr(module.CACHE, "directory", str(root / name))
+        monkeypatch.setattr(module.CACHE, "max_bytes", module.DEFAULT_MAX_BYTES)
+
+
 # Clean up at end of session
 @pytest.fixture(scope="session", autouse=True)
 def cleanup_environment():
@@ -1,3 +1,4 @@
+import inspect
 import pytest
 import torch
 import os
@@ -27,6 +28,8 @@ class TestV3NewNodes:
     def test_thumbnail_extract_v3_schema(self):
         schema = ThumbnailExtractV3.define_schema()
         assert schema.node_id == "ThumbnailExtractV3"
+        use_cache = inspect.signature(ThumbnailExtractV3.execute).parameters["use_cache"]
+        assert use_cache.default is False
 
     def test_video_filters_v3_schemas(self):
         assert ScaleV3.define_schema().node_id == "ScaleV3"
@@ -49,6 +52,21 @@ class TestV3NewNodes:
         schema = EncodeWithHWAccelV3.define_schema()
         assert schema.node_id == "EncodeWithHWAccelV3"
 
+    def test_encode_with_hw_accel_v3_libx264(self):
+        from nodes import mediainfo
+
+        images = torch.rand(12, 48, 64, 3)
+        result = EncodeWithHWAccelV3.execute(
+            images, 12, "libx264 (CPU)", 23, "hw_accel_libx264.mp4"
+        )
+        output_path = result[0]
+        assert os.path.exists(output_path)
+
+        video = mediainfo.probe(output_path).video
+        assert video.codec_name == "h264"
+        assert (video.width, video.height) == (64, 48)
+        assert video.frame_count == 12
+
     def test_stream_output_v3_schema(self):
         schema = StreamOutputV3.define_schema()
         assert schema.node_id == "StreamOutputV3"
@@ -57,6 +75,118 @@ class TestV3NewNodes:
         schema = VideoPreviewV3.define_schema()
         assert schema.node_id == "VideoPreviewV3"
 
+    def test_thumbnail_extract_v3_cached(self, tmp_path, monkeypatch):
+        from nodes import framecache
+        monkeypatch.setattr(framecache.CACHE, "directory", str(tmp_path))
+        video = os.path.join(os.path.dirname(__file__), "../videos/video_with_audio.mp4")
+
+        first = ThumbnailExtractV3.execute(video, "0.5", 64, use_cache=True)[0]
+        assert first.shape[0] == 1 and first.shape[2] == 64
+        assert framecache.stats()["entries"] == 1
+
+        second = ThumbnailExtractV3.execute(video, "0.5", 64, use_cache=True)[0]
+        assert torch.equal(first, second)
+
+    def test_thumbnail_extract_v3_batch(self):
+        video = os.path.join(os.path.dirname(__file__), "../videos/video_with_audio.mp4")
+
+        images, timestamps = ThumbnailExtractV3.execute(
+            video, "00:00:05, 1, 30.5", 64, use_cache=False
+        )
+        assert images.shape[0] == 3
+        assert timestamps == "5.000,1.000,30.500"
+
+        images, timestamps = ThumbnailExtractV3.execute(
+            video, "", 64, use_cache=False, count=6
+        )
+        assert images.shape[0] == 6
+        assert len(timestamps.split(",")) == 6
+
+    def test_decode_frames_at_variable_frame_rate(self, tmp_path):
+        import subprocess
+        from nodes import decoder
+
+        # 30 fps for 3 s, then 10 fps: frame numbers no longer follow t * fps
+        video = str(tmp_path / "vfr.mp4")
+        subprocess.run(
+            [
+                "ffmpeg", "-v", "error", "-y",
+                "-f", "lavfi", "-i", "testsrc=size=64x48:rate=30:duration=6",
+                "-vf", "setpts='if(lt(N,90),N/30/TB,(3+(N-90)/10)/TB)'",
+                "-fps_mode", "vfr", "-c:v", "libx264", "-g", "15", video,
+            ],
+            check=True,
+        )
+
+        def seek(t):
+            out = subprocess.run(
+                [
+                    "ffmpeg", "-v", "error", "-ss", f"{t:.6f}", "-i", video,
+                    "-frames:v", "1", "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1",
+                ],
+                capture_output=True,
+                check=True,
+            ).stdout
+            return np.frombuffer(out, dtype=np.uint8).reshape(48, 64, 3)
+
+        # Sparse points (one seek each) and dense points (one pass)
+        for times in ([8.0], [8.3], [1.0, 8.0, 11.5], [4.0, 4.1, 4.2], [4.05, 4.25, 4.26]):
+            frames = decoder.decode_frames_at(video, times)
+            assert frames.shape[0] == len(times)
+            for frame, t in zip(frames, times):
+                assert np.array_equal(frame, seek(t)), t
+
+    def test_thumbnail_extract_v3_keyframes_only(self):
+        from nodes.smartcut import get_keyframe_timestamps
+
+        video = os.path.join(os.path.dirname(__file__), "../videos/video_with_audio.mp4")
+        keyframes = get_keyframe_timestamps(video)
+
+        images, timestamps = ThumbnailExtractV3.execute(
+            video, "5, 30.5", 64, use_cache=False, keyframes_only=True
+        )
+        assert images.shape[0] == 2
+        for t in timestamps.split(","):
+            assert min(abs(float(t) - k) for k in keyframes) < 1e-3
+
+    def test_thumbnail_extract_v3_output_options(self):
+        video = os.path.join(os.path.dirname(__file__), "../videos/video_with_audio.mp4")
+
+        images, _ = ThumbnailExtractV3.execute(
+            video, "1, 2", 0, use_cache=False, crop="square", width=48, scaler="area"
+        )
+        assert images.shape == (2, 48, 48, 3)
+
+        images, _ = ThumbnailExtractV3.execute(
+            video, "1", 0, use_cache=False, height=32, pix_fmt="gray"
+        )
+        assert images.shape[1] == 32
+        assert torch.equal(images[..., 0], images[..., 2])
+
+    def test_lossless_cut_v3_screenshot_use_cache(self, monkeypatch):
+        from nodes import decoder
+        from nodes.LosslessCut_v3 import LosslessCutV3
+
+        video = os.path.join(os.path.dirname(__file__), "../videos/video_with_audio.mp4")
+        calls = []
+        decode_frame_at = decoder.decode_frame_at
+
+        def spy(*args, **kwargs):
+            calls.append(kwargs.get("use_cache"))
+            return decode_frame_at(*args, **kwargs)
+
+        monkeypatch.setattr(decoder, "decode_frame_at", spy)
+        for use_cache in (False, True):
+            result = LosslessCutV3.execute(
+                video, 0.0, -1.0, export_screenshot=True, screenshot_time=1.0,
+                use_cache=use_cache,
+            )
+            assert result[1].shape[0] == 1
+        result = LosslessCutV3.execute(
+            video, 0.0, -1.0, export_screenshot=True, screenshot_time=1.0
+        )
+        assert calls == [False, True, False]
+
     def test_audio_batch_handling_logic(self):
         # Testing the squeeze logic used in AddAudioV3 and others
         waveform = torch.rand((1, 2, 44100))
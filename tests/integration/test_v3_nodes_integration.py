@@ -282,6 +282,197 @@ def test_video2frames_v3(setup_test_assets):
 
     assert batch_tensor is not None
     assert frame_count > 0
+    assert batch_tensor.shape == (frame_count, 240, 320, 3)
+
+
+@pytest.mark.integration
+def test_video2frames_v3_range(setup_test_assets):
+    """Test Video2FramesV3 frame-range and stride selection."""
+    from nodes.video2frames_v3 import Video2FramesV3
+
+    result = Video2FramesV3.execute(
+        video=TEST_VIDEO_PATH,
+        max_width=0,
+        save_frames=False,
+        start_frame=15,
+        frame_count=30,
+        stride=3,
+    )
+
+    batch_tensor, frame_count, fps, duration = result[:4]
+    assert frame_count == 10
+    assert batch_tensor.shape[0] == 10
+    assert fps == pytest.approx(10.0)
+    assert duration == pytest.approx(1.0)
+
+
+@pytest.mark.integration
+def test_video2frames_v3_lazy_sequence(setup_test_assets):
+    """Test the lazy frame sequence against the eager batch."""
+    from nodes.video2frames_v3 import Video2FramesV3
+    from nodes.frameSequence_v3 import FrameSequenceToImagesV3
+
+    eager = Video2FramesV3.execute(
+        video=TEST_VIDEO_PATH, max_width=320, save_frames=False
+    )[0]
+    lazy_result = Video2FramesV3.execute(
+        video=TEST_VIDEO_PATH, max_width=320, save_frames=False, lazy=True
+    )
+    sequence = lazy_result[6]
+
+    assert lazy_result[0].shape[0] == 0
+    assert len(sequence) == eager.shape[0]
+    assert torch.equal(sequence[7], eager[7])
+    assert torch.equal(sequence[20:40:5], eager[20:40:5])
+
+    images, count = FrameSequenceToImagesV3.execute(sequence, 50, 5)
+    assert count == 5
+    assert torch.equal(images, eager[50:55])
+
+
+@pytest.mark.integration
+def test_video2frames_v3_lazy_sequence_off_frame_start(setup_test_assets):
+    """A start_time between two frames selects the same frames lazily and eagerly."""
+    from nodes.video2frames_v3 import Video2FramesV3
+
+    options = dict(
+        video=TEST_VIDEO_PATH,
+        max_width=160,
+        save_frames=False,
+        start_time=1.01,
+        stride=2,
+    )
+    eager = Video2FramesV3.execute(**options)[0]
+    sequence = Video2FramesV3.execute(**options, lazy=True)[6]
+
+    assert len(sequence) == eager.shape[0]
+    assert torch.equal(sequence[0], eager[0])
+    assert torch.equal(sequence[: len(sequence)], eager)
+
+
+@pytest.mark.integration
+def test_video2frames_v3_filter_pushdown(setup_test_assets):
+    """Test crop, resize, gray output and fps resampling done inside ffmpeg."""
+    from nodes.video2frames_v3 import Video2FramesV3
+
+    result = Video2FramesV3.execute(
+        video=TEST_VIDEO_PATH,
+        max_width=0,
+        save_frames=False,
+        end_time=2.0,
+        crop="square",
+        width=64,
+        scaler="fast_bilinear",
+        target_fps=5.0,
+        pix_fmt="gray",
+    )
+    images = result[0]
+
+    assert images.shape[1:] == (64, 64, 3)
+    assert result[1] == images.shape[0] == 10
+    assert result[2] == pytest.approx(5.0)
+    assert torch.equal(images[..., 0], images[..., 2])
+
+
+@pytest.mark.integration
+def test_video2frames_v3_parallel_decode(setup_test_assets):
+    """Test that keyframe-chunked parallel decoding matches a single decoder."""
+    from nodes.video2frames_v3 import Video2FramesV3
+
+    # Long enough to hold several GOPs
+    video = os.path.join(VIDEO_DIR, "video_with_audio.mp4")
+    options = dict(max_width=160, save_frames=False, start_time=1.0, end_time=20.0, stride=2)
+
+    serial = Video2FramesV3.execute(video=video, **options)[0]
+    parallel = Video2FramesV3.execute(video=video, decode_workers=3, **options)[0]
+
+    assert parallel.shape[0] > 0
+    assert torch.equal(parallel, serial)
+
+
+@pytest.mark.integration
+def test_video2frames_v3_budget(setup_test_assets):
+    """Test that the budget picks the stride before decoding, or refuses."""
+    from nodes.video2frames_v3 import Video2FramesV3
+
+    result = Video2FramesV3.execute(
+        video=TEST_VIDEO_PATH, max_width=64, save_frames=False, max_frames=10
+    )
+    assert 0 < result[1] <= 10
+    assert result[1] == result[0].shape[0]
+    assert result[8] > 1
+    assert (result[9], result[10]) == tuple(result[0].shape[2:0:-1])
+
+    with pytest.raises(ValueError):
+        Video2FramesV3.execute(
+            video=TEST_VIDEO_PATH,
+            max_width=0,
+            save_frames=False,
+            max_memory_mb=1,
+            budget_fit="refuse",
+        )
+
+
+@pytest.mark.integration
+def test_video2frames_v3_keyframes_only(setup_test_assets):
+    """Test keyframe-only extraction against the container's keyframe list."""
+    from nodes.video2frames_v3 import Video2FramesV3
+    from nodes.smartcut import get_keyframe_timestamps
+
+    result = Video2FramesV3.execute(
+        video=TEST_VIDEO_PATH, max_width=320, save_frames=False, keyframes_only=True
+    )
+    keyframes = get_keyframe_timestamps(TEST_VIDEO_PATH)
+    timestamps = [float(t) for t in result[7].split(",")]
+
+    assert result[1] == len(keyframes) == result[0].shape[0]
+    assert timestamps == pytest.approx(keyframes, abs=1e-3)
+
+    with pytest.raises(ValueError):
+        Video2FramesV3.execute(
+            video=TEST_VIDEO_PATH,
+            max_width=320,
+            save_frames=False,
+            lazy=True,
+            keyframes_only=True,
+        )
+
+
+@pytest.mark.integration
+def test_video2frames_v3_keyframes_only_budget():
+    """Test that the budget counts keyframes in keyframes_only mode."""
+    from nodes.video2frames_v3 import Video2FramesV3
+    from nodes.smartcut import get_keyframe_timestamps
+
+    video = os.path.join(VIDEO_DIR, "video_with_audio.mp4")
+    if not os.path.exists(video):
+        pytest.skip("Test video not found")
+    keyframes = get_keyframe_timestamps(video)
+    assert len(keyframes) > 4
+
+    result = Video2FramesV3.execute(
+        video=video, max_width=64, save_frames=False, keyframes_only=True, max_frames=4
+    )
+    assert 0 < result[1] <= 4
+    assert result[8] == -(-len(keyframes) // 4)
+
+    with pytest.raises(ValueError):
+        Video2FramesV3.execute(
+            video=video,
+            max_width=0,
+            save_frames=False,
+            keyframes_only=True,
+            max_memory_mb=1,
+            budget_fit="refuse",
+        )
+    with pytest.raises(ValueError):
+        Video2FramesV3.execute(
+            video=video,
+            max_width=64,
+            save_frames=False,
+            keyframes_only=True,
+            decode_workers=2,
+        )
 
 
 @pytest.mark.integration
@@ -307,11 +498,111 @@ def test_frames2video_v3(setup_test_assets):
     assert os.path.exists(output_path)
 
 
+@pytest.mark.integration
+def test_frames2video_v3_parallel_encode(setup_test_assets):
+    """Test that chunk-parallel encoding keeps every frame in order."""
+    from nodes.frames2video_v3 import Frames2VideoV3
+    from nodes import decoder
+
+    # Each frame has its own brightness so order and count can be checked
+    levels = torch.linspace(0, 1, 60)
+    images = levels[:, None, None, None].expand(60, 32, 32, 3).contiguous()
+    path, encoded, throughput = Frames2VideoV3.execute(
+        images=images,
+        fps=24,
+        codec="h264_cpu",
+        crf=10,
+        preset="ultrafast",
+        filename="frames2video_v3_parallel.mp4",
+        encode_workers=2,
+    )
+    assert encoded == 60
+    assert throughput > 0
+
+    frames = decoder.decode_video(path, decoder.probe_video(path), 0)
+    assert len(frames) == 60
+    brightness = frames.mean(axis=(1, 2, 3)) / 255
+    assert np.abs(brightness - levels.numpy()).max() < 0.02
+
+
+@pytest.mark.integration
+def test_frames2video_v3_audio_pipe(setup_test_assets):
+    """Test that audio is streamed to the encoder and muxed without temp files."""
+    from nodes.frames2video_v3 import Frames2VideoV3
+    from nodes.addAudio_v3 import AddAudioV3
+
+    # One second of stereo audio with a leading batch dimension
+    audio = {"waveform": torch.rand(1, 2, 44100) * 0.1, "sample_rate": 44100}
+    video = Frames2VideoV3.execute(
+        images=torch.rand(24, 64, 64, 3),
+        fps=24,
+        codec="h264_cpu",
+        crf=23,
+        preset="ultrafast",
+        filename="frames2video_v3_audio.mp4",
+        audio=audio,
+    )[0]
+    (output,) = AddAudioV3.execute(
+        video=video, audio=audio, filename="add_audio_v3_output.mp4"
+    )
+
+    for path in (video, output):
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries", "stream=codec_type,channels,sample_rate",
+                "-of", "csv=p=0", path,
+            ],
+            capture_output=True,
+            text=True,
+        )
+        assert "audio,44100,2" in result.stdout
+
+
 # =============================================================================
 # BATCH 6: Additional V3 Node Tests
 # =============================================================================
 
 
+@pytest.mark.integration
+def test_encoder_session_v3(setup_test_assets):
+    """Test streaming several batches into one encoder session."""
+    from nodes.encoderSession_v3 import (
+        EncoderSessionOpenV3,
+        EncoderSessionAppendV3,
+        EncoderSessionCloseV3,
+    )
+    from nodes.decoder import probe_video
+
+    def open_session():
+        (name,) = EncoderSessionOpenV3.execute(
+            session="test_session",
+            fps=10,
+            codec="h264_cpu",
+            crf=23,
+            preset="ultrafast",
+            filename="encoder_session_v3.mp4",
+        )
+        return name
+
+    # Reopening an open session between batches keeps appending to it
+    for batch in range(3):
+        name, frames = EncoderSessionAppendV3.execute(
+            session=open_session(), images=torch.rand(4, 48, 64, 3)
+        )
+        assert frames == 4 * (batch + 1)
+
+    with pytest.raises(ValueError):
+        EncoderSessionAppendV3.execute(session=name, images=torch.rand(1, 32, 32, 3))
+
+    path, frames = EncoderSessionCloseV3.execute(session=name)
+    assert frames == 12
+    assert probe_video(path)["nb_frames"] == 12
+
+    with pytest.raises(ValueError):
+        EncoderSessionAppendV3.execute(session=name, images=torch.rand(1, 48, 64, 3))
+
+
 @pytest.mark.integration
 def test_extract_audio_v3(setup_test_assets):
     """Test ExtractAudioV3 execution."""
@@ -406,6 +697,83 @@ def test_load_images_v3(setup_test_assets):
                 pass
 
 
+@pytest.mark.integration
+def test_load_images_v3_incremental(tmp_path):
+    """Test that incremental mode only loads new images, and changed ones on request."""
+    from nodes.loadImageFromDir_v3 import LoadImagesFromDirectoryV3
+
+    directory = str(tmp_path)
+    for i in range(3):
+        Image.new("RGB", (32, 32), color="blue").save(tmp_path / f"frame{i}.png")
+
+    def run(**kwargs):
+        return LoadImagesFromDirectoryV3.execute(
+            directory=directory, start_index=0, incremental=True, **kwargs
+        )
+
+    assert run(length=2)[1] == 2
+    assert run(length=0)[1] == 1
+    assert run(length=0)[1] == 0
+
+    # One appended frame and one rewritten frame
+    Image.new("RGB", (32, 32), color="red").save(tmp_path / "frame3.png")
+    Image.new("RGB", (32, 32), color="green").save(tmp_path / "frame0.png")
+    st = os.stat(tmp_path / "frame0.png")
+    os.utime(tmp_path / "frame0.png", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    images, count = run(length=0)
+    assert count == 1
+    assert images[0, 0, 0, 0] == 1.0  # only the appended red frame
+
+    # Seen names are skipped without a stat unless rechecking is requested
+    Image.new("RGB", (32, 32), color="red").save(tmp_path / "frame4.png")
+    images, count = run(length=0, recheck_changed=True)
+    assert count == 2
+    assert images[0, 0, 0, 1] == 128 / 255  # frame0 comes first
+
+    assert run(length=0, reset=True)[1] == 5
+
+
+@pytest.mark.integration
+def test_directory_to_video_v3(tmp_path):
+    """Test encoding contiguous and gapped image sequences from disk."""
+    from nodes.directory2video_v3 import DirectoryToVideoV3
+    from nodes.decoder import probe_video
+
+    for i in list(range(1, 9)) + [12]:
+        Image.new("RGB", (64, 48), color=(i * 20, 0, 0)).save(tmp_path / f"f_{i:03d}.png")
+
+    def encode(**kwargs):
+        args = dict(
+            directory=str(tmp_path),
+            start_index=0,
+            length=0,
+            fps=10.0,
+            gap_mode="skip",
+            codec="h264_cpu",
+            crf=23,
+            preset="ultrafast",
+            filename="directory_to_video_v3.mp4",
+        )
+        args.update(kwargs)
+        path, count = DirectoryToVideoV3.execute(**args)
+        assert os.path.exists(path)
+        return probe_video(path), count
+
+    # Contiguous run (image2 demuxer)
+    info, count = encode(start_index=2, length=4)
+    assert count == 4
+    assert info["nb_frames"] == 4
+
+    # Gap between 8 and 12 (concat demuxer)
+    info, count = encode(gap_mode="skip")
+    assert count == 9
+    assert info["nb_frames"] == 9
+
+    info, count = encode(gap_mode="hold")
+    assert count == 9
+    assert info["nb_frames"] == 12
+
+
 @pytest.mark.integration
 def test_save_images_v3(setup_test_assets):
     """Test SaveImagesV3 execution."""
@@ -463,3 +831,78 @@ def test_pip_video_v3(setup_test_assets):
 
     output_path = result[0] if hasattr(result, "__getitem__") else result
     assert os.path.exists(output_path)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("ext", [".mp4", ".mov", ".mkv"])
+def test_container_index_matches_packet_scan(setup_test_assets, tmp_path, ext):
+    """Keyframes read from MP4 sample tables and Matroska cues match ffprobe."""
+    from nodes import containerindex, keyframeindex
+
+    path = str(tmp_path / f"remux{ext}")
+    subprocess.run(
+        ["ffmpeg", "-y", "-v", "error", "-i", TEST_VIDEO_PATH, "-c", "copy", path],
+        check=True,
+    )
+    table = containerindex.read_index(path)
+    scanned = keyframeindex.scan(path)
+
+    assert table is not None
+    np.testing.assert_allclose(table.keyframes, scanned.keyframes, atol=1e-3)
+    if ext == ".mkv":
+        # Cues only list keyframes; a full packet list still needs a scan
+        assert table.pts is None
+        assert not keyframeindex.build(path).complete
+        assert keyframeindex.build(path, packets=True).complete
+    else:
+        np.testing.assert_allclose(table.pts, scanned.pts, atol=1e-6)
+        assert table.frame_count == len(scanned)
+
+
+@pytest.mark.integration
+def test_probe_batch_v3(setup_test_assets, tmp_path):
+    """Test ProbeBatchV3 on a directory plus a missing file."""
+    import csv
+    import io
+    import json
+    import shutil
+    from nodes.probeBatch_v3 import ProbeBatchV3
+
+    shutil.copy(TEST_VIDEO_PATH, tmp_path / "a.mp4")
+    shutil.copy(TEST_VIDEO_2_PATH, tmp_path / "b.mp4")
+    missing = str(tmp_path / "missing.mp4")
+
+    result = ProbeBatchV3.execute(paths=f"{tmp_path}\n{missing}\n", format="json", workers=2)
+    rows = json.loads(result[0])
+    assert result[1] == 2
+    assert [os.path.basename(r["path"]) for r in rows] == ["a.mp4", "b.mp4", "missing.mp4"]
+    assert rows[0]["width"] == 640 and rows[0]["has_audio"] is True
+    assert rows[0]["duration"] > 0 and rows[0]["error"] is None
+    assert rows[2]["error"] and rows[2]["fps"] is None
+
+    result = ProbeBatchV3.execute(paths=str(tmp_path), format="csv")
+    table = list(csv.DictReader(io.StringIO(result[0])))
+    assert [r["height"] for r in table] == ["480", str(rows[1]["height"])]
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("movflags", ["frag_keyframe+empty_moov", "frag_keyframe"])
+def test_container_index_skips_fragmented_mp4(setup_test_assets, tmp_path, movflags):
+    """Fragmented MP4s fall back to the packet scan instead of a truncated moov index."""
+    from nodes import containerindex, keyframeindex
+
+    # Needs several GOPs, so that frag_keyframe writes more than one fragment
+    source = os.path.join(VIDEO_DIR, "video_with_audio.mp4")
+    path = str(tmp_path / "fragmented.mp4")
+    subprocess.run(
+        ["ffmpeg", "-y", "-v", "error", "-i", source, "-c", "copy",
+         "-movflags", movflags, path],
+        check=True,
+    )
+    assert containerindex.read_index(path) is None
+
+    built = keyframeindex.build(path)
+    scanned = keyframeindex.scan(path)
+    assert built.complete and len(scanned.keyframes) > 1
+    np.testing.assert_allclose(built.pts, scanned.pts)
+    np.testing.assert_allclose(built.keyframes, scanned.keyframes)
@@ -0,0 +1,242 @@
+import sys
+import numpy as np
+import pytest
+from nodes import decoder
+
+
+def _emit_frames_cmd(count, width, height):
+    # Stand-in for ffmpeg: writes `count` rgb24 frames whose bytes equal the frame index
+    script = (
+        "import sys\n"
+        f"for i in range({count}):\n"
+        f"    sys.stdout.buffer.write(bytes([i]) * {width * height * 3})\n"
+    )
+    return [sys.executable, "-c", script]
+
+
+@pytest.mark.unit
+def test_output_size():
+    assert decoder.output_size(1920, 1080, 0) == (1920, 1080)
+    assert decoder.output_size(1920, 1080, 640) == (640, 360)
+    assert decoder.output_size(320, 240, 640) == (320, 240)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("expected", [0, 3, 5, 20])
+def test_read_frames_preallocated(expected):
+    frames = decoder.read_frames(_emit_frames_cmd(5, 4, 2), 4, 2, expected)
+    assert frames.shape == (5, 2, 4, 3)
+    assert frames.dtype == np.uint8
+    assert [int(f[0, 0, 0]) for f in frames] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.unit
+def test_read_frames_failure_raises():
+    cmd = [sys.executable, "-c", "import sys; sys.stderr.write('boom'); sys.exit(1)"]
+    with pytest.raises(RuntimeError, match="boom"):
+        decoder.read_frames(cmd, 4, 2)
+
+
+@pytest.mark.unit
+def test_frames_to_tensor():
+    frames = np.full((2, 2, 2, 3), 255, dtype=np.uint8)
+    tensor = decoder.frames_to_tensor(frames)
+    assert tensor.dtype.is_floating_point
+    assert tensor.shape == (2, 2, 2, 3)
+    assert float(tensor.max()) == 1.0
+
+
+@pytest.mark.unit
+def test_select_range_frames_and_stride():
+    info = {"fps": 30.0, "duration": 10.0, "nb_frames": 300}
+    sel = decoder.select_range(info, start_frame=90, frame_count=30, stride=4)
+    assert sel["seek"] == pytest.approx(89.5 / 30)
+    assert sel["duration"] == pytest.approx(1.0)
+    assert sel["max_frames"] == 8
+    assert sel["expected"] == 8
+
+
+@pytest.mark.unit
+def test_select_range_times():
+    info = {"fps": 25.0, "duration": 10.0, "nb_frames": 250}
+    sel = decoder.select_range(info, start_time=2.0, end_time=4.0)
+    assert sel["seek"] == 2.0
+    assert sel["duration"] == 2.0
+    assert sel["max_frames"] == 0
+    assert sel["expected"] == 50
+
+    with pytest.raises(ValueError):
+        decoder.select_range(info, start_time=5.0, end_time=4.0)
+
+
+@pytest.mark.unit
+def test_build_decode_command_seeks_on_input():
+    cmd = decoder.build_decode_command(
+        "in.mp4", ["select=not(mod(n\\,2))"], seek=1.5, duration=2.0, max_frames=10
+    )
+    assert cmd.index("-ss") < cmd.index("-i")
+    assert cmd.index("-t") < cmd.index("-i")
+    assert cmd[cmd.index("-frames:v") + 1] == "10"
+    assert cmd[-1] == "pipe:1"
+
+
+@pytest.mark.unit
+def test_parse_timestamp():
+    assert decoder.parse_timestamp("00:01:02.5") == 62.5
+    assert decoder.parse_timestamp("01:30") == 90.0
+    assert decoder.parse_timestamp(" 4.25 ") == 4.25
+    with pytest.raises(ValueError):
+        decoder.parse_timestamp("abc")
+
+
+@pytest.mark.unit
+def test_evenly_spaced_timestamps():
+    assert decoder.evenly_spaced_timestamps(10.0, 4) == [1.25, 3.75, 6.25, 8.75]
+    assert decoder.evenly_spaced_timestamps(0.0, 4) == []
+
+
+@pytest.mark.unit
+def test_build_seek_command_single_process():
+    cmd = decoder._build_seek_command("in.mp4", [1.0, 5.0, 9.0], ["scale=64:36"])
+    assert cmd.count("-i") == 3
+    assert cmd.count("-ss") == 3
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert "concat=n=3" in graph
+    assert graph.count("scale=64:36") == 3
+
+
+def test_snap_to_keyframes():
+    keyframes = [0.0, 2.0, 4.0]
+    assert decoder.snap_to_keyframes([0.5, 2.0, 3.99, 10.0], keyframes) == [
+        0.0,
+        2.0,
+        2.0,
+        4.0,
+    ]
+    with pytest.raises(RuntimeError):
+        decoder.snap_to_keyframes([1.0], [])
+
+
+def test_parse_showinfo_applies_offset():
+    lines = [
+        "[Parsed_showinfo_1 @ 0x1] config in time_base: 1/90000",
+        "[Parsed_showinfo_1 @ 0x1] n:   0 pts:      0 pts_time:0       duration:3003",
+        "[Parsed_showinfo_1 @ 0x1] n:   1 pts: 180180 pts_time:2.002   duration:3003",
+    ]
+    assert decoder._parse_showinfo(lines, 10.0) == [10.0, 12.002]
+
+
+def test_parse_crop():
+    assert decoder.parse_crop("", 640, 400) is None
+    assert decoder.parse_crop("square", 640, 400) == (400, 400, 120, 0)
+    assert decoder.parse_crop("320:200", 640, 400) == (320, 200, 160, 100)
+    assert decoder.parse_crop("100:50:10:20", 640, 400) == (100, 50, 10, 20)
+    with pytest.raises(ValueError):
+        decoder.parse_crop("800:400", 640, 400)
+    with pytest.raises(ValueError):
+        decoder.parse_crop("wide", 640, 400)
+
+
+def test_output_filters_crop_scale_format():
+    info = {"width": 1920, "height": 1080}
+    assert decoder.output_filters(info) == ([], 1920, 1080, 3)
+
+    filters, w, h, channels = decoder.output_filters(
+        info, crop="square", width=512, scaler="lanczos", pix_fmt="gray"
+    )
+    assert filters == ["crop=1080:1080:420:0", "scale=512:512:flags=lanczos"]
+    assert (w, h, channels) == (512, 512, 1)
+
+    # A single target dimension keeps the aspect; max_width still caps it
+    assert decoder.output_filters(info, height=540)[1:3] == (960, 540)
+    assert decoder.output_filters(info, height=540, max_width=480)[1:3] == (480, 270)
+
+    with pytest.raises(ValueError):
+        decoder.output_filters(info, pix_fmt="yuv420p")
+
+
+def test_select_range_resampled():
+    info = {"fps": 30.0, "duration": 10.0, "nb_frames": 300}
+    sel = decoder.select_range(info, start_time=2.0, end_time=4.0, stride=2, rate=10.0)
+    assert sel["expected"] == 10
+    sel = decoder.select_range(info, start_frame=30, frame_count=90, rate=10.0)
+    assert sel["max_frames"] == 30
+
+
+def test_fit_budget():
+    info = {"width": 1920, "height": 1080, "fps": 30.0, "duration": 10.0, "nb_frames": 300}
+    per_frame = decoder.frame_bytes(1920, 1080)
+
+    fit = decoder.fit_budget(info, {}, {}, max_frames=100)
+    assert (fit["stride"], fit["frames"]) == (3, 100)
+
+    fit = decoder.fit_budget(info, {}, {}, max_bytes=per_frame * 50)
+    assert fit["stride"] == 6
+    assert fit["bytes"] <= per_frame * 50
+
+    fit = decoder.fit_budget(info, {}, {}, max_bytes=per_frame * 75, fit="downscale")
+    assert fit["stride"] == 1
+    assert fit["width"] <= 960
+    assert fit["bytes"] <= per_frame * 75
+
+    with pytest.raises(ValueError):
+        decoder.fit_budget(info, {}, {}, max_bytes=per_frame * 50, fit="refuse")
+    with pytest.raises(ValueError):
+        decoder.fit_budget(info, {}, {}, max_bytes=per_frame // 2)
+
+
+def test_fit_budget_keyframes():
+    info = {"width": 1920, "height": 1080, "fps": 30.0, "duration": 10.0, "nb_frames": 300}
+    keyframes = [float(t) for t in range(10)]
+
+    fit = decoder.fit_budget(info, {}, {}, max_frames=4, keyframes=keyframes)
+    assert (fit["stride"], fit["frames"]) == (3, 4)
+
+    selection = {"start_time": 2.0, "end_time": 6.0}
+    fit = decoder.fit_budget(info, selection, {}, max_frames=2, keyframes=keyframes)
+    assert (fit["stride"], fit["frames"]) == (2, 2)
+
+    per_frame = decoder.frame_bytes(1920, 1080)
+    fit = decoder.fit_budget(info, {}, {}, max_bytes=per_frame * 5, keyframes=keyframes)
+    assert fit["stride"] == 2
+    assert fit["bytes"] <= per_frame * 5
+
+
+def test_split_at_keyframes():
+    # 10 fps, keyframe every second
+    packets = [(i / 10, i % 10 == 0) for i in range(50)]
+
+    runs = decoder.split_at_keyframes(packets, 0.0, 0.0, 4)
+    assert [r[0] for r in runs] == [0, 10, 20, 40]
+    assert sum(r[1] for r in runs) == 50
+    assert all(packets[first][1] for first, _, _ in runs[1:])
+
+    # The first run starts mid-GOP at the range start
+    runs = decoder.split_at_keyframes(packets, 1.55, 3.0, 2)
+    assert runs == [(0, 4, 1.6), (4, 10, 2.0)]
+
+    assert len(decoder.split_at_keyframes(packets, 0.0, 0.5, 4)) == 1
+
+
+@pytest.mark.unit
+def test_decode_chunked_short_chunk_falls_back(monkeypatch):
+    # 10 fps, keyframe every second; the second chunk's ffmpeg stops early
+    packets = [(i / 10, i % 10 == 0) for i in range(40)]
+    monkeypatch.setattr(decoder.smartcut, "scan_packets", lambda path: packets)
+    read_frames = decoder.read_frames
+    serial = _emit_frames_cmd(40, 4, 2)
+
+    def fake_read_frames(cmd, width, height, expected=0, channels=3, log=None, out=None):
+        if cmd is serial:
+            return read_frames(cmd, width, height, expected, channels)
+        # Only chunks after the first seek with -copyts
+        count = expected - 3 if "-copyts" in cmd else expected
+        out[:count] = 1
+        return out[:count]
+
+    monkeypatch.setattr(decoder, "read_frames", fake_read_frames)
+    frames = decoder._decode_chunked(
+        "video.mp4", serial, (0.0, 0.0, 1), [], (4, 2, 3, "rgb24"), 2
+    )
+    assert frames.shape[0] == 40
+    assert [int(f[0, 0, 0]) for f in frames] == list(range(40))
@@ -0,0 +1,47 @@
+import os
+import pytest
+from nodes import diskcache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = diskcache.DiskCache("test", ".bin", 25, companions=(".json",))
+    cache.directory = str(tmp_path / "test")
+    return cache
+
+
+def _store(cache, name, age):
+    path = cache.path(name)
+    cache.write(path, lambda f: f.write(b"x" * 10))
+    cache.write(cache.path(name, ".json"), lambda f: f.write("{}"), mode="w")
+    os.utime(path, (1000 + age, 1000 + age))
+
+
+@pytest.mark.unit
+def test_write_is_atomic(cache):
+    def fail(f):
+        f.write(b"partial")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        cache.write(cache.path("a"), fail)
+    assert os.listdir(cache.directory) == []
+
+
+@pytest.mark.unit
+def test_evicts_least_recently_used_with_companions(cache):
+    for age, name in enumerate(["old", "mid", "new"]):
+        _store(cache, name, age)
+    assert cache.evict() == 1
+    assert sorted(os.listdir(cache.directory)) == [
+        "mid.bin", "mid.json", "new.bin", "new.json"
+    ]
+
+    # Under the cap after the scan: small writes skip rescanning until it is exceeded
+    cache.touch(cache.path("mid"))
+    _store(cache, "newer", 5)
+    assert cache.evict() == 1
+    assert [e.name for e in cache.entries()] == ["mid.bin", "newer.bin"]
+
+    assert cache.purge() == 2
+    assert os.listdir(cache.directory) == []
@@ -0,0 +1,111 @@
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+import torch
+from nodes import encoder
+
+
+def _read_stdin_cmd(exit_code=0):
+    # Stand-in for ffmpeg: reports the number of bytes received on stderr
+    script = (
+        "import sys\n"
+        "data = sys.stdin.buffer.read()\n"
+        "sys.stderr.write(f'{len(data)}:{sum(data)}')\n"
+        f"sys.exit({exit_code})\n"
+    )
+    return [sys.executable, "-c", script]
+
+
+@pytest.mark.unit
+def test_rawvideo_input_args():
+    args = encoder.rawvideo_input_args(torch.zeros((2, 4, 6, 3)), 24)
+    assert args[args.index("-pix_fmt") + 1] == "rgb24"
+    assert args[args.index("-s") + 1] == "6x4"
+    assert args[args.index("-framerate") + 1] == "24"
+    assert args[-2:] == ["-i", "pipe:0"]
+    gray = encoder.rawvideo_input_args(torch.zeros((1, 4, 6, 1)), 24)
+    assert gray[gray.index("-pix_fmt") + 1] == "gray"
+    with pytest.raises(ValueError):
+        encoder.rawvideo_input_args(torch.zeros((1, 4, 6, 2)), 24)
+
+
+@pytest.mark.unit
+def test_write_frames_streams_all_chunks():
+    images = torch.ones((5, 2, 3, 3))
+    cmd = _read_stdin_cmd()
+    # Success leaves nothing to inspect, so fail deliberately to read stderr back
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        encoder.write_frames(_read_stdin_cmd(exit_code=1), images, chunk_frames=2)
+    assert excinfo.value.stderr == f"{5 * 2 * 3 * 3}:{5 * 2 * 3 * 3 * 255}"
+    encoder.write_frames(cmd, images, chunk_frames=2)
+
+
+@pytest.mark.unit
+def test_codec_and_quality_mapping():
+    assert encoder.codec_options("h264_cpu") == ("libx264", "-crf")
+    assert encoder.codec_options("h265_nvidia") == ("hevc_nvenc", "-cq")
+    assert encoder.quality_flag("h264_qsv") == "-global_quality"
+    assert encoder.quality_flag("hevc_videotoolbox") == "-q:v"
+    assert encoder.quality_flag("h264_vaapi") == "-qp"
+    with pytest.raises(ValueError):
+        encoder.codec_options("vp9_cpu")
+
+
+@pytest.mark.unit
+def test_video_output_args():
+    assert encoder.video_output_args("libx264", 20, "fast", threads=2) == [
+        "-c:v", "libx264", "-crf", "20", "-preset", "fast",
+        "-threads", "2", "-pix_fmt", "yuv420p",
+    ]
+    assert "-preset" not in encoder.video_output_args("h264_nvenc", 20)
+
+
+@pytest.mark.unit
+def test_prepare_waveform_squeezes_batch():
+    audio = {"waveform": torch.zeros((1, 2, 100)), "sample_rate": 44100}
+    assert encoder.prepare_waveform(audio).shape == (2, 100)
+    audio = {"waveform": torch.zeros((2, 100)), "sample_rate": 44100}
+    assert encoder.prepare_waveform(audio).shape == (2, 100)
+
+
+@pytest.mark.unit
+def test_encoder_session_registry(tmp_path):
+    path = str(tmp_path / "session.mp4")
+    session = encoder.open_session("unit", path, 10, "libx264", 23, "ultrafast")
+    assert encoder.open_session("unit", "ignored.mp4", 30, "libx264", 23) is session
+    assert encoder.get_session("unit") is session
+    with pytest.raises(ValueError):
+        encoder.close_session("unit")  # no frames appended yet
+    with pytest.raises(ValueError):
+        encoder.get_session("unit")
+    assert not encoder.abort_session("missing")
+
+
+@pytest.mark.unit
+def test_audio_pipe_streams_interleaved_f32le():
+    waveform = torch.arange(2 * 100_000, dtype=torch.float32).reshape(1, 2, -1)
+    with encoder.AudioPipe({"waveform": waveform, "sample_rate": 8000}) as audio_pipe:
+        args = audio_pipe.input_args()
+        assert args[:6] == ["-f", "f32le", "-ar", "8000", "-ac", "2"]
+        with open(args[-1], "rb") as f:
+            data = np.frombuffer(f.read(), dtype=np.float32)
+    assert np.array_equal(data, waveform[0].t().reshape(-1).numpy())
+    assert not os.path.exists(args[-1])
+
+
+@pytest.mark.unit
+def test_audio_pipe_without_reader_closes():
+    waveform = torch.zeros((1, 1, 10))
+    with encoder.AudioPipe({"waveform": waveform, "sample_rate": 8000}) as audio_pipe:
+        path = audio_pipe.path
+    assert not os.path.exists(path)
+
+
+@pytest.mark.unit
+def test_chunk_bounds():
+    assert encoder.chunk_bounds(100, 3) == [(0, 33), (33, 66), (66, 100)]
+    # Never split below MIN_CHUNK_FRAMES per chunk
+    assert encoder.chunk_bounds(30, 4) == [(0, 30)]
+    assert encoder.chunk_bounds(0, 4) == [(0, 0)]
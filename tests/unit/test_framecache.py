@@ -0,0 +1,88 @@
+import os
+import numpy as np
+import pytest
+from nodes import framecache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(framecache.CACHE, "directory", str(tmp_path / "frames"))
+    monkeypatch.setattr(framecache.CACHE, "max_bytes", framecache.DEFAULT_MAX_BYTES)
+    return tmp_path
+
+
+@pytest.mark.unit
+def test_key_changes_with_source_and_params(cache_dir):
+    video = cache_dir / "a.mp4"
+    video.write_bytes(b"abc")
+    key = framecache.make_key(str(video), ["-ss", "1"])
+    assert key == framecache.make_key(str(video), ["-ss", "1"])
+    assert key != framecache.make_key(str(video), ["-ss", "2"])
+
+    video.write_bytes(b"abcd")
+    assert key != framecache.make_key(str(video), ["-ss", "1"])
+    assert framecache.make_key(str(cache_dir / "missing.mp4"), []) is None
+
+
+@pytest.mark.unit
+def test_load_or_decode_hits_cache(cache_dir):
+    video = cache_dir / "a.mp4"
+    video.write_bytes(b"abc")
+    frames = np.arange(24, dtype=np.uint8).reshape(2, 2, 2, 3)
+    calls = []
+
+    def decode():
+        calls.append(1)
+        return frames
+
+    first = framecache.load_or_decode(str(video), ["x"], decode)
+    second = framecache.load_or_decode(str(video), ["x"], decode)
+    assert len(calls) == 1
+    assert isinstance(second, np.memmap)
+    np.testing.assert_array_equal(first, second)
+
+
+@pytest.mark.unit
+def test_evicts_least_recently_used(cache_dir):
+    frames = np.zeros((1, 10, 10, 3), dtype=np.uint8)
+    for i, key in enumerate(["old", "mid", "new"]):
+        framecache.store(key, frames)
+        path = framecache.CACHE.path(key)
+        os.utime(path, (1000 + i, 1000 + i))
+
+    entry_size = framecache.entries()[0]["bytes"]
+    framecache.set_max_bytes(entry_size * 2)
+    assert [e["key"] for e in framecache.entries()] == ["new", "mid"]
+
+    assert framecache.purge() == 2
+    assert framecache.stats()["entries"] == 0
+
+
+@pytest.mark.unit
+def test_cache_dir_outside_extension(tmp_path, monkeypatch):
+    import folder_paths
+    from nodes import diskcache
+
+    monkeypatch.setattr(folder_paths, "get_user_directory", lambda: str(tmp_path))
+    path = diskcache.cache_dir("frames")
+    assert path == os.path.join(str(tmp_path), "comfyui-ffmpeg", "cache", "frames")
+    extension = os.path.dirname(os.path.dirname(os.path.abspath(diskcache.__file__)))
+    assert not path.startswith(extension)
+
+
+@pytest.mark.unit
+def test_frame_cache_node_info_keeps_settings(cache_dir, monkeypatch):
+    import json
+    from nodes import probecache
+    from nodes.frameCache_v3 import FrameCacheV3
+
+    monkeypatch.setattr(probecache, "_persist", True)
+    framecache.set_max_bytes(123 * 1024 * 1024)
+
+    stats = json.loads(FrameCacheV3.execute("info", 4096, False)[0])
+    assert stats["max_bytes"] == 123 * 1024 * 1024
+    assert stats["probe_cache"]["persist"] is True
+
+    stats = json.loads(FrameCacheV3.execute("configure", 64, False)[0])
+    assert stats["max_bytes"] == 64 * 1024 * 1024
+    assert stats["probe_cache"]["persist"] is False
@@ -12,6 +12,12 @@ try:
         video_type,
         audio_type,
         clear_memory,
+        load_images,
+        list_directory,
+        natural_sort_key,
+        images_to_uint8,
+        tensor2pil,
+        save_images,
     )
 except ImportError:
     # If conftest hasn't run or path isn't set, try relative
@@ -25,6 +31,12 @@ except ImportError:
         video_type,
         audio_type,
         clear_memory,
+        load_images,
+        list_directory,
+        natural_sort_key,
+        images_to_uint8,
+        tensor2pil,
+        save_images,
     )
 
 
@@ -99,3 +111,159 @@ def test_clear_memory(mock_soft_empty_cache, mock_unload_all_models, mock_gc):
     mock_gc.collect.assert_called_once()
     mock_unload_all_models.assert_called_once()
     mock_soft_empty_cache.assert_called_once()
+
+
+@pytest.mark.unit
+def test_load_images(tmp_path):
+    import torch
+    from PIL import Image
+
+    paths = []
+    for i in range(5):
+        path = str(tmp_path / f"img_{i}.png")
+        Image.new("RGB", (8, 4), (i * 50, 0, 255)).save(path)
+        paths.append(path)
+    # Non-RGB modes are converted
+    Image.new("L", (8, 4), 128).save(paths[4])
+
+    batch = load_images(paths, workers=3)
+    assert batch.shape == (5, 4, 8, 3)
+    assert batch.dtype == torch.float32
+    assert torch.allclose(batch[2, 0, 0], torch.tensor([100 / 255, 0.0, 1.0]))
+
+    raw = load_images(paths, as_float=False)
+    assert raw.dtype == torch.uint8
+    assert raw[4].eq(128).all()
+
+    Image.new("RGB", (4, 4)).save(paths[1])
+    with pytest.raises(ValueError):
+        load_images(paths)
+
+
+@pytest.mark.unit
+def test_natural_sort_key():
+    names = ["frame10.png", "frame2.png", "frame1.png", "Frame3.png"]
+    assert sorted(names, key=natural_sort_key) == [
+        "Frame3.png",
+        "frame1.png",
+        "frame2.png",
+        "frame10.png",
+    ]
+
+
+@pytest.mark.unit
+def test_list_directory_cached_and_paged(tmp_path, monkeypatch):
+    import func
+
+    for i in (1, 2, 10, 3):
+        (tmp_path / f"img{i}.PNG").touch()
+    (tmp_path / "notes.txt").touch()
+    (tmp_path / "sub.png").mkdir()
+    # Pretend the directory is settled so its listing may be cached
+    monkeypatch.setattr(func, "DIRECTORY_MTIME_SLACK", -1e9)
+
+    paths = list_directory(str(tmp_path), {".png"})
+    assert [os.path.basename(p) for p in paths] == [
+        "img1.PNG",
+        "img2.PNG",
+        "img3.PNG",
+        "img10.PNG",
+    ]
+    assert [os.path.basename(p) for p in list_directory(str(tmp_path), {".png"}, 1, 2)] == [
+        "img2.PNG",
+        "img3.PNG",
+    ]
+
+    # Served from the index without rescanning
+    with patch("func.os.scandir", side_effect=AssertionError("rescanned")):
+        assert list_directory(str(tmp_path), {".png"}) == paths
+
+    # A changed directory mtime invalidates the listing
+    (tmp_path / "img4.png").touch()
+    st = os.stat(tmp_path)
+    os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert len(list_directory(str(tmp_path), {".png"})) == 5
+
+
+@pytest.mark.unit
+def test_parse_image_sequence():
+    from func import parse_image_sequence
+
+    paths = [os.path.join("frames", f"img_{i:04d}.png") for i in (7, 8, 10)]
+    assert parse_image_sequence(paths) == (os.path.join("frames", "img_%04d.png"), [7, 8, 10])
+    # Mixed names or more than one number cannot be an image2 pattern
+    assert parse_image_sequence(["a_001.png", "b_002.png"]) == (None, [])
+    assert parse_image_sequence(["shot1_0001.png"]) == (None, [])
+    assert parse_image_sequence(["cover.png"]) == (None, [])
+
+
+@pytest.mark.unit
+def test_images_to_uint8_rounds_clamps_and_reuses_buffer():
+    import torch
+
+    images = torch.tensor([0.0, 0.5, 1.0, 1.5, -0.2]).reshape(1, 1, 5, 1).repeat(3, 1, 1, 1)
+    out = images_to_uint8(images, chunk_frames=2)
+    assert out.dtype == torch.uint8 and out.device.type == "cpu"
+    assert out[2].flatten().tolist() == [0, 128, 255, 255, 0]
+
+    # A smaller batch reuses the same storage
+    again = images_to_uint8(images[:1], out)
+    assert again.data_ptr() == out.data_ptr()
+    assert again.shape == (1, 1, 5, 1)
+
+
+@pytest.mark.unit
+def test_tensor2pil_single_image():
+    import torch
+
+    image = tensor2pil(torch.full((1, 4, 6, 3), 0.5))
+    assert image.size == (6, 4)
+    assert image.getpixel((0, 0)) == (128, 128, 128)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("fmt", ["png", "jpeg", "webp", "webp_lossless", "npy"])
+def test_save_images_formats_in_order(tmp_path, fmt):
+    import numpy as np
+    from PIL import Image
+
+    frames = np.stack([np.full((8, 8, 3), i * 20, dtype=np.uint8) for i in range(7)])
+    paths = save_images(frames, str(tmp_path), "img", fmt, workers=2)
+    assert [os.path.basename(p).split(".")[0] for p in paths] == [
+        f"img_{i:05d}" for i in range(7)
+    ]
+    if fmt == "npy":
+        assert np.array_equal(np.load(paths[3]), frames[3])
+    elif fmt in ("png", "webp_lossless"):
+        assert np.array_equal(np.asarray(Image.open(paths[3])), frames[3])
+
+
+@pytest.mark.unit
+def test_save_images_archive(tmp_path):
+    import io
+    import tarfile
+    import numpy as np
+
+    frames = np.random.randint(0, 255, (5, 4, 4, 3), dtype=np.uint8)
+    (archive,) = save_images(frames, str(tmp_path), "batch", "npy", archive=True)
+    with tarfile.open(archive) as tar:
+        names = tar.getnames()
+        assert names == [f"batch_{i:05d}.npy" for i in range(5)]
+        data = tar.extractfile(names[2]).read()
+    assert np.array_equal(np.load(io.BytesIO(data)), frames[2])
+
+
+@pytest.mark.unit
+def test_drain_stderr():
+    import subprocess
+    import sys
+    from func import drain_stderr
+
+    script = "import sys; sys.stderr.write('x' * 200000); print('done')"
+    process = subprocess.Popen(
+        [sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    collect = drain_stderr(process)
+    assert process.stdout.read().strip() == b"done"
+    process.wait()
+    assert collect() == "x" * 200000
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from nodes import keyframeindex
+
+KEYFRAMES = [0.0, 2.5, 5.0]
+
+
+@pytest.mark.unit
+def test_scalar_lookups():
+    assert keyframeindex.prev_keyframe(KEYFRAMES, 2.5) == 2.5
+    assert keyframeindex.prev_keyframe(KEYFRAMES, -1.0) is None
+    assert keyframeindex.next_keyframe(KEYFRAMES, 2.5) == 5.0
+    assert keyframeindex.next_keyframe(KEYFRAMES, 5.0) is None
+    assert keyframeindex.nearest_keyframe(KEYFRAMES, 1.25) == 0.0
+    assert keyframeindex.nearest_keyframe([], 1.0) is None
+
+
+@pytest.mark.unit
+def test_vectorized_lookups():
+    times = np.array([-1.0, 1.0, 4.0, 9.0])
+    np.testing.assert_array_equal(
+        keyframeindex.prev_keyframe(KEYFRAMES, times), [np.nan, 0.0, 2.5, 5.0]
+    )
+    np.testing.assert_array_equal(
+        keyframeindex.next_keyframe(KEYFRAMES, times), [0.0, 2.5, 5.0, np.nan]
+    )
+    np.testing.assert_array_equal(
+        keyframeindex.nearest_keyframe(KEYFRAMES, times), [0.0, 0.0, 5.0, 5.0]
+    )
+
+
+@pytest.fixture
+def index_dir(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_scan(path):
+        calls.append(path)
+        pts = np.array([0.0, 0.04, 0.08, 1.0], dtype=np.float64)
+        return keyframeindex.KeyframeIndex(pts, np.array([0, 3], dtype=np.int64))
+
+    monkeypatch.setattr(keyframeindex.CACHE, "directory", str(tmp_path / "keyframes"))
+    monkeypatch.setattr(keyframeindex, "scan", fake_scan)
+    keyframeindex.purge()
+    yield calls
+    keyframeindex.purge()
+
+
+@pytest.mark.unit
+def test_index_is_persisted(index_dir, tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"abc")
+    index = keyframeindex.get(str(video))
+    assert keyframeindex.get(str(video)) is index
+    assert index.packets() == [(0.0, True), (0.04, False), (0.08, False), (1.0, True)]
+
+    # Forget the in-memory copy; the sidecar is read back without a rescan
+    keyframeindex._memory.clear()
+    np.testing.assert_array_equal(keyframeindex.get(str(video)).keyframes, [0.0, 1.0])
+    assert len(index_dir) == 1
+
+    video.write_bytes(b"abcd")
+    keyframeindex.get(str(video))
+    assert len(index_dir) == 2
+    assert keyframeindex.stats()["entries"] == 2
+    assert keyframeindex.purge() == 2
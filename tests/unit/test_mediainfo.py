@@ -0,0 +1,97 @@
+from fractions import Fraction
+import pytest
+from nodes import mediainfo
+
+PROBE = {
+    "format": {"format_name": "matroska,webm", "duration": "10.000000", "size": "1000"},
+    "streams": [
+        {
+            "index": 0,
+            "codec_type": "video",
+            "codec_name": "mjpeg",
+            "disposition": {"attached_pic": 1},
+        },
+        {
+            "index": 1,
+            "codec_type": "video",
+            "codec_name": "h264",
+            "width": 1920,
+            "height": 1080,
+            "r_frame_rate": "30000/1001",
+            "avg_frame_rate": "30000/1001",
+            "time_base": "1/1000",
+            "side_data_list": [{"rotation": -90}],
+            "tags": {"DURATION": "00:00:05.005000000"},
+        },
+        {
+            "index": 2,
+            "codec_type": "audio",
+            "codec_name": "aac",
+            "sample_rate": "48000",
+            "channels": 2,
+            "channel_layout": "stereo",
+            "duration": "N/A",
+            "tags": {"language": "eng", "NUMBER_OF_FRAMES-eng": "235"},
+        },
+    ],
+    "chapters": [
+        {"id": 0, "start_time": "0.000000", "end_time": "5.000000", "tags": {"title": "Intro"}}
+    ],
+}
+
+
+@pytest.mark.unit
+def test_parse_rational():
+    assert mediainfo.parse_rational("30000/1001") == Fraction(30000, 1001)
+    assert mediainfo.parse_rational("25") == 25
+    assert mediainfo.parse_rational("0/0") == 0
+    assert mediainfo.parse_rational(None) == 0
+    assert mediainfo.parse_rational("N/A") == 0
+
+
+@pytest.mark.unit
+def test_media_info_model():
+    info = mediainfo.MediaInfo("a.mkv", PROBE)
+    assert info.duration == 10.0
+    assert [c.title for c in info.chapters] == ["Intro"]
+
+    video = info.video
+    assert video.index == 1
+    assert video.fps == pytest.approx(29.97, rel=1e-3)
+    assert video.time_base == Fraction(1, 1000)
+    assert video.display_size == (1080, 1920)
+    assert video.duration == pytest.approx(5.005)
+    # Not stored in the container: estimated from duration and frame rate
+    assert video.nb_frames == 0
+    assert video.frame_count == 150
+
+    audio = info.audio
+    assert (audio.sample_rate, audio.channels, audio.channel_layout) == (48000, 2, "stereo")
+    assert audio.language == "eng"
+    assert audio.nb_frames == 235
+    # Falls back to the container duration
+    assert audio.duration == 10.0
+    assert not hasattr(audio, "__dict__")
+
+
+@pytest.mark.unit
+def test_probe_batch_cache_growth_is_capped(monkeypatch):
+    from nodes import probecache
+
+    monkeypatch.setattr(probecache, "_max_entries", 4)
+    monkeypatch.setattr(mediainfo, "MAX_BATCH_CACHE_ENTRIES", 10)
+    limits = []
+
+    def summarize(path):
+        with probecache._lock:
+            limits.append(max([probecache._max_entries, *probecache._reserved]))
+        return {"path": path}
+
+    monkeypatch.setattr(mediainfo, "summarize", summarize)
+
+    rows = mediainfo.probe_batch([f"{i}.mp4" for i in range(25)], workers=2)
+    assert [row["path"] for row in rows] == [f"{i}.mp4" for i in range(25)]
+    # Raised to the batch (capped) only while it runs
+    assert set(limits) == {10}
+    assert probecache.get_max_entries() == 4
+    assert probecache._reserved == []
@@ -0,0 +1,66 @@
+import os
+import pytest
+from nodes import probecache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_ffprobe(path):
+        calls.append(path)
+        return {"streams": [{"codec_type": "video", "index": len(calls)}]}
+
+    monkeypatch.setattr(probecache.CACHE, "directory", str(tmp_path / "probe"))
+    monkeypatch.setattr(probecache, "run_ffprobe", fake_ffprobe)
+    monkeypatch.setattr(probecache, "_persist", False)
+    probecache.invalidate()
+    yield calls
+    probecache.invalidate()
+
+
+@pytest.mark.unit
+def test_probe_once_per_file_identity(cache, tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"abc")
+    first = probecache.probe_json(str(video))
+    assert probecache.probe_json(str(video)) is first
+    assert len(cache) == 1
+    assert probecache.first_stream(first, "video")["index"] == 1
+    assert probecache.first_stream(first, "audio") is None
+
+    video.write_bytes(b"abcd")
+    assert probecache.probe_json(str(video)) is not first
+    assert len(cache) == 2
+
+    assert probecache.invalidate(str(video)) == 2
+    with pytest.raises(FileNotFoundError):
+        probecache.probe_json(str(tmp_path / "missing.mp4"))
+
+
+@pytest.mark.unit
+def test_persisted_results_survive_invalidate(cache, tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"abc")
+    probecache.set_persist(True)
+    probecache.probe_json(str(video))
+    probecache.invalidate()
+    probecache.probe_json(str(video))
+    assert len(cache) == 1
+    assert len(os.listdir(probecache.CACHE.directory)) == 1
+
+    assert probecache.purge() == 2
+    probecache.probe_json(str(video))
+    assert len(cache) == 2
+
+
+@pytest.mark.unit
+def test_evicts_least_recently_used(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(probecache, "_max_entries", 2)
+    paths = []
+    for name in ["old", "mid", "new"]:
+        path = tmp_path / f"{name}.mp4"
+        path.write_bytes(name.encode())
+        probecache.probe_json(str(path))
+        paths.append(os.path.realpath(path))
+    assert probecache.stats()["files"] == [paths[2], paths[1]]